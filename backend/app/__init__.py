@@ -4,10 +4,16 @@ from flask_cors import CORS
 from flask_migrate import Migrate
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from app.security.rbac import ensure_roles_permissions
 from app.utils.logging_config import configure_logging
 from app.services.rate_limiter import init_app as init_rate_limiter
-from .seeds import ensure_admin_user
+from app.services.pdf_cache import init_app as init_pdf_cache
+from app.services.pdf_jobs import init_app as init_pdf_jobs
+from app.services.search_service import init_app as init_search
+from app.services.stats_cache import init_app as init_stats_cache
+from app.services.request_metrics import init_app as init_request_metrics
+from app.services.metrics import init_app as init_metrics
+from app.services.token_revocation import init_app as init_token_revocation
+from .seeds import init_app as init_seeds
 
 import traceback
 
@@ -23,6 +29,8 @@ def _validate_config(app):
     jwt_key = cfg.get('JWT_SECRET_KEY')
     if not jwt_key or jwt_key in ('change-me', 'dev-only-insecure-key-change-in-production'):
         errors.append("JWT_SECRET_KEY no es segura o está vacía")
+    if cfg.get('METRICS_ENABLED') and not cfg.get('METRICS_TOKEN'):
+        errors.append("METRICS_TOKEN no configurado con METRICS_ENABLED=True")
 
     if errors:
         if not cfg.get('DEBUG') and not cfg.get('TESTING'):
@@ -39,7 +47,15 @@ def create_app():
     configure_logging(app)
     _validate_config(app)
     init_rate_limiter(app)
+    init_pdf_cache(app)
+    init_pdf_jobs(app)
+    init_stats_cache(app)
+    init_request_metrics(app)
+    init_metrics(app)
     db.init_app(app)
+    init_search(app)
+    init_token_revocation(app)
+    init_seeds(app)
     CORS(
         app,
         resources={
@@ -64,6 +80,9 @@ def create_app():
         from .docs import docs_bp
         from .routes.aduanas import aduanas_bp
         from .routes.dashboard import dashboard_bp
+        from .routes.pdf_jobs import pdf_jobs_bp
+        from .routes.reportes import reportes_bp
+        from .routes.metrics import metrics_bp
 
         for bp in [
             paises_bp,
@@ -81,15 +100,15 @@ def create_app():
             docs_bp,
             aduanas_bp,
             dashboard_bp,
+            pdf_jobs_bp,
+            reportes_bp,
+            metrics_bp,
         ]:
             app.register_blueprint(bp)
 
-        try:
-            ensure_roles_permissions()
-            ensure_admin_user()
-        except Exception as e:
-            # Tables may not exist yet during first migration
-            app.logger.warning(f'Could not initialize roles/admin: {e}')
+        # Importa modelos: se inicializa acá para evitar el import circular con `db`
+        from .services.reportes_service import init_app as init_reportes
+        init_reportes(app)
 
     @app.after_request
     def add_security_headers(response):
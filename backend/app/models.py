@@ -58,6 +58,8 @@ class Usuario(db.Model):
     creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False,
                            default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Se incrementa al cambiar roles, estado o clave: invalida los access tokens emitidos
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     movimientos = db.relationship('Movimiento', backref='usuario', lazy=True)
     reportes = db.relationship('Reporte', backref='usuario', lazy=True)
@@ -95,10 +97,11 @@ class Role(db.Model):
     updated_at = db.Column(db.DateTime, nullable=False,
                            default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Carga diferida: los permisos se resuelven con el mapa cacheado de app.security.rbac
     users = db.relationship('Usuario', secondary='user_roles',
-                            back_populates='roles', lazy='selectin')
+                            back_populates='roles', lazy='select')
     permissions = db.relationship(
-        'Permission', secondary='role_permissions', back_populates='roles', lazy='selectin')
+        'Permission', secondary='role_permissions', back_populates='roles', lazy='select')
 
     def __repr__(self) -> str:
         return f"<Role {self.name}>"
@@ -113,7 +116,7 @@ class Permission(db.Model):
                            default=datetime.utcnow)
 
     roles = db.relationship('Role', secondary='role_permissions',
-                            back_populates='permissions', lazy='selectin')
+                            back_populates='permissions', lazy='select')
 
     def __repr__(self) -> str:
         return f"<Permission {self.key}>"
@@ -204,7 +207,7 @@ class AuditLog(db.Model):
                            default=datetime.utcnow)
     level = db.Column(db.String(20), nullable=False, default='INFO')
 
-    __table_args__ = (db.Index('ix_audit_logs_created', 'created_at'),)
+    __table_args__ = (db.Index('ix_audit_logs_created_id', 'created_at', 'id'),)
 
 
 class RefreshToken(db.Model):
@@ -327,6 +330,32 @@ class Honorario(db.Model):
 
     crt = db.relationship('CRT', backref='honorarios')
 
+    __table_args__ = (
+        db.Index('ix_honorarios_crt_id', 'crt_id'),
+        db.Index('ix_honorarios_transportadora_id', 'transportadora_id', 'id'),
+    )
+
+
+class HonorarioResumen(db.Model):
+    """Totales de honorarios por transportadora, mes (YYYY-MM), moneda y tipo de operación."""
+    __tablename__ = 'honorarios_resumen'
+    id = db.Column(db.Integer, primary_key=True)
+    transportadora_id = db.Column(db.Integer, db.ForeignKey(
+        'transportadoras.id'), nullable=False)
+    mes = db.Column(db.String(7), nullable=False)
+    moneda_id = db.Column(db.Integer, db.ForeignKey(
+        'monedas.id'), nullable=False)
+    tipo_operacion = db.Column(db.String(20), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('transportadora_id', 'mes', 'moneda_id', 'tipo_operacion',
+                            name='uq_honorarios_resumen_clave'),
+        db.Index('ix_honorarios_resumen_mes', 'mes'),
+    )
+
 
 class Movimiento(db.Model):
     __tablename__ = 'movimientos'
@@ -432,6 +461,14 @@ class CRT(db.Model):
     moneda = db.relationship('Moneda')
     usuario = db.relationship('Usuario')
 
+    __table_args__ = (
+        # get_next_crt_number y filtro por transportadora del listado
+        db.Index('ix_crts_transportadora_numero', 'transportadora_id', 'numero_crt'),
+        db.Index('ix_crts_estado_id', 'estado', 'id'),
+        db.Index('ix_crts_fecha_emision', 'fecha_emision'),
+        db.Index('ix_crts_remitente_id', 'remitente_id'),
+    )
+
 
 class CRT_Gasto(db.Model):
     __tablename__ = "crt_gastos"
@@ -448,6 +485,8 @@ class CRT_Gasto(db.Model):
     moneda_destinatario = db.relationship(
         'Moneda', foreign_keys=[moneda_destinatario_id])
 
+    __table_args__ = (db.Index('ix_crt_gastos_crt_id', 'crt_id'),)
+
 
 class MIC(db.Model):
     __tablename__ = "mics"
@@ -496,3 +535,10 @@ class MIC(db.Model):
     creado_en = db.Column(db.DateTime, default=datetime.utcnow)
 
     crt = db.relationship('CRT', backref=db.backref('mics', lazy=True))
+
+    __table_args__ = (
+        db.Index('ix_mics_crt_id', 'crt_id'),
+        db.Index('ix_mics_campo_6_fecha', 'campo_6_fecha'),
+        db.Index('ix_mics_creado_en', 'creado_en'),
+        db.Index('ix_mics_campo_4_estado', 'campo_4_estado'),
+    )
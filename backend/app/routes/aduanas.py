@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from app import db
+from sqlalchemy.orm import joinedload
 from app.security.decorators import roles_required, verify_authentication
 
 aduanas_bp = Blueprint('aduanas', __name__, url_prefix='/api/aduanas')
@@ -10,7 +11,7 @@ aduanas_bp.before_request(verify_authentication)
 # @roles_required('operador') # Opcional
 def get_aduanas():
     from app.models import Aduana
-    aduanas = Aduana.query.order_by(Aduana.nombre).all()
+    aduanas = Aduana.query.options(joinedload(Aduana.ciudad)).order_by(Aduana.nombre).all()
 
     return jsonify([{
         'id': a.id,
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.models import Ciudad, Pais
 from app import db
+from sqlalchemy.orm import joinedload
 from app.security.decorators import verify_authentication
 
 ciudades_bp = Blueprint('ciudades', __name__, url_prefix='/api/ciudades')
@@ -10,7 +11,7 @@ ciudades_bp.before_request(verify_authentication)
 @ciudades_bp.route('/', methods=['GET'])
 def listar_ciudades():
     pais_id = request.args.get('pais_id', type=int)
-    query = Ciudad.query
+    query = Ciudad.query.options(joinedload(Ciudad.pais))
     if pais_id:
         query = query.filter_by(pais_id=pais_id)
     ciudades = query.order_by(Ciudad.nombre).all()
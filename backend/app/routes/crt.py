@@ -1,27 +1,46 @@
 # ========== IMPORTS LIMPIOS ==========
-from flask import Blueprint, request, jsonify, send_file
-from sqlalchemy import text, or_
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
+from sqlalchemy import func, select, text
 from sqlalchemy.orm import joinedload, aliased, subqueryload
 from datetime import datetime, timedelta
 from io import BytesIO
 import logging
-import re  # ✅ necesario para _split_long_word y normalizaciones
+import tempfile
+import zipfile
 
-from app.models import db, CRT, CRT_Gasto, Remitente, Transportadora, Ciudad, Pais, Moneda
+from app.models import db, CRT, CRT_Gasto, MIC, Remitente, Transportadora, Ciudad, Pais, Moneda
 
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase.pdfmetrics import stringWidth
-
-from app.utils.layout_crt import dibujar_lineas_dinamicas, lineas
 from app.utils.crt_helpers import parse_number, limpiar_numericos, NUMERIC_FIELDS
-from app.utils.crt_serializers import to_dict_crt, to_dict_gasto
-from app.security.decorators import verify_authentication
+from app.utils.crt_serializers import to_dict_crt, to_dict_gasto, to_dict_crt_pdf
+from app.utils.pagination import InvalidCursor, cursor_requested, keyset_from_request
+from app.security.decorators import check_request_rate, rate_limit, verify_authentication
+from app.services import metrics, pdf_cache, search_service
+from app.routes.pdf_jobs import async_requested, enqueue_pdf_job
 
 
 crt_bp = Blueprint('crt', __name__, url_prefix='/api/crts')
 crt_bp.before_request(verify_authentication)
 logger = logging.getLogger(__name__)
+_crt_renderer = None
+
+# Exportación en lote
+BATCH_CHUNK_SIZE = 50
+BATCH_RATE_LIMIT_WINDOW = 600
+PDF_COMBINADO_MAX_MEMORY = 8 * 1024 * 1024
+
+
+# reportlab y las fuentes se cargan con el primer PDF, no al registrar el blueprint
+def _renderer():
+    global _crt_renderer
+    if _crt_renderer is None:
+        from app.utils.crt_renderer import CRTRenderer
+        _crt_renderer = CRTRenderer()
+    return _crt_renderer
+
+
+def _crt_pdf_options():
+    from app.utils.crt_renderer import crt_pdf_options
+    return crt_pdf_options()
 
 # ========== SIGUIENTE NÚMERO CRT ==========
 
@@ -61,111 +80,46 @@ def listar_crts():
         transportadora_id = request.args.get('transportadora_id', type=int)
         fecha_desde = request.args.get('fecha_desde', '', type=str)
         fecha_hasta = request.args.get('fecha_hasta', '', type=str)
+        vista = request.args.get('view', 'summary', type=str)
+
+        # Query base: proyección liviana de las columnas de la tabla
+        # (view=summary, por defecto) o el grafo completo (view=full)
+        completo = vista == 'full'
+        if completo:
+            query = CRT.query.options(
+                joinedload(CRT.remitente).joinedload(
+                    Remitente.ciudad).joinedload(Ciudad.pais),
+                joinedload(CRT.transportadora).joinedload(
+                    Transportadora.ciudad).joinedload(Ciudad.pais),
+                joinedload(CRT.destinatario).joinedload(
+                    Remitente.ciudad).joinedload(Ciudad.pais),
+                joinedload(CRT.consignatario).joinedload(
+                    Remitente.ciudad).joinedload(Ciudad.pais),
+                joinedload(CRT.notificar_a).joinedload(
+                    Remitente.ciudad).joinedload(Ciudad.pais),
+                joinedload(CRT.moneda),
+                subqueryload(CRT.gastos),
+                joinedload(CRT.ciudad_emision),
+                joinedload(CRT.pais_emision),
+                subqueryload(CRT.mics)
+            )
+        else:
+            query = _query_resumen_crts()
 
-        # Aliases para outerjoin
-        Rem = aliased(Remitente)
-        Trans = aliased(Transportadora)
-
-        # Query base con relaciones
-        query = CRT.query.options(
-            joinedload(CRT.remitente).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.transportadora).joinedload(
-                Transportadora.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.destinatario).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.consignatario).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.notificar_a).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.moneda),
-            subqueryload(CRT.gastos),
-            joinedload(CRT.ciudad_emision),
-            joinedload(CRT.pais_emision),
-            subqueryload(CRT.mics)
-        )
-
-        # Filtro de bÃºsqueda (outerjoin para no excluir nulos) + distinct para evitar duplicados
-        if buscar:
-            like = f"%{buscar}%"
-            query = (query
-                     .outerjoin(Rem, CRT.remitente)
-                     .outerjoin(Trans, CRT.transportadora)
-                     .filter(or_(
-                         CRT.numero_crt.ilike(like),
-                         Rem.nombre.ilike(like),
-                         Trans.nombre.ilike(like),
-                         CRT.detalles_mercaderia.ilike(like)
-                     ))
-                     .distinct())
-
-        if estado:
-            query = query.filter(CRT.estado == estado)
-
-        if transportadora_id:
-            query = query.filter(CRT.transportadora_id == transportadora_id)
-
-        if fecha_desde:
-            fecha_desde_dt = datetime.strptime(fecha_desde, '%Y-%m-%d')
-            query = query.filter(CRT.fecha_emision >= fecha_desde_dt)
-
-        if fecha_hasta:
-            # Inclusivo: hasta el final del dÃ­a
-            fecha_hasta_dt = datetime.strptime(
-                fecha_hasta, '%Y-%m-%d') + timedelta(days=1) - timedelta(microseconds=1)
-            query = query.filter(CRT.fecha_emision <= fecha_hasta_dt)
-
-        # Orden y paginaciÃ³n
-        query = query.order_by(CRT.id.desc())
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False)
-
-        crts_data = []
-        for crt in pagination.items:
-            crt_dict = to_dict_crt(crt)
-            crt_dict.update({
-                "ciudad_emision": crt.ciudad_emision.nombre if crt.ciudad_emision else "",
-                "pais_emision": crt.pais_emision.nombre if crt.pais_emision else "",
-
-                "remitente_ciudad": crt.remitente.ciudad.nombre if crt.remitente and crt.remitente.ciudad else "",
-                "remitente_pais": crt.remitente.ciudad.pais.nombre if crt.remitente and crt.remitente.ciudad and crt.remitente.ciudad.pais else "",
-
-                "destinatario_ciudad": crt.destinatario.ciudad.nombre if crt.destinatario and crt.destinatario.ciudad else "",
-                "destinatario_pais": crt.destinatario.ciudad.pais.nombre if crt.destinatario and crt.destinatario.ciudad and crt.destinatario.ciudad.pais else "",
-
-                "consignatario_ciudad": crt.consignatario.ciudad.nombre if crt.consignatario and crt.consignatario.ciudad else "",
-                "consignatario_pais": crt.consignatario.ciudad.pais.nombre if crt.consignatario and crt.consignatario.ciudad and crt.consignatario.ciudad.pais else "",
-
-                "transportadora_ciudad": crt.transportadora.ciudad.nombre if crt.transportadora and crt.transportadora.ciudad else "",
-                "transportadora_pais": crt.transportadora.ciudad.pais.nombre if crt.transportadora and crt.transportadora.ciudad and crt.transportadora.ciudad.pais else "",
-
-                # Información de MIC vinculado
-                "tiene_mic": len(crt.mics) > 0 if crt.mics else False,
-                "mics_count": len(crt.mics) if crt.mics else 0,
-                "mic_numero": crt.mics[0].campo_23_numero_campo2_crt if crt.mics and len(crt.mics) > 0 else None,
-                "mic_estado": crt.mics[0].campo_4_estado if crt.mics and len(crt.mics) > 0 else None,
-
-                "acciones": {
-                    "puede_editar": True,
-                    "puede_eliminar": crt.estado != "FINALIZADO",
-                    "puede_generar_pdf": True,
-                    "puede_generar_mic": True,
-                    "puede_duplicar": True
-                },
-                "urls": {
-                    "detalle": f"/api/crts/{crt.id}",
-                    "editar": f"/api/crts/{crt.id}",
-                    "eliminar": f"/api/crts/{crt.id}",
-                    "pdf": f"/api/crts/{crt.id}/pdf",
-                    "mic_pdf": f"/api/mic/generate_pdf_from_crt/{crt.id}",
-                    "duplicar": f"/api/crts/{crt.id}/duplicate"
-                }
-            })
-            crts_data.append(crt_dict)
+        query = _aplicar_filtros_crt(
+            query, buscar, estado, transportadora_id, fecha_desde, fecha_hasta)
 
-        result = {
-            "crts": crts_data,
-            "pagination": {
+        # Orden y paginaciÃ³n (?cursor= pagina por id sin OFFSET ni COUNT)
+        if cursor_requested():
+            cursor_page = keyset_from_request(query, (CRT.id,), per_page)
+            items = cursor_page.items
+            pagination_data = cursor_page.pagination(per_page)
+        else:
+            query = query.order_by(CRT.id.desc())
+            pagination = query.paginate(
+                page=page, per_page=per_page, error_out=False)
+            items = pagination.items
+            pagination_data = {
                 "page": pagination.page,
                 "pages": pagination.pages,
                 "per_page": pagination.per_page,
@@ -174,7 +128,16 @@ def listar_crts():
                 "has_next": pagination.has_next,
                 "prev_num": pagination.prev_num,
                 "next_num": pagination.next_num
-            },
+            }
+
+        if completo:
+            crts_data = [_crt_listado_completo(crt) for crt in items]
+        else:
+            crts_data = [_crt_resumen(row) for row in items]
+
+        result = {
+            "crts": crts_data,
+            "pagination": pagination_data,
             "filtros_aplicados": {
                 "buscar": buscar,
                 "estado": estado,
@@ -186,11 +149,153 @@ def listar_crts():
 
         return jsonify(result)
 
+    except InvalidCursor:
+        return jsonify({"error": "Cursor inválido"}), 400
     except Exception as e:
         logger.exception("Error listing CRTs with filters")
         return jsonify({"error": str(e)}), 500
 
 
+def _acciones_crt(crt_id, estado):
+    """Acciones y URLs de una fila del listado."""
+    return {
+        "acciones": {
+            "puede_editar": True,
+            "puede_eliminar": estado != "FINALIZADO",
+            "puede_generar_pdf": True,
+            "puede_generar_mic": True,
+            "puede_duplicar": True
+        },
+        "urls": {
+            "detalle": f"/api/crts/{crt_id}",
+            "editar": f"/api/crts/{crt_id}",
+            "eliminar": f"/api/crts/{crt_id}",
+            "pdf": f"/api/crts/{crt_id}/pdf",
+            "mic_pdf": f"/api/mic/generate_pdf_from_crt/{crt_id}",
+            "duplicar": f"/api/crts/{crt_id}/duplicate"
+        }
+    }
+
+
+def _crt_listado_completo(crt):
+    """Fila del listado con view=full: el CRT completo más ciudades/países y MIC."""
+    crt_dict = to_dict_crt(crt)
+    crt_dict.update({
+        "ciudad_emision": crt.ciudad_emision.nombre if crt.ciudad_emision else "",
+        "pais_emision": crt.pais_emision.nombre if crt.pais_emision else "",
+
+        "remitente_ciudad": crt.remitente.ciudad.nombre if crt.remitente and crt.remitente.ciudad else "",
+        "remitente_pais": crt.remitente.ciudad.pais.nombre if crt.remitente and crt.remitente.ciudad and crt.remitente.ciudad.pais else "",
+
+        "destinatario_ciudad": crt.destinatario.ciudad.nombre if crt.destinatario and crt.destinatario.ciudad else "",
+        "destinatario_pais": crt.destinatario.ciudad.pais.nombre if crt.destinatario and crt.destinatario.ciudad and crt.destinatario.ciudad.pais else "",
+
+        "consignatario_ciudad": crt.consignatario.ciudad.nombre if crt.consignatario and crt.consignatario.ciudad else "",
+        "consignatario_pais": crt.consignatario.ciudad.pais.nombre if crt.consignatario and crt.consignatario.ciudad and crt.consignatario.ciudad.pais else "",
+
+        "transportadora_ciudad": crt.transportadora.ciudad.nombre if crt.transportadora and crt.transportadora.ciudad else "",
+        "transportadora_pais": crt.transportadora.ciudad.pais.nombre if crt.transportadora and crt.transportadora.ciudad and crt.transportadora.ciudad.pais else "",
+
+        # Información de MIC vinculado
+        "tiene_mic": len(crt.mics) > 0 if crt.mics else False,
+        "mics_count": len(crt.mics) if crt.mics else 0,
+        "mic_numero": crt.mics[0].campo_23_numero_campo2_crt if crt.mics and len(crt.mics) > 0 else None,
+        "mic_estado": crt.mics[0].campo_4_estado if crt.mics and len(crt.mics) > 0 else None,
+
+        **_acciones_crt(crt.id, crt.estado)
+    })
+    return crt_dict
+
+
+def _query_resumen_crts():
+    """
+    Proyección con solo las columnas de la tabla del listado: nombres de las
+    partes por outerjoin y datos de MIC (cantidad y el primero) por subconsultas
+    agregadas, en una única consulta de una fila por CRT.
+    """
+    Rem = aliased(Remitente)
+    Dest = aliased(Remitente)
+    Trans = aliased(Transportadora)
+    PrimerMic = aliased(MIC)
+    mics_count = (select(func.count(MIC.id))
+                  .where(MIC.crt_id == CRT.id)
+                  .correlate(CRT)
+                  .scalar_subquery())
+    primer_mic_id = (select(func.min(MIC.id))
+                     .where(MIC.crt_id == CRT.id)
+                     .correlate(CRT)
+                     .scalar_subquery())
+    return (db.session.query(
+                CRT.id.label("id"),
+                CRT.numero_crt,
+                CRT.fecha_emision,
+                CRT.estado,
+                CRT.factura_exportacion,
+                CRT.remitente_id,
+                Rem.nombre.label("remitente"),
+                CRT.destinatario_id,
+                Dest.nombre.label("destinatario"),
+                CRT.transportadora_id,
+                Trans.nombre.label("transportadora"),
+                mics_count.label("mics_count"),
+                PrimerMic.campo_23_numero_campo2_crt.label("mic_numero"),
+                PrimerMic.campo_4_estado.label("mic_estado"))
+            .select_from(CRT)
+            .outerjoin(Rem, CRT.remitente_id == Rem.id)
+            .outerjoin(Dest, CRT.destinatario_id == Dest.id)
+            .outerjoin(Trans, CRT.transportadora_id == Trans.id)
+            .outerjoin(PrimerMic, PrimerMic.id == primer_mic_id))
+
+
+def _crt_resumen(row):
+    """Fila del listado con view=summary (ver _query_resumen_crts)."""
+    return {
+        "id": row.id,
+        "numero_crt": row.numero_crt or "",
+        "fecha_emision": row.fecha_emision.strftime('%Y-%m-%d') if row.fecha_emision else "",
+        "estado": row.estado or "",
+        "factura_exportacion": row.factura_exportacion or "",
+        "remitente_id": row.remitente_id,
+        "remitente": row.remitente or "",
+        "destinatario_id": row.destinatario_id,
+        "destinatario": row.destinatario or "",
+        "transportadora_id": row.transportadora_id,
+        "transportadora": row.transportadora or "",
+        "tiene_mic": row.mics_count > 0,
+        "mics_count": row.mics_count,
+        "mic_numero": row.mic_numero,
+        "mic_estado": row.mic_estado,
+        **_acciones_crt(row.id, row.estado),
+    }
+
+
+def _aplicar_filtros_crt(query, buscar="", estado="", transportadora_id=None, fecha_desde="", fecha_hasta=""):
+    """
+    Filtros compartidos por el listado y la exportación en lote.
+    Búsqueda indexada (search_service, sin joins ni distinct); fecha_hasta inclusivo.
+    """
+    if buscar:
+        query = query.filter(search_service.crt_filter(buscar))
+
+    if estado:
+        query = query.filter(CRT.estado == estado)
+
+    if transportadora_id:
+        query = query.filter(CRT.transportadora_id == transportadora_id)
+
+    if fecha_desde:
+        fecha_desde_dt = datetime.strptime(fecha_desde, '%Y-%m-%d')
+        query = query.filter(CRT.fecha_emision >= fecha_desde_dt)
+
+    if fecha_hasta:
+        # Inclusivo: hasta el final del día
+        fecha_hasta_dt = datetime.strptime(
+            fecha_hasta, '%Y-%m-%d') + timedelta(days=1) - timedelta(microseconds=1)
+        query = query.filter(CRT.fecha_emision <= fecha_hasta_dt)
+
+    return query
+
+
 # ========== âœ… NUEVO: OBTENER ESTADOS DISPONIBLES ==========
 
 
@@ -602,6 +707,7 @@ def editar_crt(crt_id):
                 db.session.add(g)
 
         db.session.commit()
+        pdf_cache.invalidate('crt', crt.id)
 
         # Crear honorario si el CRT se acaba de emitir (cambió a EMITIDO)
         if crt.estado == "EMITIDO":
@@ -658,6 +764,7 @@ def eliminar_crt(crt_id):
             }), 409
         
         # Si force=true o no hay MICs, proceder con la eliminación
+        mic_ids = [m.id for m in (crt.mics or [])]
         for mic in (crt.mics or []):
             db.session.delete(mic)
         
@@ -674,6 +781,9 @@ def eliminar_crt(crt_id):
         audit_event('crt.delete', user_id=g.current_user.id, metadata={'crt_id': crt_id})
 
         db.session.commit()
+        pdf_cache.invalidate('crt', crt_id)
+        for mic_id in mic_ids:
+            pdf_cache.invalidate('mic', mic_id)
         
         mensaje = "CRT eliminado"
         if mics_count > 0:
@@ -690,597 +800,247 @@ def eliminar_crt(crt_id):
 # ========== PDF CRT CORREGIDO CON JOINEDLOAD ==========
 
 @crt_bp.route('/<int:crt_id>/pdf', methods=['POST'])
+@rate_limit('pdf', 30, per=60)
 def generar_pdf_crt(crt_id):
     try:
         logger.info("Generating CRT PDF", extra={'crt_id': crt_id})
+        if async_requested():
+            CRT.query.get_or_404(crt_id)
+            return enqueue_pdf_job('crt', _render_crt_job, crt_id)
+
         # âœ… CARGAR CRT CON TODAS LAS RELACIONES
-        crt = CRT.query.options(
-            joinedload(CRT.remitente).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.transportadora).joinedload(
-                Transportadora.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.destinatario).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.consignatario).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.notificar_a).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.firma_destinatario).joinedload(
-                Remitente.ciudad).joinedload(Ciudad.pais),
-            joinedload(CRT.moneda),
-            joinedload(CRT.gastos).joinedload(CRT_Gasto.moneda_remitente),
-            joinedload(CRT.gastos).joinedload(CRT_Gasto.moneda_destinatario),
-            joinedload(CRT.ciudad_emision),
-            joinedload(CRT.pais_emision)
-        ).get_or_404(crt_id)
+        crt = CRT.query.options(*_crt_pdf_options()).get_or_404(crt_id)
 
-        # âœ… AHORA SÃ TENEMOS TODOS LOS DATOS CARGADOS
-        remitente = crt.remitente
-        transportadora = crt.transportadora
-        destinatario = crt.destinatario
-        consignatario = crt.consignatario
-        notificar_a = crt.notificar_a
-        firma_destinatario = crt.firma_destinatario
-
-        # âœ… DEBUG: Verificar que los datos estÃ©n cargados
-
-        output = BytesIO()
-        c = canvas.Canvas(output, pagesize=A4)
-        dibujar_lineas_dinamicas(c, lineas)
-
-        from app.utils.pdf_helpers import wrap_text_multiline, draw_text_fit_area, format_number, safe_get_attr
-
-        max_width = 250
-        max_width_trans = 250
-        x_trans = 300
-
-        # ===== Helpers de texto con particiÃ³n de palabras largas y centrado =====
-        def _split_long_word(word, fontName, fontSize, max_width):
-            from reportlab.pdfbase.pdfmetrics import stringWidth
-            if stringWidth(word, fontName, fontSize) <= max_width:
-                return [word]
-            seps = r'([/\-\.])'
-            parts = re.split(seps, word)
-            recombined, buf = [], ""
-            for p in parts:
-                test = (buf + p) if buf else p
-                if stringWidth(test, fontName, fontSize) <= max_width:
-                    buf = test
-                else:
-                    if buf:
-                        recombined.append(buf)
-                    if stringWidth(p, fontName, fontSize) <= max_width:
-                        buf = p
-                    else:
-                        tmp = ""
-                        for ch in p:
-                            t2 = tmp + ch
-                            if stringWidth(t2, fontName, fontSize) <= max_width:
-                                tmp = t2
-                            else:
-                                if tmp:
-                                    recombined.append(tmp)
-                                tmp = ch
-                        buf = tmp
-            if buf:
-                recombined.append(buf)
-            out = []
-            for chunk in recombined:
-                if stringWidth(chunk, fontName, fontSize) <= max_width:
-                    out.append(chunk)
-                else:
-                    tmp = ""
-                    for ch in chunk:
-                        t2 = tmp + ch
-                        if stringWidth(t2, fontName, fontSize) <= max_width:
-                            tmp = t2
-                        else:
-                            out.append(tmp)
-                            tmp = ch
-                    if tmp:
-                        out.append(tmp)
-            return out
-
-        def draw_text_fit_area_centered(
-            c, text, x, y_top, width, height,
-            fontName="Helvetica", min_font=5.0, max_font=9.0, leading_ratio=1.13, add_ellipsis=True
-        ):
-            from reportlab.pdfbase.pdfmetrics import stringWidth
-            text = (text or "").strip()
-            text = re.sub(r",(?!\s)", ", ", text)
-
-            font_size = max_font
-            usable_lines = None
-
-            while font_size >= min_font:
-                lines = []
-                for raw_line in text.split("\n"):
-                    words = raw_line.split()
-                    line = ""
-                    for w in words:
-                        pieces = _split_long_word(w, fontName, font_size, width)
-                        for piece in pieces:
-                            test = (line + " " + piece).strip() if line else piece
-                            if stringWidth(test, fontName, font_size) <= width:
-                                line = test
-                            else:
-                                if line:
-                                    lines.append(line)
-                                line = piece
-                    if line:
-                        lines.append(line)
-                line_h = font_size * leading_ratio
-                total_h = len(lines) * line_h
-                if total_h <= height:
-                    usable_lines = lines
-                    break
-                font_size -= 0.5
-
-            if usable_lines is None:
-                font_size = min_font
-                lines = []
-                for raw_line in text.split("\n"):
-                    words = raw_line.split()
-                    line = ""
-                    for w in words:
-                        pieces = _split_long_word(w, fontName, font_size, width)
-                        for piece in pieces:
-                            test = (line + " " + piece).strip() if line else piece
-                            if stringWidth(test, fontName, font_size) <= width:
-                                line = test
-                            else:
-                                if line:
-                                    lines.append(line)
-                                line = piece
-                    if line:
-                        lines.append(line)
-                line_h = font_size * leading_ratio
-                max_lines = max(1, int(height // line_h))
-                usable_lines = lines[:max_lines]
-                if add_ellipsis and usable_lines:
-                    last = usable_lines[-1]
-                    ell = "..."
-                    while last and stringWidth(last + ell, fontName, font_size) > width:
-                        last = last[:-1]
-                    usable_lines[-1] = (last + ell) if last else ell
-
-            c.setFont(fontName, font_size)
-            cy = y_top
-            cx = x + (width / 2.0)
-            for line in usable_lines:
-                c.drawCentredString(cx, cy, line)
-                cy -= font_size * leading_ratio
-            return cy
-
-        # =============== CAMPO 1: REMITENTE ===============
-        if remitente:
-            x_rem = 35
-            y_rem = 842 - 87 - 12
-
-            c.setFont("Helvetica-Bold", 7.98)
-            c.drawString(x_rem, y_rem, safe_get_attr(remitente, 'nombre'))
-
-            direccion_lines = wrap_text_multiline(
-                safe_get_attr(remitente, 'direccion'), "Helvetica", 6, max_width)
-            c.setFont("Helvetica", 6)
-            for linea_dir in direccion_lines:
-                y_rem -= 9
-                c.drawString(x_rem, y_rem, linea_dir)
-
-            y_rem -= 9
-            ciudad = safe_get_attr(remitente.ciudad, 'nombre') if remitente.ciudad else ""
-            pais = safe_get_attr(remitente.ciudad.pais, 'nombre') if remitente.ciudad and remitente.ciudad.pais else ""
-            c.drawString(x_rem, y_rem, f"{ciudad} - {pais}")
-
-            y_rem -= 9
-            tipo_doc = safe_get_attr(remitente, 'tipo_documento', 'RUC')
-            num_doc = safe_get_attr(remitente, 'numero_documento')
-            c.drawString(x_rem, y_rem, f"{tipo_doc}: {num_doc}")
-
-                # =============== CAMPO 3: TRANSPORTADORA ===============
-        if transportadora:
-            x_trans = 300
-            max_width_trans = 250
-            y_trans_top = 842 - 105 - 12
-            height_trans = 58
-
-            # --- Nombre en negrita ---
-            nombre = safe_get_attr(transportadora, 'nombre').strip()
-            if nombre:
-                c.setFont("Helvetica-Bold", 9)
-                c.drawCentredString(x_trans + max_width_trans/2, y_trans_top, nombre)
-                y_trans_top -= 12   # bajar la posiciÃ³n para no chocar con el resto
-
-            # --- Resto de datos ---
-            direccion = safe_get_attr(transportadora, 'direccion').strip()
-            tipo_doc_trans = safe_get_attr(transportadora, 'tipo_documento').strip()
-            num_doc_trans = safe_get_attr(transportadora, 'numero_documento').strip()
-            telefono = safe_get_attr(transportadora, 'telefono').strip()
-            ciudad_trans = safe_get_attr(transportadora.ciudad, 'nombre') if transportadora.ciudad else ""
-            pais_trans = safe_get_attr(transportadora.ciudad.pais, 'nombre') if (transportadora.ciudad and transportadora.ciudad.pais) else ""
-
-            bloque_lineas = []
-            if direccion:
-                bloque_lineas.append(direccion)
-            if tipo_doc_trans and num_doc_trans:
-                bloque_lineas.append(f"{tipo_doc_trans}: {num_doc_trans}")
-            if telefono:
-                bloque_lineas.append(f"Tel: {telefono}")
-            if ciudad_trans or pais_trans:
-                bloque_lineas.append(f"{ciudad_trans} - {pais_trans}")
-
-            bloque = "\n".join(bloque_lineas)
-
-            # resto en tamaÃ±o 7
-            draw_text_fit_area_centered(
-                c,
-                text=bloque,
-                x=x_trans,
-                y_top=y_trans_top,   # ya ajustado para no superponerse
-                width=max_width_trans,
-                height=height_trans - 12,  # reducir altura disponible
-                fontName="Helvetica",
-                min_font=7.0,
-                max_font=7.0,
-                leading_ratio=1.13,
-                add_ellipsis=True
-            )
+        pdf_bytes, hit = _obtener_pdf_crt(crt)
+        return _send_crt_pdf(BytesIO(pdf_bytes), crt, cache_status="HIT" if hit else "MISS")
 
+    except Exception as e:
+        logger.exception("Error generating CRT PDF", extra={'crt_id': crt_id})
+        return jsonify({"error": f"Error generando PDF: {str(e)}"}), 500
 
-        # =============== CAMPO 4: DESTINATARIO ===============
-        if destinatario:
-            x_dest = 35
-            y_dest = 842 - 147 - 12
-
-            c.setFont("Helvetica-Bold", 7.98)
-            c.drawString(x_dest, y_dest, safe_get_attr(destinatario, 'nombre'))
-
-            direccion_dest_lines = wrap_text_multiline(
-                safe_get_attr(destinatario, 'direccion'), "Helvetica", 6, max_width)
-            c.setFont("Helvetica", 6)
-            for linea_dir in direccion_dest_lines:
-                y_dest -= 9
-                c.drawString(x_dest, y_dest, linea_dir)
-
-            y_dest -= 9
-            ciudad_dest = safe_get_attr(destinatario.ciudad, 'nombre') if destinatario.ciudad else ""
-            pais_dest = safe_get_attr(destinatario.ciudad.pais, 'nombre') if destinatario.ciudad and destinatario.ciudad.pais else ""
-            c.drawString(x_dest, y_dest, f"{ciudad_dest} - {pais_dest}")
-
-            y_dest -= 9
-            tipo_doc_dest = safe_get_attr(destinatario, 'tipo_documento', 'RUC')
-            num_doc_dest = safe_get_attr(destinatario, 'numero_documento')
-            c.drawString(x_dest, y_dest, f"{tipo_doc_dest}: {num_doc_dest}")
-
-        # =============== CAMPO 6: CONSIGNATARIO ===============
-        if consignatario:
-            x_cons = 35
-            y_cons = 842 - 206 - 12
-
-            c.setFont("Helvetica-Bold", 7.98)
-            c.drawString(x_cons, y_cons, safe_get_attr(consignatario, 'nombre'))
-
-            direccion_cons_lines = wrap_text_multiline(
-                safe_get_attr(consignatario, 'direccion'), "Helvetica", 6, max_width)
-            c.setFont("Helvetica", 6)
-            for linea_dir in direccion_cons_lines:
-                y_cons -= 9
-                c.drawString(x_cons, y_cons, linea_dir)
-
-            y_cons -= 9
-            ciudad_cons = safe_get_attr(consignatario.ciudad, 'nombre') if consignatario.ciudad else ""
-            pais_cons = safe_get_attr(consignatario.ciudad.pais, 'nombre') if consignatario.ciudad and consignatario.ciudad.pais else ""
-            c.drawString(x_cons, y_cons, f"{ciudad_cons} - {pais_cons}")
-
-            y_cons -= 9
-            tipo_doc_cons = safe_get_attr(consignatario, 'tipo_documento', 'RUC')
-            num_doc_cons = safe_get_attr(consignatario, 'numero_documento')
-            c.drawString(x_cons, y_cons, f"{tipo_doc_cons}: {num_doc_cons}")
-
-        # =============== CAMPO 9: NOTIFICAR A ===============
-        if notificar_a:
-            x_notif = 35
-            y_notif = 842 - 267 - 12
-
-            c.setFont("Helvetica-Bold", 7.98)
-            c.drawString(x_notif, y_notif, safe_get_attr(notificar_a, 'nombre'))
-
-            direccion_notif_lines = wrap_text_multiline(
-                safe_get_attr(notificar_a, 'direccion'), "Helvetica", 6, max_width)
-            c.setFont("Helvetica", 6)
-            for linea_dir in direccion_notif_lines:
-                y_notif -= 9
-                c.drawString(x_notif, y_notif, linea_dir)
-
-            y_notif -= 9
-            ciudad_notif = safe_get_attr(notificar_a.ciudad, 'nombre') if notificar_a.ciudad else ""
-            pais_notif = safe_get_attr(notificar_a.ciudad.pais, 'nombre') if notificar_a.ciudad and notificar_a.ciudad.pais else ""
-            c.drawString(x_notif, y_notif, f"{ciudad_notif} - {pais_notif}")
-
-            y_notif -= 9
-            tipo_doc_notif = safe_get_attr(notificar_a, 'tipo_documento', 'RUC')
-            num_doc_notif = safe_get_attr(notificar_a, 'numero_documento')
-            c.drawString(x_notif, y_notif, f"{tipo_doc_notif}: {num_doc_notif}")
-
-        # ========== Campo 2: NÃºmero CRT ==========
-        x_num_crt = 400
-        y_num_crt_ill = 92
-        y_num_crt_pdf = 842 - y_num_crt_ill
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(x_num_crt, y_num_crt_pdf, str(crt.numero_crt))
-
-        # ========== Campo 5 ==========
-        x_emision = 300
-        y_emision = 842 - 168 - 20
-        texto_emision = "ASUNCION - PARAGUAY"
-        c.setFont("Helvetica", 8)
-        w_emision = stringWidth(texto_emision, "Helvetica", 8)
-        c.drawString(x_emision + (max_width_trans - w_emision) / 2, y_emision, texto_emision)
-
-        # ========== Campo 7 ==========
-        x_campo7 = 300
-        y_campo7 = y_emision - 50
-        ciudad7 = safe_get_attr(remitente.ciudad, 'nombre') if remitente and remitente.ciudad else ""
-        pais7 = safe_get_attr(remitente.ciudad.pais, 'nombre') if remitente and remitente.ciudad and remitente.ciudad.pais else ""
-        fecha7 = crt.fecha_emision.strftime('%d-%m-%Y') if crt.fecha_emision else ""
-        texto_campo7 = f"{ciudad7.upper()} - {pais7.upper()}-{fecha7}"
-        c.setFont("Helvetica", 8)
-        w_campo7 = stringWidth(texto_campo7, "Helvetica", 8)
-        c.drawString(x_campo7 + (max_width_trans - w_campo7) / 2, y_campo7, texto_campo7)
-
-        # ========== Campo 8 ==========
-        x_campo8 = 300
-        y_campo8 = y_campo7 - 37
-        # Usar lugar_entrega del CRT si existe, sino usar ciudad del destinatario
-        texto_campo8 = safe_get_attr(crt, 'lugar_entrega')
-        if not texto_campo8:
-            ciudad_dest_8 = safe_get_attr(destinatario.ciudad, 'nombre') if destinatario and destinatario.ciudad else ""
-            pais_dest_8 = safe_get_attr(destinatario.ciudad.pais, 'nombre') if destinatario and destinatario.ciudad and destinatario.ciudad.pais else ""
-            texto_campo8 = f"{ciudad_dest_8} - {pais_dest_8}"
-        plazo = safe_get_attr(crt, 'plazo_entrega')
-        if plazo:
-            texto_campo8 = f"{texto_campo8} (Plazo: {plazo})"
-        c.setFont("Helvetica", 8)
-        w_campo8 = stringWidth(texto_campo8, "Helvetica", 8)
-        c.drawString(x_campo8 + (max_width_trans - w_campo8) / 2, y_campo8, texto_campo8)
-
-        # ========== Campo 10 ==========
-        x_campo10 = 300
-        y_campo10 = y_campo8 - 37
-        texto_campo10 = safe_get_attr(crt, "transporte_sucesivos")
-        c.setFont("Helvetica", 7)
-        campo10_lines = wrap_text_multiline(texto_campo10, "Helvetica", 7, max_width_trans)
-        for linea in campo10_lines:
-            w_line = stringWidth(linea, "Helvetica", 7)
-            c.drawString(x_campo10 + (max_width_trans - w_line) / 2, y_campo10, linea)
-            y_campo10 -= 10
-
-        # ========== CAMPO 11: DETALLES DE MERCADERÃ A ==========
-        x11 = 34
-        y11 = 498
-        width11 = 375
-        height11 = 100
-        texto_campo11 = safe_get_attr(crt, 'detalles_mercaderia')
-
-        draw_text_fit_area(
-            c, texto_campo11,
-            x=x11, y=y11, width=width11, height=height11,
-            fontName="Helvetica", min_font=4.80, max_font=7.50, leading_ratio=1.13
-        )
 
-        # ========== CAMPO 15: COSTOS ==========
-        y_start = 370
-        row_height = 14
-        y_min = 250
+def _obtener_pdf_crt(crt):
+    """Devuelve (bytes, hit) usando la caché de PDFs; renderiza si no existe."""
+    cache_key = pdf_cache.build_key(
+        'crt', crt.id, to_dict_crt_pdf(crt), _renderer().layout_version)
+    return pdf_cache.get_or_render(cache_key, lambda: _renderer().render(crt))
 
-        x_tramo = 38
-        max_tramo_width = 140 - x_tramo - 5
-        x_remitente = 180
-        x_moneda = 210
-        x_destinatario = 280
 
-        moneda_codigo = (
-            safe_get_attr(crt.moneda, "codigo") if crt.moneda and hasattr(crt.moneda, "codigo")
-            else (safe_get_attr(crt.moneda, "nombre") if crt.moneda else "")
-        )
-        gastos = crt.gastos or []
-        y_row = y_start
-        max_rows = int((y_start - y_min) // row_height)
-        gastos_visibles = gastos[:max_rows]
-
-        c.setFont("Helvetica", 8)
-        for gasto in gastos_visibles:
-            tramo_text = safe_get_attr(gasto, 'tramo')
-            draw_text_fit_area(
-                c, tramo_text, x=x_tramo, y=y_row, width=max_tramo_width,
-                height=row_height - 1, fontName="Helvetica", min_font=5, max_font=8, leading_ratio=1.13
-            )
-            valor_remitente = format_number(gasto.valor_remitente, 2) if gasto.valor_remitente not in [None, "None", ""] else ""
-            valor_destinatario = format_number(gasto.valor_destinatario, 2) if gasto.valor_destinatario not in [None, "None", ""] else ""
-            c.setFont("Helvetica", 8)
-            c.drawRightString(x_remitente, y_row, valor_remitente)
-            c.drawString(x_moneda, y_row, moneda_codigo)
-            c.drawRightString(x_destinatario, y_row, valor_destinatario)
-            y_row -= row_height
-
-        y_total = 308
-        total_remitente = sum(float(g.valor_remitente or 0) for g in gastos_visibles if g.valor_remitente not in [None, "None", ""])
-        total_destinatario = sum(float(g.valor_destinatario or 0) for g in gastos_visibles if g.valor_destinatario not in [None, "None", ""])
-        c.setFont("Helvetica-Bold", 8)
-        if total_remitente:
-            c.drawRightString(x_remitente, y_total, format_number(total_remitente, 2))
-            c.drawString(x_moneda, y_total, moneda_codigo)
-        if total_destinatario:
-            c.drawRightString(x_destinatario, y_total, format_number(total_destinatario, 2))
-            c.drawString(x_moneda, y_total, moneda_codigo)
-
-        # ========== CAMPO 12: Peso bruto y neto ==========
-        x12_valor = 500
-        y12_pb = 505
-        y12_pn = 490
-
-        c.setFont("Helvetica", 10)
-        peso_bruto = format_number(crt.peso_bruto)
-        peso_neto = format_number(crt.peso_neto)
-        c.drawString(x12_valor, y12_pb, peso_bruto)
-        c.drawString(x12_valor, y12_pn, peso_neto)
-
-        # ========== CAMPO 13: Volumen ==========
-        x13 = 465
-        y13 = 472
-        volumen = format_number(crt.volumen, decimals=5)
-        c.setFont("Helvetica", 9)
-        c.drawString(x13, y13, volumen)
-
-        # ========== CAMPO 14: Incoterm, Moneda y Valor ==========
-        x14 = 415
-        y14 = 450
-        incoterm = safe_get_attr(crt, 'incoterm')
-        valor_incoterm = format_number(crt.valor_incoterm or 0, decimals=2)
-        c.setFont("Helvetica", 10)
-        c.drawString(x14, y14, incoterm)
-        c.drawString(x14 + 30, y14, moneda_codigo)
-        c.drawRightString(550, y14, valor_incoterm)
-
-        c.setFont("Helvetica", 9)
-        nombre_moneda = safe_get_attr(crt.moneda, 'nombre') if crt.moneda else ""
-        c.drawString(x14, y14 - 25, nombre_moneda.upper())
-
-        # Segundo Incoterm junto a la palabra "INCOTERM"
-        x_incoterm = 475
-        y_incoterm = y14 - 39
-        c.setFont("Helvetica", 10)
-        c.drawString(x_incoterm, y_incoterm, incoterm)
-
-        # ========== CAMPO 16: Declaración del valor ==========
-        x16 = 450
-        y16 = 842 - 442 - 8
-        c.setFont("Helvetica-Bold", 8)
-        valor_declarado_campo16 = crt.declaracion_mercaderia if crt.declaracion_mercaderia else ""
-        c.drawString(x16, y16, valor_declarado_campo16)
-
-        # ========== CAMPO 17: Documentos Anexos ==========
-        x_factura = 465
-        y_factura = 371
-        x_despacho = 465
-        y_despacho = 357
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(x_factura, y_factura, safe_get_attr(crt, 'factura_exportacion'))
-        c.drawString(x_despacho, y_despacho, safe_get_attr(crt, 'nro_despacho'))
-
-        # ========== CAMPO 18: Formalidades Aduana ==========
-        x18 = 305
-        y18 = 235
-        width18 = 410
-        height18 = 54
-        texto_campo18 = safe_get_attr(crt, 'formalidades_aduana')
-        draw_text_fit_area(
-            c, texto_campo18, x=x18, y=y18, width=width18,
-            height=height18, fontName="Helvetica", min_font=5.0, max_font=8.5, leading_ratio=1.13
-        )
+def _render_crt_job(crt_id):
+    """Trabajo de pdf_jobs (?async=1): devuelve (bytes, nombre de descarga)."""
+    crt = CRT.query.options(*_crt_pdf_options()).get(crt_id)
+    if crt is None:
+        raise LookupError(f"CRT {crt_id} no encontrado")
+    pdf_bytes, _ = _obtener_pdf_crt(crt)
+    return pdf_bytes, _crt_download_filename(crt)
 
-        # ========== CAMPO 19 ==========
-        x_moneda_19 = 110
-        x_valor_19 = 220
-        y_19 = 288
-        valor_flete_externo = ""
-        if gastos:
-            primer_gasto = gastos[0]
-            if primer_gasto.valor_remitente not in [None, "None", ""]:
-                valor_flete_externo = format_number(primer_gasto.valor_remitente, 2)
-            elif primer_gasto.valor_destinatario not in [None, "None", ""]:
-                valor_flete_externo = format_number(primer_gasto.valor_destinatario, 2)
-        codigo_moneda_19 = (
-            safe_get_attr(crt.moneda, "codigo") if crt.moneda and hasattr(crt.moneda, "codigo")
-            else (safe_get_attr(crt.moneda, "nombre") if crt.moneda else "")
-        )
-        c.setFont("Helvetica", 8)
-        c.drawString(x_moneda_19, y_19, codigo_moneda_19)
-        c.drawRightString(x_valor_19, y_19, valor_flete_externo)
-
-        # ========== CAMPO 20 ==========
-        x_moneda_20 = x_moneda_19
-        x_valor_20 = x_valor_19
-        y_20 = y_19 - 22
-        valor_reembolso = ""
-        if hasattr(crt, "valor_reembolso") and crt.valor_reembolso not in [None, "None", ""]:
-            valor_reembolso = format_number(crt.valor_reembolso, 2)
-        c.setFont("Helvetica", 8)
-        if valor_reembolso:
-            c.drawString(x_moneda_20, y_20, codigo_moneda_19)
-            c.drawRightString(x_valor_20, y_20, valor_reembolso)
-
-        # ========== CAMPO 21: REMITENTE ==========
-        x21_nombre = 38
-        y21_nombre = 230
-        x21_fecha = 100
-        y21_fecha = 193
-        remitente_nombre = safe_get_attr(remitente, 'nombre') if remitente else ""
-        fecha_remitente = crt.fecha_firma_remitente.strftime('%d/%m/%Y') if crt.fecha_firma_remitente else (crt.fecha_firma.strftime('%d/%m/%Y') if crt.fecha_firma else (crt.fecha_emision.strftime('%d/%m/%Y') if crt.fecha_emision else ""))
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(x21_nombre, y21_nombre, remitente_nombre)
-        c.setFont("Helvetica", 8)
-        c.drawString(x21_fecha, y21_fecha, fecha_remitente)
-
-        # ========== CAMPO 23: TRANSPORTADORA ==========
-        x23_nombre = 38
-        y23_nombre = 130
-        x23_fecha = 100
-        y23_fecha = 87
-        transportadora_nombre = safe_get_attr(transportadora, 'nombre') if transportadora else ""
-        fecha_transportador = crt.fecha_firma_transportador.strftime('%d/%m/%Y') if crt.fecha_firma_transportador else (crt.fecha_firma.strftime('%d/%m/%Y') if crt.fecha_firma else (crt.fecha_emision.strftime('%d/%m/%Y') if crt.fecha_emision else ""))
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(x23_nombre, y23_nombre, transportadora_nombre)
-        c.setFont("Helvetica", 8)
-        c.drawString(x23_fecha, y23_fecha, fecha_transportador)
-
-        # ========== CAMPO 24: DESTINATARIO ==========
-        x24_nombre = 305
-        y24_nombre = 152
-        x24_fecha = 380
-        y24_fecha = 87
-        # Usar firma_destinatario si existe, sino usar destinatario
-        firma_destinatario_obj = firma_destinatario if firma_destinatario else destinatario
-        destinatario_nombre = safe_get_attr(firma_destinatario_obj, 'nombre') if firma_destinatario_obj else ""
-        fecha_destinatario = crt.fecha_firma_destinatario.strftime('%d/%m/%Y') if crt.fecha_firma_destinatario else (crt.fecha_firma.strftime('%d/%m/%Y') if crt.fecha_firma else (crt.fecha_emision.strftime('%d/%m/%Y') if crt.fecha_emision else ""))
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(x24_nombre, y24_nombre, destinatario_nombre)
-        c.setFont("Helvetica", 8)
-        c.drawString(x24_fecha, y24_fecha, fecha_destinatario)
-
-        # ========== CAMPO 22: Declaraciones y observaciones ==========
-        x22 = 305
-        y22 = 243
-        width22 = 260
-        height22 = 60
-        texto_campo22 = safe_get_attr(crt, 'observaciones')
-        draw_text_fit_area(
-            c, texto_campo22, x=x22, y=y22, width=width22, height=height22,
-            fontName="Helvetica", min_font=5.0, max_font=8.0, leading_ratio=1.13
-        )
 
-        # Guarda y responde
-        c.save()
-        output.seek(0)
+# ========== PDF CRT EN LOTE ==========
+
 
+@crt_bp.route('/pdf/batch', methods=['POST'])
+def generar_pdf_crt_lote():
+    """
+    Exporta varios CRTs en un solo archivo.
+
+    Body JSON:
+      - ids: [1, 2, 3]  o bien  filtros: {q, estado, transportadora_id, fecha_desde, fecha_hasta}
+      - formato: "zip" (un PDF por CRT, por defecto) | "pdf" (un único PDF combinado)
+
+    Solo "zip" se transmite por partes: cada CRT se envía apenas se genera
+    (hasta PDF_BATCH_MAX_ITEMS). "pdf" renderiza el documento completo en un
+    archivo temporal antes de enviar el primer byte, así que admite menos
+    CRTs (PDF_BATCH_MAX_MERGED_ITEMS).
 
-        # Generar nombre de archivo segÃºn formato: CRT + Ãºltimos 4 dÃ­gitos del cÃ³digo + remitente + destinatario
-        last_four = crt.numero_crt[-4:] if len(crt.numero_crt or "") >= 4 else (crt.numero_crt or "")
-        sender = crt.remitente.nombre.replace(' ', '_').replace('/', '_').replace('\\', '_') if crt.remitente and crt.remitente.nombre else ""
-        recipient = crt.destinatario.nombre.replace(' ', '_').replace('/', '_').replace('\\', '_') if crt.destinatario and crt.destinatario.nombre else ""
-        download_filename = f"CRT_{last_four}_{sender}_{recipient}.pdf"
-        logger.debug("Sending CRT PDF %s", download_filename)
+    Límite propio (bucket `pdf-lote`): cada CRT del lote cuenta un lugar, hasta
+    PDF_BATCH_MAX_ITEMS CRTs por usuario cada 10 minutos.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        formato = (data.get('formato') or 'zip').lower()
+        if formato not in ('zip', 'pdf'):
+            return jsonify({"error": "Formato inválido (use 'zip' o 'pdf')"}), 400
 
-        return send_file(
-            output,
-            mimetype="application/pdf",
-            as_attachment=True,
-            download_name=download_filename
+        if formato == 'zip':
+            max_items = current_app.config.get('PDF_BATCH_MAX_ITEMS', 500)
+        else:
+            max_items = current_app.config.get('PDF_BATCH_MAX_MERGED_ITEMS', 100)
+        ids = data.get('ids')
+        if ids is not None and not isinstance(ids, list):
+            return jsonify({"error": "ids debe ser una lista de enteros"}), 400
+        query = db.session.query(CRT.id)
+        if ids is not None:
+            if not ids:
+                return jsonify({"error": "ids no puede estar vacío"}), 400
+            if len(ids) > max_items:
+                return jsonify({"error": f"El lote supera el máximo de {max_items} CRTs"}), 400
+            try:
+                ids = [int(i) for i in ids]
+            except (TypeError, ValueError):
+                return jsonify({"error": "ids debe ser una lista de enteros"}), 400
+            query = query.filter(CRT.id.in_(ids))
+        else:
+            try:
+                filtros = _filtros_lote(data.get('filtros'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            query = _aplicar_filtros_crt(query, **filtros)
+
+        crt_ids = [row[0] for row in query.order_by(CRT.id).limit(max_items + 1)]
+        if not crt_ids:
+            return jsonify({"error": "No se encontraron CRTs para exportar"}), 404
+        if len(crt_ids) > max_items:
+            return jsonify({"error": f"El lote supera el máximo de {max_items} CRTs"}), 400
+        bloqueado = check_request_rate(
+            'pdf-lote', current_app.config.get('PDF_BATCH_MAX_ITEMS', 500),
+            per=BATCH_RATE_LIMIT_WINDOW, cost=len(crt_ids))
+        if bloqueado is not None:
+            return bloqueado
+        if ids:
+            # Respetar el orden pedido por el cliente
+            orden = {crt_id: i for i, crt_id in enumerate(ids)}
+            crt_ids.sort(key=lambda crt_id: orden[crt_id])
+
+        logger.info("Generating CRT PDF batch", extra={'crt_count': len(crt_ids), 'formato': formato})
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if formato == 'zip':
+            generator = _stream_zip_crts(crt_ids)
+            mimetype, download_name = 'application/zip', f"CRTs_{stamp}.zip"
+        else:
+            generator = _stream_pdf_combinado_crts(crt_ids)
+            mimetype, download_name = 'application/pdf', f"CRTs_{stamp}.pdf"
+
+        return Response(
+            stream_with_context(generator),
+            mimetype=mimetype,
+            headers={
+                'Content-Disposition': f'attachment; filename="{download_name}"',
+                'X-CRT-Count': str(len(crt_ids)),
+            },
         )
 
     except Exception as e:
-        logger.exception("Error generating CRT PDF", extra={'crt_id': crt_id})
-        return jsonify({"error": f"Error generando PDF: {str(e)}"}), 500
+        logger.exception("Error generating CRT PDF batch")
+        return jsonify({"error": f"Error generando PDFs: {str(e)}"}), 500
+
+
+def _filtros_lote(filtros):
+    """Valida los filtros del lote; ValueError con el mensaje para el cliente."""
+    filtros = filtros or {}
+    if not isinstance(filtros, dict):
+        raise ValueError("filtros debe ser un objeto")
+
+    transportadora_id = filtros.get('transportadora_id')
+    if transportadora_id not in (None, ''):
+        try:
+            transportadora_id = int(transportadora_id)
+        except (TypeError, ValueError):
+            raise ValueError("transportadora_id debe ser un entero")
+    else:
+        transportadora_id = None
+
+    fechas = {}
+    for campo in ('fecha_desde', 'fecha_hasta'):
+        valor = filtros.get(campo) or ''
+        if valor:
+            try:
+                datetime.strptime(valor, '%Y-%m-%d')
+            except (TypeError, ValueError):
+                raise ValueError(f"{campo} debe tener el formato AAAA-MM-DD")
+        fechas[campo] = valor
+
+    return {
+        'buscar': str(filtros.get('q') or '').strip(),
+        'estado': str(filtros.get('estado') or ''),
+        'transportadora_id': transportadora_id,
+        **fechas,
+    }
+
+
+def _iter_crts_para_pdf(crt_ids, chunk_size=BATCH_CHUNK_SIZE):
+    """Carga los CRTs por bloques (una consulta con eager loading por bloque)."""
+    for i in range(0, len(crt_ids), chunk_size):
+        chunk = crt_ids[i:i + chunk_size]
+        por_id = {
+            crt.id: crt
+            for crt in CRT.query.options(*_crt_pdf_options()).filter(CRT.id.in_(chunk))
+        }
+        for crt_id in chunk:
+            if crt_id in por_id:
+                yield por_id[crt_id]
+
+
+class _StreamSink:
+    """Destino de escritura no posicionable: acumula bytes hasta que se drenan."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_zip_crts(crt_ids):
+    """ZIP de PDFs individuales: cada CRT se escribe y se envía antes del siguiente."""
+    sink = _StreamSink()
+    nombres = set()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for crt in _iter_crts_para_pdf(crt_ids):
+            pdf_bytes, _ = _obtener_pdf_crt(crt)
+            nombre = _crt_download_filename(crt)
+            if nombre in nombres:
+                nombre = nombre[:-4] + f"_{crt.id}.pdf"
+            nombres.add(nombre)
+            zf.writestr(nombre, pdf_bytes)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _stream_pdf_combinado_crts(crt_ids, chunk_bytes=64 * 1024):
+    """
+    Un único PDF con una página por CRT (la plantilla se guarda una sola vez).
+    reportlab necesita el documento completo antes de cerrarlo: pasados
+    PDF_COMBINADO_MAX_MEMORY bytes se escribe a disco en vez de a memoria.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=PDF_COMBINADO_MAX_MEMORY) as output:
+        with metrics.pdf_render_timer('crt'):
+            _renderer().render_many(_iter_crts_para_pdf(crt_ids), output)
+        output.seek(0)
+        while True:
+            data = output.read(chunk_bytes)
+            if not data:
+                break
+            yield data
+
+
+def _crt_download_filename(crt):
+    # Formato: CRT + últimos 4 dígitos del código + remitente + destinatario
+    last_four = crt.numero_crt[-4:] if len(crt.numero_crt or "") >= 4 else (crt.numero_crt or "")
+    sender = crt.remitente.nombre.replace(' ', '_').replace('/', '_').replace('\\', '_') if crt.remitente and crt.remitente.nombre else ""
+    recipient = crt.destinatario.nombre.replace(' ', '_').replace('/', '_').replace('\\', '_') if crt.destinatario and crt.destinatario.nombre else ""
+    return f"CRT_{last_four}_{sender}_{recipient}.pdf"
+
+
+def _send_crt_pdf(output, crt, cache_status):
+    download_filename = _crt_download_filename(crt)
+    logger.debug("Sending CRT PDF %s (cache %s)", download_filename, cache_status)
+    response = send_file(
+        output,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=download_filename
+    )
+    response.headers['X-PDF-Cache'] = cache_status
+    return response
 
 
 @crt_bp.route('/<int:crt_id>/campo15', methods=['GET'])
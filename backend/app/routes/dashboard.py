@@ -1,36 +1,64 @@
 from datetime import datetime
-from flask import Blueprint, jsonify
-from sqlalchemy import func
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import func, select
 
 from app import db
 from app.models import Pais, Ciudad, Remitente, Transportadora, Moneda, Aduana, Honorario, CRT, Usuario, MIC, RefreshToken
 from app.security.decorators import auth_required, verify_authentication
+from app.services import stats_cache
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
 dashboard_bp.before_request(verify_authentication)
 
 
+STATS_CACHE_KEY = 'dashboard'
+# Tablas contadas por /stats: un commit que escriba en ellas invalida la caché
+STATS_TABLES = ('paises', 'ciudades', 'remitentes', 'transportadoras', 'monedas', 'aduanas',
+                'honorarios', 'crts', 'usuarios', 'mics', 'refresh_tokens')
+stats_cache.watch(STATS_CACHE_KEY, STATS_TABLES)
+
+
+def _count(column):
+    return select(func.count(column)).scalar_subquery()
+
+
+def _calcular_stats():
+    """Todos los contadores en una sola sentencia (subconsultas escalares)."""
+    row = db.session.execute(select(
+        _count(Pais.id).label('paises'),
+        _count(Ciudad.id).label('ciudades'),
+        _count(Remitente.id).label('remitentes'),
+        _count(Transportadora.id).label('transportadoras'),
+        _count(Moneda.id).label('monedas'),
+        _count(Aduana.id).label('aduanas'),
+        _count(Honorario.id).label('honorarios'),
+        _count(CRT.id).label('crt'),
+        select(func.coalesce(func.sum(Honorario.monto), 0)).scalar_subquery().label('totalHonorarios'),
+        _count(Usuario.id).label('usuarios'),
+        _count(MIC.id).label('mic'),
+        select(func.count(func.distinct(RefreshToken.user_id)))
+        .where(RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > datetime.utcnow())
+        .scalar_subquery().label('usuariosConectados'),
+    )).one()
+    return {key: value or 0 for key, value in row._mapping.items()}
+
+
 @dashboard_bp.route('/stats', methods=['GET'])
 @auth_required
 def get_dashboard_stats():
-    """Get aggregated statistics for dashboard in a single query."""
+    """
+    Contadores del dashboard en una sola consulta, con caché de TTL corto
+    (DASHBOARD_STATS_TTL_SECONDS) y ETag para que el navegador revalide
+    con If-None-Match (304 si no cambiaron).
+    """
     try:
-        stats = {
-            'paises': db.session.query(func.count(Pais.id)).scalar() or 0,
-            'ciudades': db.session.query(func.count(Ciudad.id)).scalar() or 0,
-            'remitentes': db.session.query(func.count(Remitente.id)).scalar() or 0,
-            'transportadoras': db.session.query(func.count(Transportadora.id)).scalar() or 0,
-            'monedas': db.session.query(func.count(Moneda.id)).scalar() or 0,
-            'aduanas': db.session.query(func.count(Aduana.id)).scalar() or 0,
-            'honorarios': db.session.query(func.count(Honorario.id)).scalar() or 0,
-            'crt': db.session.query(func.count(CRT.id)).scalar() or 0,
-            'totalHonorarios': db.session.query(func.coalesce(func.sum(Honorario.monto), 0)).scalar() or 0,
-            'usuarios': db.session.query(func.count(Usuario.id)).scalar() or 0,
-            'mic': db.session.query(func.count(MIC.id)).scalar() or 0,
-            'usuariosConectados': db.session.query(func.count(func.distinct(RefreshToken.user_id)))
-                                    .filter(RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > datetime.utcnow())
-                                    .scalar() or 0,
-        }
-        return jsonify(stats)
+        stats, etag = stats_cache.get_or_compute(
+            STATS_CACHE_KEY, _calcular_stats,
+            ttl=current_app.config.get('DASHBOARD_STATS_TTL_SECONDS', 30))
+        response = jsonify(stats)
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,14 +1,16 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.orm import joinedload
 from app.models import Honorario, Transportadora, Moneda
 from app import db
 from app.security.decorators import verify_authentication
+from app.utils.pagination import InvalidCursor, cursor_requested, keyset_from_request
 
 honorarios_bp = Blueprint('honorarios', __name__, url_prefix='/api/honorarios')
 honorarios_bp.before_request(verify_authentication)
 
 @honorarios_bp.route('/', methods=['GET'])
 def listar_honorarios():
-    from app.models import CRT, MIC
+    from app.models import CRT
     
     # Parámetros de paginación
     page = request.args.get('page', 1, type=int)
@@ -19,8 +21,15 @@ def listar_honorarios():
     tipo_operacion = request.args.get('tipo_operacion', '', type=str)
     transportadora_id = request.args.get('transportadora_id', type=int)
     
-    # Query base
-    query = Honorario.query
+    # Query base: relaciones a uno en el mismo SELECT, MICs de los CRTs en
+    # una consulta aparte (cantidad de consultas fija, sin importar per_page)
+    query = Honorario.query.options(
+        joinedload(Honorario.transportadora),
+        joinedload(Honorario.moneda),
+        joinedload(Honorario.crt).joinedload(CRT.remitente),
+        joinedload(Honorario.crt).joinedload(CRT.destinatario),
+        joinedload(Honorario.crt).selectinload(CRT.mics),
+    )
     
     # Aplicar filtros
     if tipo_operacion:
@@ -38,12 +47,21 @@ def listar_honorarios():
             )
         )
     
-    # Ordenar y paginar
-    query = query.order_by(Honorario.id.desc())
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Ordenar y paginar (?cursor= pagina por id sin OFFSET ni COUNT)
+    cursor_page = None
+    if cursor_requested():
+        try:
+            cursor_page = keyset_from_request(query, (Honorario.id,), per_page)
+        except InvalidCursor:
+            return jsonify({"error": "Cursor inválido"}), 400
+        items = cursor_page.items
+    else:
+        query = query.order_by(Honorario.id.desc())
+        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+        items = paginated.items
     
     resultado = []
-    for h in paginated.items:
+    for h in items:
         crt_data = h.crt
         mic_data = crt_data.mics[0] if (crt_data and crt_data.mics) else None
         
@@ -67,6 +85,9 @@ def listar_honorarios():
             "importador": crt_data.destinatario.nombre if (crt_data and crt_data.destinatario) else "N/A",
         })
     
+    if cursor_page is not None:
+        return jsonify({"items": resultado, **cursor_page.pagination(per_page)})
+
     return jsonify({
         "items": resultado,
         "total": paginated.total,
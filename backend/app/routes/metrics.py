@@ -0,0 +1,28 @@
+import hmac
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from app.services import metrics
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api')
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def exponer_metricas():
+    """
+    Métricas en formato de texto de Prometheus. Sin sesión de usuario: el
+    scraper envía `Authorization: Bearer <METRICS_TOKEN>`. Sin METRICS_TOKEN
+    solo se sirven en DEBUG/TESTING.
+    """
+    if not metrics.is_enabled():
+        return jsonify({'error': 'Métricas deshabilitadas'}), 503
+
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token and not (current_app.config.get('DEBUG') or current_app.config.get('TESTING')):
+        return jsonify({'error': 'No autorizado'}), 401
+    if token:
+        recibido = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(recibido.encode(), token.encode()):
+            return jsonify({'error': 'No autorizado'}), 401
+
+    return Response(metrics.render_latest(), content_type=metrics.CONTENT_TYPE)
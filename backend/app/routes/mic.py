@@ -1,14 +1,16 @@
 ﻿# ========== IMPORTS COMPLETOS Y ORDENADOS ==========
-import os
 import re
 import tempfile
 import logging
-from flask import Blueprint, request, jsonify, send_file
+import time
+from io import BytesIO
+from flask import Blueprint, current_app, request, jsonify, send_file
 from sqlalchemy.orm import joinedload
 from datetime import datetime
 from app.models import db, MIC, CRT, CRT_Gasto, Ciudad, Transportadora, Remitente
-from app.utils.layout_mic import generar_micdta_pdf_con_datos_y_diagnostico
-from app.security.decorators import verify_authentication
+from app.security.decorators import rate_limit, verify_authentication
+from app.routes.pdf_jobs import async_requested, enqueue_pdf_job
+from app.services import metrics
 
 
 def _extract_precintos(text):
@@ -25,6 +27,62 @@ mic_bp = Blueprint('mic', __name__, url_prefix='/api/mic')
 mic_bp.before_request(verify_authentication)
 logger = logging.getLogger(__name__)
 
+# ========== ENVÍO DE PDF ==========
+
+
+def send_mic_pdf(pdf_bytes, download_name, as_attachment=True):
+    """
+    Envía un PDF MIC ya generado directamente desde memoria.
+
+    Con MIC_PDF_TEMPFILE=True el PDF se vuelca a un archivo temporal anónimo
+    (se elimina solo al cerrarse, aunque el cliente corte la descarga) en
+    lugar de mantenerse en memoria durante el envío.
+    """
+    if current_app.config.get('MIC_PDF_TEMPFILE', False):
+        tmp_file = tempfile.TemporaryFile(suffix='.pdf')
+        tmp_file.write(pdf_bytes)
+        tmp_file.seek(0)
+        return send_file(
+            tmp_file,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            mimetype='application/pdf'
+        )
+
+    return send_file(
+        BytesIO(pdf_bytes),
+        as_attachment=as_attachment,
+        download_name=download_name,
+        mimetype='application/pdf'
+    )
+
+
+def generar_micdta_pdf_con_datos(*args, **kwargs):
+    # Import diferido: layout_mic carga reportlab y registra las fuentes
+    from app.utils.layout_mic import generar_micdta_pdf_con_datos as generar
+    return generar(*args, **kwargs)
+
+
+def diagnostico_requested():
+    return request.args.get('diagnostico', '').lower() in ('1', 'true')
+
+
+def mic_pdf_diagnostico(mic_data):
+    """
+    Modo diagnóstico (?diagnostico=1): renderiza el MIC sin caché y devuelve
+    en JSON las métricas de ajuste de cada campo en lugar del PDF.
+    """
+    diagnostico = {}
+    inicio = time.perf_counter()
+    with metrics.pdf_render_timer('mic'):
+        pdf_bytes = generar_micdta_pdf_con_datos(mic_data, diagnostico=diagnostico)
+    return jsonify({
+        "render_ms": round((time.perf_counter() - inicio) * 1000, 2),
+        "bytes": len(pdf_bytes),
+        "campos": diagnostico,
+    })
+
+
 # ========== UTIL MULTILINEA ==========
 
 
@@ -217,6 +275,7 @@ def to_dict_mic(mic):
 
 
 @mic_bp.route('/generate_pdf_from_crt/<int:crt_id>', methods=['POST'])
+@rate_limit('pdf', 30, per=60)
 def generate_pdf_from_crt(crt_id):
     try:
         datos = request.get_json()
@@ -229,31 +288,35 @@ def generate_pdf_from_crt(crt_id):
         if 'campo_38' in datos:
             datos['campo_38_datos_campo11_crt'] = datos.pop('campo_38')
 
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-            filename = tmp_file.name
+        if diagnostico_requested():
+            return mic_pdf_diagnostico(datos)
+        if async_requested():
+            return enqueue_pdf_job('mic', _render_mic_desde_crt_job, crt_id, datos)
 
-        from app.utils.layout_mic import generar_micdta_pdf_con_datos
-        generar_micdta_pdf_con_datos(datos, filename)
+        with metrics.pdf_render_timer('mic'):
+            pdf_bytes = generar_micdta_pdf_con_datos(datos)
 
-        if not os.path.exists(filename):
-            logger.error("MIC PDF generation failed, file not found: %s", filename)
+        if not pdf_bytes:
+            logger.error("MIC PDF generation returned no data", extra={'crt_id': crt_id})
             return {"error": "PDF no generado"}, 500
 
-        file_size = os.path.getsize(filename)
-        logger.debug("Sending MIC PDF %s (%d bytes)", filename, file_size)
-
-        response = send_file(
-            filename,
-            as_attachment=True,
-            download_name=f"mic_{crt_id}.pdf",
-            mimetype='application/pdf'
-        )
-        response.call_on_close(lambda: os.unlink(filename))
-        return response
+        logger.debug("Sending MIC PDF for CRT %s (%d bytes)", crt_id, len(pdf_bytes))
+        return send_mic_pdf(pdf_bytes, download_name=f"mic_{crt_id}.pdf")
 
     except Exception as e:
         logger.exception("Error generating MIC PDF for CRT", extra={'crt_id': crt_id})
         return {"error": str(e)}, 500
+
+
+def _render_mic_desde_crt_job(crt_id, datos):
+    """Trabajo de pdf_jobs (?async=1): devuelve (bytes, nombre de descarga)."""
+    with metrics.pdf_render_timer('mic'):
+        pdf_bytes = generar_micdta_pdf_con_datos(datos)
+    if not pdf_bytes:
+        raise RuntimeError("PDF no generado")
+    return pdf_bytes, f"mic_{crt_id}.pdf"
+
+
 @mic_bp.route('/cargar-datos-crt/<int:crt_id>', methods=['GET'])
 def cargar_datos_crt(crt_id):
     """Carga datos completos de un CRT y los adapta al formato MIC."""
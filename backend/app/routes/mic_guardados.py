@@ -1,17 +1,20 @@
 # ========== RUTAS PARA MICs GUARDADOS ==========
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 from sqlalchemy.orm import joinedload
-from datetime import datetime, timedelta
+from datetime import datetime
 from app.models import db, MIC, CRT, Ciudad, Transportadora, Remitente
-from app.utils.layout_mic import generar_micdta_pdf_con_datos
-import tempfile
+from app.services import mic_stats_service, pdf_cache, search_service
+from app.utils.pagination import InvalidCursor, cursor_requested, keyset_from_request
 import logging
-import os
 import re
-from app.security.decorators import verify_authentication
+from app.security.decorators import rate_limit, verify_authentication
 
 
-from app.routes.mic import _extract_precintos, _strip_precintos
+from app.routes.mic import (
+    _extract_precintos, _strip_precintos, diagnostico_requested, generar_micdta_pdf_con_datos,
+    mic_pdf_diagnostico, send_mic_pdf,
+)
+from app.routes.pdf_jobs import async_requested, enqueue_pdf_job
 
 logger = logging.getLogger(__name__)
 
@@ -178,8 +181,8 @@ def listar_mics_guardados():
             query = query.filter(MIC.campo_4_estado.ilike(f'%{estado}%'))
 
         if numero_carta:
-            query = query.filter(
-                MIC.campo_23_numero_campo2_crt.ilike(f'%{numero_carta}%'))
+            query = query.filter(search_service.match_any(
+                numero_carta, MIC.campo_23_numero_campo2_crt))
 
         if fecha_desde:
             try:
@@ -197,19 +200,32 @@ def listar_mics_guardados():
             except ValueError:
                 pass
 
-        # Ordenar por fecha de creaciÃ³n (mÃ¡s recientes primero)
-        query = query.order_by(MIC.id.desc())
-
-        # Paginar
-        mics_paginados = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        # Ordenar por fecha de creaciÃ³n (mÃ¡s recientes primero) y paginar;
+        # ?cursor= pagina por id sin OFFSET ni COUNT
+        if cursor_requested():
+            cursor_page = keyset_from_request(query, (MIC.id,), per_page)
+            items = cursor_page.items
+            pagination_data = cursor_page.pagination(per_page)
+        else:
+            query = query.order_by(MIC.id.desc())
+            mics_paginados = query.paginate(
+                page=page,
+                per_page=per_page,
+                error_out=False
+            )
+            items = mics_paginados.items
+            pagination_data = {
+                "page": mics_paginados.page,
+                "pages": mics_paginados.pages,
+                "per_page": mics_paginados.per_page,
+                "total": mics_paginados.total,
+                "has_next": mics_paginados.has_next,
+                "has_prev": mics_paginados.has_prev
+            }
 
         # Formatear resultados
         mics_data = []
-        for mic in mics_paginados.items:
+        for mic in items:
             mic_data = {
                 "id": mic.id,
                 "crt_id": mic.crt_id,
@@ -228,14 +244,7 @@ def listar_mics_guardados():
 
         resultado = {
             "mics": mics_data,
-            "pagination": {
-                "page": mics_paginados.page,
-                "pages": mics_paginados.pages,
-                "per_page": mics_paginados.per_page,
-                "total": mics_paginados.total,
-                "has_next": mics_paginados.has_next,
-                "has_prev": mics_paginados.has_prev
-            },
+            "pagination": pagination_data,
             "filtros_aplicados": {
                 "estado": estado,
                 "numero_carta": numero_carta,
@@ -244,9 +253,11 @@ def listar_mics_guardados():
             }
         }
 
-        logger.debug("Listing MICs page=%s total=%s", resultado['pagination']['page'], resultado['pagination']['total'])
+        logger.debug("Listing MICs page=%s total=%s", resultado['pagination'].get('page'), resultado['pagination']['total'])
         return jsonify(resultado)
 
+    except InvalidCursor:
+        return jsonify({"error": "Cursor inválido"}), 400
     except Exception as e:
         logger.exception("Error listing stored MICs")
         return jsonify({"error": str(e)}), 500
@@ -383,6 +394,7 @@ def actualizar_mic(mic_id):
                 campos_actualizados.append('campo_9_datos_transporte')
 
         db.session.commit()
+        pdf_cache.invalidate('mic', mic.id)
         # Sincronizar número de MIC con Honorarios si cambió
         nuevo_numero = mic.campo_23_numero_campo2_crt
         if nuevo_numero and nuevo_numero != numero_anterior and mic.crt_id:
@@ -442,6 +454,7 @@ def eliminar_mic(mic_id):
         audit_event('mic.delete', user_id=g.current_user.id, metadata={'mic_id': mic.id, 'hard_delete': hard_delete})
         
         db.session.commit()
+        pdf_cache.invalidate('mic', mic_id)
 
         return jsonify({
             "message": mensaje,
@@ -472,6 +485,7 @@ def restaurar_mic(mic_id):
 
         mic.campo_4_estado = "PROVISORIO"
         db.session.commit()
+        pdf_cache.invalidate('mic', mic.id)
 
         return jsonify({
             "message": "MIC restaurado exitosamente",
@@ -490,6 +504,7 @@ def restaurar_mic(mic_id):
 
 
 @mic_guardados_bp.route('/<int:mic_id>/pdf', methods=['GET'])
+@rate_limit('pdf', 30, per=60)
 def generar_pdf_mic_guardado(mic_id):
     """
     âœ… Genera PDF de un MIC guardado
@@ -499,162 +514,166 @@ def generar_pdf_mic_guardado(mic_id):
 
         mic = MIC.query.get_or_404(mic_id)
 
-        # Convertir MIC a dict para el generador de PDF
-        def safe_str(val):
-            return "" if val is None else str(val)
+        if diagnostico_requested():
+            return mic_pdf_diagnostico(_mic_data_para_pdf(mic))
+        if async_requested():
+            return enqueue_pdf_job('mic', _render_mic_guardado_job, mic.id)
 
-        mic_data = {
-            "campo_1_transporte": safe_str(mic.campo_1_transporte),
-            "campo_2_numero": safe_str(mic.campo_2_numero),
-            "campo_3_transporte": safe_str(mic.campo_3_transporte),
-            "campo_4_estado": safe_str(mic.campo_4_estado),
-            "campo_5_hoja": safe_str(mic.campo_5_hoja),
-            "campo_6_fecha": mic.campo_6_fecha.strftime('%Y-%m-%d') if mic.campo_6_fecha else "",
-            "campo_7_pto_seguro": safe_str(mic.campo_7_pto_seguro),
-            "campo_8_destino": safe_str(mic.campo_8_destino),
-            "campo_9_datos_transporte": safe_str(mic.campo_9_datos_transporte),
-            "campo_10_numero": safe_str(mic.campo_10_numero),
-            "campo_11_placa": safe_str(mic.campo_11_placa),
-            "campo_12_modelo_chasis": safe_str(mic.campo_12_modelo_chasis),
-            "campo_13_siempre_45": safe_str(mic.campo_13_siempre_45),
-            "campo_14_anio": safe_str(mic.campo_14_anio),
-            "campo_15_placa_semi": safe_str(mic.campo_15_placa_semi),
-            "campo_16_asteriscos_1": safe_str(mic.campo_16_asteriscos_1),
-            "campo_17_asteriscos_2": safe_str(mic.campo_17_asteriscos_2),
-            "campo_18_asteriscos_3": safe_str(mic.campo_18_asteriscos_3),
-            "campo_19_asteriscos_4": safe_str(mic.campo_19_asteriscos_4),
-            "campo_20_asteriscos_5": safe_str(mic.campo_20_asteriscos_5),
-            "campo_21_asteriscos_6": safe_str(mic.campo_21_asteriscos_6),
-            "campo_22_asteriscos_7": safe_str(mic.campo_22_asteriscos_7),
-            "campo_23_numero_campo2_crt": safe_str(mic.campo_23_numero_campo2_crt),
-            "campo_24_aduana": safe_str(mic.campo_24_aduana),
-            "campo_25_moneda": safe_str(mic.campo_25_moneda),
-            "campo_26_pais": safe_str(mic.campo_26_pais),
-            "campo_27_valor_campo16": safe_str(mic.campo_27_valor_campo16),
-            "campo_28_total": safe_str(mic.campo_28_total),
-            "campo_29_seguro": safe_str(mic.campo_29_seguro),
-            "campo_30_tipo_bultos": safe_str(mic.campo_30_tipo_bultos),
-            "campo_31_cantidad": safe_str(mic.campo_31_cantidad),
-            "campo_32_peso_bruto": safe_str(mic.campo_32_peso_bruto),
-            "campo_33_datos_campo1_crt": safe_str(mic.campo_33_datos_campo1_crt),
-            "campo_34_datos_campo4_crt": safe_str(mic.campo_34_datos_campo4_crt),
-            "campo_35_datos_campo6_crt": safe_str(mic.campo_35_datos_campo6_crt),
-            "campo_36_factura_despacho": safe_str(mic.campo_36_factura_despacho),
-            "campo_37_valor_manual": safe_str(mic.campo_37_valor_manual),
-            "campo_38_datos_campo11_crt": safe_str(mic.campo_38_datos_campo11_crt),
-            "campo_40_tramo": safe_str(mic.campo_40_tramo) + (f"\nCHOFER: {mic.chofer}" if mic.chofer else "")
-        }
-
-        # Generar archivo temporal
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-            filename = tmp_file.name
-
-        generar_micdta_pdf_con_datos(mic_data, filename)
-
-        # Función para sanitizar nombres de archivo
-        def sanitize_filename(text):
-            if not text:
-                return "N-A"
-            # Tomar solo primeras palabras si es muy largo
-            text = str(text).strip()
-            if len(text) > 50:
-                text = text[:50]
-            # Eliminar caracteres inválidos
-            import re
-            text = re.sub(r'[<>:"/\\|?*\n\r]', '', text)
-            text = text.replace('  ', ' ').strip()
-            return text or "N-A"
-
-        # Formato: [Transportadora] - [Nº CRT] - [Exportador] - [Importador]
-        transportadora = sanitize_filename(mic.campo_1_transporte)
-        numero_crt = sanitize_filename(mic.campo_23_numero_campo2_crt) or f"MIC-{mic.id}"
-        exportador = sanitize_filename(mic.campo_33_datos_campo1_crt)
-        importador = sanitize_filename(mic.campo_34_datos_campo4_crt)
-        
-        download_name = f"{transportadora} - {numero_crt} - {exportador} - {importador}.pdf"
+        pdf_bytes, hit, download_name = _pdf_mic_guardado(mic)
         logger.debug("Sending stored MIC PDF %s", download_name)
 
-        response = send_file(
-            filename,
-            as_attachment=not request.args.get('inline', 'false').lower() == 'true',
+        response = send_mic_pdf(
+            pdf_bytes,
             download_name=download_name,
-            mimetype='application/pdf'
+            as_attachment=not request.args.get('inline', 'false').lower() == 'true'
         )
-
-        # Limpiar archivo temporal despuÃ©s de enviarlo
-        response.call_on_close(lambda: os.unlink(filename))
-
+        response.headers['X-PDF-Cache'] = "HIT" if hit else "MISS"
         return response
 
     except Exception as e:
         logger.exception("Error generating stored MIC PDF", extra={'mic_id': mic_id})
         return jsonify({"error": str(e)}), 500
 
+
+def _mic_data_para_pdf(mic):
+    """Convierte un MIC guardado al dict que recibe el generador de PDF."""
+    def safe_str(val):
+        return "" if val is None else str(val)
+
+    mic_data = {
+        "campo_1_transporte": safe_str(mic.campo_1_transporte),
+        "campo_2_numero": safe_str(mic.campo_2_numero),
+        "campo_3_transporte": safe_str(mic.campo_3_transporte),
+        "campo_4_estado": safe_str(mic.campo_4_estado),
+        "campo_5_hoja": safe_str(mic.campo_5_hoja),
+        "campo_6_fecha": mic.campo_6_fecha.strftime('%Y-%m-%d') if mic.campo_6_fecha else "",
+        "campo_7_pto_seguro": safe_str(mic.campo_7_pto_seguro),
+        "campo_8_destino": safe_str(mic.campo_8_destino),
+        "campo_9_datos_transporte": safe_str(mic.campo_9_datos_transporte),
+        "campo_10_numero": safe_str(mic.campo_10_numero),
+        "campo_11_placa": safe_str(mic.campo_11_placa),
+        "campo_12_modelo_chasis": safe_str(mic.campo_12_modelo_chasis),
+        "campo_13_siempre_45": safe_str(mic.campo_13_siempre_45),
+        "campo_14_anio": safe_str(mic.campo_14_anio),
+        "campo_15_placa_semi": safe_str(mic.campo_15_placa_semi),
+        "campo_16_asteriscos_1": safe_str(mic.campo_16_asteriscos_1),
+        "campo_17_asteriscos_2": safe_str(mic.campo_17_asteriscos_2),
+        "campo_18_asteriscos_3": safe_str(mic.campo_18_asteriscos_3),
+        "campo_19_asteriscos_4": safe_str(mic.campo_19_asteriscos_4),
+        "campo_20_asteriscos_5": safe_str(mic.campo_20_asteriscos_5),
+        "campo_21_asteriscos_6": safe_str(mic.campo_21_asteriscos_6),
+        "campo_22_asteriscos_7": safe_str(mic.campo_22_asteriscos_7),
+        "campo_23_numero_campo2_crt": safe_str(mic.campo_23_numero_campo2_crt),
+        "campo_24_aduana": safe_str(mic.campo_24_aduana),
+        "campo_25_moneda": safe_str(mic.campo_25_moneda),
+        "campo_26_pais": safe_str(mic.campo_26_pais),
+        "campo_27_valor_campo16": safe_str(mic.campo_27_valor_campo16),
+        "campo_28_total": safe_str(mic.campo_28_total),
+        "campo_29_seguro": safe_str(mic.campo_29_seguro),
+        "campo_30_tipo_bultos": safe_str(mic.campo_30_tipo_bultos),
+        "campo_31_cantidad": safe_str(mic.campo_31_cantidad),
+        "campo_32_peso_bruto": safe_str(mic.campo_32_peso_bruto),
+        "campo_33_datos_campo1_crt": safe_str(mic.campo_33_datos_campo1_crt),
+        "campo_34_datos_campo4_crt": safe_str(mic.campo_34_datos_campo4_crt),
+        "campo_35_datos_campo6_crt": safe_str(mic.campo_35_datos_campo6_crt),
+        "campo_36_factura_despacho": safe_str(mic.campo_36_factura_despacho),
+        "campo_37_valor_manual": safe_str(mic.campo_37_valor_manual),
+        "campo_38_datos_campo11_crt": safe_str(mic.campo_38_datos_campo11_crt),
+        "campo_40_tramo": safe_str(mic.campo_40_tramo) + (f"\nCHOFER: {mic.chofer}" if mic.chofer else "")
+    }
+    return mic_data
+
+
+def _pdf_mic_guardado(mic):
+    """Devuelve (bytes, hit de caché, nombre de descarga) del PDF de un MIC guardado."""
+    from app.utils.layout_mic import LAYOUT_VERSION as MIC_LAYOUT_VERSION, normalized_date
+
+    mic_data = _mic_data_para_pdf(mic)
+
+    # La fecha del campo 39 cae en "hoy" si el MIC no tiene fecha: forma parte de la clave
+    cache_key = pdf_cache.build_key(
+        'mic', mic.id, {**mic_data, '_fecha_campo39': normalized_date(mic_data)},
+        MIC_LAYOUT_VERSION)
+    pdf_bytes, hit = pdf_cache.get_or_render(
+        cache_key, lambda: generar_micdta_pdf_con_datos(mic_data))
+
+    # Función para sanitizar nombres de archivo
+    def sanitize_filename(text):
+        if not text:
+            return "N-A"
+        # Tomar solo primeras palabras si es muy largo
+        text = str(text).strip()
+        if len(text) > 50:
+            text = text[:50]
+        # Eliminar caracteres inválidos
+        import re
+        text = re.sub(r'[<>:"/\\|?*\n\r]', '', text)
+        text = text.replace('  ', ' ').strip()
+        return text or "N-A"
+
+    # Formato: [Transportadora] - [Nº CRT] - [Exportador] - [Importador]
+    transportadora = sanitize_filename(mic.campo_1_transporte)
+    numero_crt = sanitize_filename(mic.campo_23_numero_campo2_crt) or f"MIC-{mic.id}"
+    exportador = sanitize_filename(mic.campo_33_datos_campo1_crt)
+    importador = sanitize_filename(mic.campo_34_datos_campo4_crt)
+
+    download_name = f"{transportadora} - {numero_crt} - {exportador} - {importador}.pdf"
+    return pdf_bytes, hit, download_name
+
+
+def _render_mic_guardado_job(mic_id):
+    """Trabajo de pdf_jobs (?async=1): devuelve (bytes, nombre de descarga)."""
+    mic = MIC.query.get(mic_id)
+    if mic is None:
+        raise LookupError(f"MIC {mic_id} no encontrado")
+    pdf_bytes, _, download_name = _pdf_mic_guardado(mic)
+    return pdf_bytes, download_name
+
+
 # ========== ESTADÃSTICAS ==========
 
 
 @mic_guardados_bp.route('/stats', methods=['GET'])
 def obtener_estadisticas():
-    """Obtiene estadisticas generales de MICs guardados."""
+    """
+    Obtiene estadisticas generales de MICs guardados (una sola consulta agregada).
+    Query params: fecha_desde, fecha_hasta (YYYY-MM-DD, inclusivos; por defecto
+    los ultimos 180 dias) y granularidad (dia | semana | mes, por defecto mes).
+    """
     try:
         logger.info("Fetching stored MIC statistics")
 
-        now = datetime.now()
-        today_start = datetime.combine(now.date(), datetime.min.time())
-        tomorrow_start = today_start + timedelta(days=1)
-        week_ago = now - timedelta(days=7)
-        six_months_ago = now - timedelta(days=180)
-
-        stats_estado = (
-            db.session.query(
-                MIC.campo_4_estado,
-                db.func.count(MIC.id).label('cantidad')
+        try:
+            granularidad = mic_stats_service.normalizar_granularidad(
+                request.args.get('granularidad') or request.args.get('granularity'))
+            fecha_desde = request.args.get('fecha_desde', '').strip()
+            fecha_hasta = request.args.get('fecha_hasta', '').strip()
+            resultado = mic_stats_service.estadisticas_mics(
+                desde=datetime.strptime(fecha_desde, '%Y-%m-%d').date() if fecha_desde else None,
+                hasta=datetime.strptime(fecha_hasta, '%Y-%m-%d').date() if fecha_hasta else None,
+                granularidad=granularidad,
             )
-            .group_by(MIC.campo_4_estado)
-            .all()
-        )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        total_mics = MIC.query.count()
+        if granularidad == mic_stats_service.MES:
+            resultado['por_mes'] = [
+                {'mes': p['periodo'], 'cantidad': p['cantidad']}
+                for p in resultado['por_periodo']
+            ]
 
-        mics_hoy = (
-            MIC.query
-            .filter(MIC.creado_en >= today_start, MIC.creado_en < tomorrow_start)
-            .count()
-        )
-
-        mics_semana = MIC.query.filter(MIC.creado_en >= week_ago).count()
-
-        mics_recientes = MIC.query.filter(MIC.creado_en >= six_months_ago).all()
-        stats_por_mes = {}
-        for mic in mics_recientes:
-            if mic.creado_en:
-                mes_clave = mic.creado_en.strftime('%Y-%m')
-                stats_por_mes[mes_clave] = stats_por_mes.get(mes_clave, 0) + 1
-
-        por_mes = [
-            {'mes': mes, 'cantidad': stats_por_mes[mes]}
-            for mes in sorted(stats_por_mes.keys())
-        ]
-
-        resultado = {
-            'total_mics': total_mics,
-            'mics_hoy': mics_hoy,
-            'mics_semana': mics_semana,
-            'por_estado': [
-                {'estado': estado, 'cantidad': cantidad}
-                for estado, cantidad in stats_estado
-            ],
-            'por_mes': por_mes
-        }
-
-        logger.debug("Stats summary: total=%s hoy=%s semana=%s", total_mics, mics_hoy, mics_semana)
+        logger.debug("Stats summary: total=%s hoy=%s semana=%s",
+                     resultado['total_mics'], resultado['mics_hoy'], resultado['mics_semana'])
 
         return jsonify(resultado)
 
     except Exception as e:
         logger.exception("Error fetching stored MIC statistics")
         return jsonify({'error': str(e)}), 500
+
+
 @mic_guardados_bp.route('/search', methods=['POST'])
+@rate_limit('search', 60, per=60)
 def busqueda_avanzada():
     """
     âœ… BÃºsqueda avanzada de MICs con mÃºltiples criterios
@@ -670,23 +689,23 @@ def busqueda_avanzada():
 
         # Aplicar filtros dinÃ¡micos
         if data.get('numero_carta'):
-            query = query.filter(MIC.campo_23_numero_campo2_crt.ilike(
-                f"%{data['numero_carta']}%"))
+            query = query.filter(search_service.match_any(
+                data['numero_carta'], MIC.campo_23_numero_campo2_crt))
 
         if data.get('transportadora'):
-            query = query.filter(MIC.campo_1_transporte.ilike(
-                f"%{data['transportadora']}%"))
+            query = query.filter(search_service.match_any(
+                data['transportadora'], MIC.campo_1_transporte))
 
         if data.get('placa'):
-            query = query.filter(
-                MIC.campo_11_placa.ilike(f"%{data['placa']}%"))
+            query = query.filter(search_service.match_any(
+                data['placa'], MIC.campo_11_placa))
 
         if data.get('estado'):
             query = query.filter(MIC.campo_4_estado == data['estado'])
 
         if data.get('destino'):
-            query = query.filter(
-                MIC.campo_8_destino.ilike(f"%{data['destino']}%"))
+            query = query.filter(search_service.match_any(
+                data['destino'], MIC.campo_8_destino))
 
         if data.get('fecha_desde'):
             try:
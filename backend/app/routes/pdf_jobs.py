@@ -0,0 +1,60 @@
+from io import BytesIO
+import logging
+
+from flask import Blueprint, g, jsonify, request, send_file, url_for
+
+from app.security.decorators import verify_authentication
+from app.services import pdf_jobs
+
+pdf_jobs_bp = Blueprint('pdf_jobs', __name__, url_prefix='/api/pdf-jobs')
+pdf_jobs_bp.before_request(verify_authentication)
+logger = logging.getLogger(__name__)
+
+
+def async_requested():
+    """True si el cliente pidió generación en segundo plano (?async=1) y está disponible."""
+    flag = request.args.get('async', '').lower() in ('1', 'true')
+    return flag and pdf_jobs.is_enabled()
+
+
+def enqueue_pdf_job(kind, func, *args):
+    """Encola un trabajo de PDF y responde 202 con la URL para consultarlo."""
+    try:
+        job = pdf_jobs.submit(kind, func, *args, owner_id=g.current_user.id)
+    except pdf_jobs.JobQueueFull:
+        return jsonify({"error": "Demasiados PDFs en cola, reintente en unos segundos"}), 503
+
+    status_url = url_for('pdf_jobs.estado_pdf_job', job_id=job["id"])
+    logger.info("PDF job queued", extra={'job_id': job["id"], 'kind': kind})
+    response = jsonify({"job_id": job["id"], "status": job["status"], "status_url": status_url})
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+
+@pdf_jobs_bp.route('/<string:job_id>', methods=['GET'])
+def estado_pdf_job(job_id):
+    """
+    Estado de un trabajo de PDF:
+      - pending: 202 con el estado (seguir consultando)
+      - error:   500 con el mensaje
+      - done:    el documento (?inline=true para verlo en el navegador)
+    """
+    job = pdf_jobs.get_job(job_id)
+    if not job or job.get("owner_id") != g.current_user.id:
+        return jsonify({"error": "Trabajo no encontrado o vencido"}), 404
+
+    if job["status"] == pdf_jobs.STATUS_PENDING:
+        return jsonify({"job_id": job_id, "status": job["status"]}), 202
+    if job["status"] == pdf_jobs.STATUS_ERROR:
+        return jsonify({"job_id": job_id, "status": job["status"], "error": job.get("error")}), 500
+
+    pdf_bytes = pdf_jobs.get_result(job_id)
+    if pdf_bytes is None:
+        return jsonify({"error": "Trabajo no encontrado o vencido"}), 404
+    return send_file(
+        BytesIO(pdf_bytes),
+        mimetype='application/pdf',
+        as_attachment=request.args.get('inline', 'false').lower() != 'true',
+        download_name=job.get("download_name") or f"{job['kind']}.pdf",
+    )
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
 from app.models import Remitente, Ciudad
 from app import db
+from sqlalchemy.orm import joinedload
 from app.security.decorators import verify_authentication
+from app.services import search_service
 
 remitentes_bp = Blueprint('remitentes', __name__, url_prefix='/api/remitentes')
 remitentes_bp.before_request(verify_authentication)
@@ -17,16 +19,11 @@ def listar_remitentes():
     sort_by = request.args.get('sort_by', 'nombre', type=str)
     sort_order = request.args.get('sort_order', 'asc', type=str)
 
-    query = Remitente.query
+    query = Remitente.query.options(joinedload(Remitente.ciudad))
 
     if q:
-        search = f"%{q}%"
-        query = query.filter(
-            db.or_(
-                Remitente.nombre.ilike(search),
-                Remitente.numero_documento.ilike(search)
-            )
-        )
+        query = query.filter(search_service.match_any(
+            q, Remitente.nombre, Remitente.numero_documento))
 
     # Definir campos válidos para ordenar
     valid_sort_fields = {
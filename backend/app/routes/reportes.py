@@ -0,0 +1,35 @@
+from flask import Blueprint, jsonify, request
+
+from app.security.decorators import permissions_required, verify_authentication
+from app.services import reportes_service
+
+reportes_bp = Blueprint('reportes', __name__, url_prefix='/api/reportes')
+reportes_bp.before_request(verify_authentication)
+
+
+@reportes_bp.route('/honorarios', methods=['GET'])
+@permissions_required('reportes:ver')
+def reporte_honorarios():
+    """
+    Honorarios por transportadora, mes, moneda y tipo de operación, leídos
+    de la tabla resumen (no recorre `honorarios`).
+
+    Filtros opcionales: desde / hasta (YYYY-MM, inclusivos),
+    transportadora_id, moneda_id, tipo_operacion.
+    """
+    try:
+        desde = reportes_service.validar_mes(request.args.get('desde'), 'desde')
+        hasta = reportes_service.validar_mes(request.args.get('hasta'), 'hasta')
+        if desde and hasta and desde > hasta:
+            raise ValueError('desde posterior a hasta')
+        return jsonify(reportes_service.reporte_honorarios(
+            desde=desde,
+            hasta=hasta,
+            transportadora_id=request.args.get('transportadora_id', type=int),
+            moneda_id=request.args.get('moneda_id', type=int),
+            tipo_operacion=request.args.get('tipo_operacion') or None,
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
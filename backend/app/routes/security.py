@@ -13,6 +13,7 @@ from app.models import AuditLog, LoginAttempt, RefreshToken, Usuario
 from app.security.decorators import auth_required, roles_required, verify_authentication
 from app.security.tokens import find_valid_refresh_token, revoke_token
 from app.services.audit_service import audit_event
+from app.utils.pagination import InvalidCursor, cursor_requested, keyset_from_request
 
 security_bp = Blueprint('security', __name__, url_prefix='/api/security')
 security_bp.before_request(verify_authentication)
@@ -119,6 +120,21 @@ def revoke_all_sessions():
     return jsonify({'status': 'ok', 'revoked_count': revoked_count})
 
 
+def _audit_log_dict(log: AuditLog) -> dict:
+    return {
+        'id': log.id,
+        'user_id': log.user_id,
+        'user_email': log.user.email if log.user else None,
+        'user_name': log.user.display_name if log.user else None,
+        'action': log.action,
+        'level': log.level,
+        'ip': log.ip,
+        'user_agent': log.user_agent,
+        'metadata': log.metadata_json,
+        'created_at': log.created_at.isoformat() if log.created_at else None,
+    }
+
+
 @security_bp.route('/audit-logs', methods=['GET'])
 @auth_required
 @roles_required('admin')
@@ -169,6 +185,17 @@ def get_audit_logs():
             )
         )
 
+    # Keyset pagination (?cursor=): no OFFSET scan, COUNT only with ?total=exact
+    if cursor_requested():
+        try:
+            cursor_page = keyset_from_request(query, (AuditLog.created_at, AuditLog.id), per_page)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        return jsonify({
+            'logs': [_audit_log_dict(log) for log in cursor_page.items],
+            'pagination': cursor_page.pagination(per_page),
+        })
+
     # Order by most recent first
     query = query.order_by(desc(AuditLog.created_at))
 
@@ -176,21 +203,7 @@ def get_audit_logs():
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
     return jsonify({
-        'logs': [
-            {
-                'id': log.id,
-                'user_id': log.user_id,
-                'user_email': log.user.email if log.user else None,
-                'user_name': log.user.display_name if log.user else None,
-                'action': log.action,
-                'level': log.level,
-                'ip': log.ip,
-                'user_agent': log.user_agent,
-                'metadata': log.metadata_json,
-                'created_at': log.created_at.isoformat() if log.created_at else None,
-            }
-            for log in pagination.items
-        ],
+        'logs': [_audit_log_dict(log) for log in pagination.items],
         'pagination': {
             'page': pagination.page,
             'per_page': pagination.per_page,
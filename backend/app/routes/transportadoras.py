@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from app.models import Transportadora, Ciudad
 from app import db
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 from app.security.decorators import verify_authentication
+from app.services import search_service
 
 transportadoras_bp = Blueprint('transportadoras', __name__, url_prefix='/api/transportadoras')
 transportadoras_bp.before_request(verify_authentication)
@@ -15,15 +16,9 @@ def listar_transportadoras():
     q = request.args.get('q', '', type=str).strip()
     query = Transportadora.query
     if q:
-        search = f"%{q}%"
-        query = query.filter(
-            db.or_(
-                Transportadora.nombre.ilike(search),
-                Transportadora.codigo.ilike(search),
-                Transportadora.direccion.ilike(search)
-            )
-        )
-    transportadoras = query.options(joinedload(Transportadora.moneda_honorarios)).order_by(Transportadora.id.desc()).paginate(page=page, per_page=per_page)
+        query = query.filter(search_service.match_any(
+            q, Transportadora.nombre, Transportadora.codigo, Transportadora.direccion))
+    transportadoras = query.options(joinedload(Transportadora.moneda_honorarios), selectinload(Transportadora.honorarios_registrados)).order_by(Transportadora.id.desc()).paginate(page=page, per_page=per_page)
     return jsonify({
         "items": [
             {
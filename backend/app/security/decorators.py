@@ -1,29 +1,54 @@
 from functools import wraps
 from typing import Callable, Optional
 
-from flask import Response, g, jsonify, request
+from flask import Response, current_app, g, jsonify, request
 
 from app.models import Usuario
-from app.security.rbac import get_user_permissions
-from app.security.tokens import decode_jwt
+from app.security.rbac import get_user_permissions, get_user_roles
+from app.security.tokens import TokenPrincipal, decode_jwt
+from app.services import rate_limiter, token_revocation
 
 
 def _unauthorized(message: str, status: int = 401) -> Response:
     return jsonify({'error': message}), status
 
 
-def _load_user_from_token() -> Optional[Usuario]:
+def _verified_payload() -> Optional[dict]:
     auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
         return None
     token = auth_header.split(' ', 1)[1].strip()
     try:
-        payload = decode_jwt(token)
+        return decode_jwt(token)
     except ValueError:
         return None
+
+
+def _load_principal_from_token() -> Optional[TokenPrincipal]:
+    """
+    Camino rápido: confía en los claims firmados mientras la versión de
+    token del usuario no haya cambiado (sin consultar usuarios ni roles).
+    """
+    payload = _verified_payload()
+    if payload is None or not payload.get('active'):
+        return None
+    principal = TokenPrincipal(payload)
+    if token_revocation.current_version(principal.id) != principal.token_version:
+        return None
+    g.jwt_payload = payload
+    return principal
+
+
+def _load_user_from_token() -> Optional[Usuario]:
+    payload = _verified_payload()
+    if payload is None:
+        return None
     user = Usuario.query.get(int(payload['sub']))
     if not user or not user.is_active or user.estado != 'activo':
         return None
+    # Misma revocación que el camino rápido: el token debe ser de la versión vigente
+    if payload.get('ver', 0) != (user.token_version or 0):
+        return None
     g.jwt_payload = payload
     return user
 
@@ -35,7 +60,7 @@ def verify_authentication():
     
     user = getattr(g, 'current_user', None)
     if not user:
-        user = _load_user_from_token()
+        user = _load_principal_from_token()
     
     if not user:
         return _unauthorized('Autenticacion requerida')
@@ -89,7 +114,7 @@ def roles_required(*roles: str) -> Callable:
                 user = _load_user_from_token()
             if not user:
                 return _unauthorized('Autenticacion requerida')
-            user_roles = {role.name for role in user.roles}
+            user_roles = get_user_roles(user)
             if not any(role in user_roles for role in roles):
                 return _unauthorized('Rol no autorizado', status=403)
             g.current_user = user
@@ -98,3 +123,51 @@ def roles_required(*roles: str) -> Callable:
         return wrapper
 
     return decorator
+
+
+def _rate_limit_identity() -> str:
+    user = getattr(g, 'current_user', None)
+    if user is not None:
+        return f'u:{user.id}'
+    return f'ip:{request.remote_addr or "unknown"}'
+
+
+def check_request_rate(bucket: str, limit: int, per: int = 60, cost: int = 1) -> Optional[Response]:
+    """
+    Descuenta `cost` lugares del bucket del usuario (o de la IP si no hay
+    sesión). Devuelve la respuesta 429 si no hay cupo, None si puede seguir.
+    """
+    if request.method == 'OPTIONS' or not current_app.config.get('RATE_LIMIT_ENABLED', True):
+        return None
+    result = rate_limiter.hit(bucket, _rate_limit_identity(), limit, per, cost)
+    rate_limiter.track(result, per)
+    if result.allowed:
+        return None
+    return jsonify({'error': 'Demasiadas solicitudes', 'retry_after_seconds': result.retry_after}), 429
+
+
+def rate_limit(bucket: str, limit: int, per: int = 60, cost: int = 1) -> Callable:
+    """
+    Límite por ruta: `@rate_limit('pdf', 30, per=60)`. Las rutas que usan el
+    mismo bucket comparten el cupo; `cost` pesa las solicitudes más caras.
+    Para todo un blueprint: `bp.before_request(rate_limit_hook('api', 300))`.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            blocked = check_request_rate(bucket, limit, per, cost)
+            if blocked is not None:
+                return blocked
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def rate_limit_hook(bucket: str, limit: int, per: int = 60, cost: int = 1) -> Callable:
+    """before_request de blueprint; registrar después de verify_authentication."""
+    def hook():
+        return check_request_rate(bucket, limit, per, cost)
+
+    return hook
@@ -1,6 +1,11 @@
-from typing import Iterable, Set
+import threading
+import time
+import uuid
+from typing import Dict, FrozenSet, Iterable, Optional, Set
 
 from flask import current_app
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
 
 PERMISSIONS_BASE = {
     'envios:crear',
@@ -33,6 +38,7 @@ ROLE_MATRIX = {
 }
 
 DEFAULT_ROLE = 'operador'
+RBAC_TABLES = frozenset({'roles', 'permissions', 'role_permissions'})
 ROLE_ALIASES = {
     'usuario': DEFAULT_ROLE,
 }
@@ -49,6 +55,7 @@ def ensure_roles_permissions() -> None:
     from app import db
     from app.models import Permission, Role, RolePermission
 
+    _register_events()
     existing_permissions = {p.key: p for p in Permission.query.all()}
     for perm_key in sorted(PERMISSIONS_BASE):
         if perm_key not in existing_permissions:
@@ -69,14 +76,169 @@ def ensure_roles_permissions() -> None:
             db.session.add(RolePermission(role_id=role.id,
                            permission_id=permissions[perm_key].id))
     db.session.commit()
+    invalidate_permission_cache()
 
 
-def get_user_permissions(user) -> Set[str]:
+# =============================
+#   MAPA ROL -> PERMISOS (por proceso)
+# =============================
+# Se arma con una sola consulta y se descarta cuando un commit de este proceso
+# escribe en roles, permissions o role_permissions. Los cambios hechos por
+# otros procesos (otros workers, `flask seed`) se detectan por la versión
+# compartida: la fila `rbac_version` de parametros, que cambia en el mismo
+# flush que escribe esas tablas y que cada worker vuelve a leer cada
+# RBAC_VERSION_TTL_SECONDS. Autorizar es buscar en un frozenset.
+
+RBAC_VERSION_KEY = 'rbac_version'
+
+_cache_lock = threading.Lock()
+_role_permissions: Optional[Dict[str, FrozenSet[str]]] = None
+_permissions_by_roles: Dict[FrozenSet[str], FrozenSet[str]] = {}
+_loaded_version: Optional[str] = None
+_checked_at = 0.0
+_events_registered = False
+
+
+def invalidate_permission_cache() -> None:
+    global _role_permissions
+    with _cache_lock:
+        _role_permissions = None
+        _permissions_by_roles.clear()
+
+
+def _shared_version() -> Optional[str]:
+    from app import db
+    from app.models import Parametro
+
+    return db.session.execute(
+        select(Parametro.valor).where(Parametro.clave == RBAC_VERSION_KEY)
+    ).scalar()
+
+
+def _check_shared_version() -> None:
+    """Descarta el mapa si otro proceso cambió roles/permisos (a lo sumo una consulta por TTL)."""
+    global _checked_at
+    if _role_permissions is None:
+        return
+    now = time.monotonic()
+    if now - _checked_at < current_app.config.get('RBAC_VERSION_TTL_SECONDS', 5):
+        return
+    _checked_at = now
+    if _shared_version() != _loaded_version:
+        invalidate_permission_cache()
+
+
+def _load_role_permissions() -> Dict[str, FrozenSet[str]]:
+    global _role_permissions, _loaded_version, _checked_at
+    mapping = _role_permissions
+    if mapping is not None:
+        return mapping
+
+    from app import db
+    from app.models import Permission, Role, RolePermission
+
+    _register_events()
+    version = _shared_version()
+    rows = db.session.execute(
+        select(Role.name, Permission.key)
+        .select_from(Role)
+        .outerjoin(RolePermission, RolePermission.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == RolePermission.permission_id)
+    ).all()
+    grouped: Dict[str, Set[str]] = {}
+    for role_name, perm_key in rows:
+        keys = grouped.setdefault(role_name, set())
+        if perm_key:
+            keys.add(perm_key)
+    mapping = {name: frozenset(keys) for name, keys in grouped.items()}
+    with _cache_lock:
+        _role_permissions = mapping
+        _loaded_version = version
+        _checked_at = time.monotonic()
+    return mapping
+
+
+def permissions_for_roles(role_names: Iterable[str]) -> FrozenSet[str]:
+    """Permisos de un conjunto de roles (frozenset cacheado por combinación de roles)."""
+    role_names = frozenset(role_names)
+    _check_shared_version()
+    cached = _permissions_by_roles.get(role_names)
+    if cached is not None:
+        return cached
+    mapping = _load_role_permissions()
+    result = frozenset().union(*(mapping.get(name, ()) for name in role_names))
+    with _cache_lock:
+        if _role_permissions is mapping:
+            _permissions_by_roles[role_names] = result
+    return result
+
+
+def _register_events() -> None:
+    global _events_registered
+    if _events_registered:
+        return
+    _events_registered = True
+    event.listen(Session, 'before_flush', _before_flush)
+    event.listen(Session, 'after_flush', _after_flush)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_soft_rollback', _after_rollback)
+
+
+def _before_flush(session, flush_context, instances) -> None:
+    """Cambia la versión compartida en la misma transacción que escribe roles/permisos."""
+    from app.models import Parametro
+
+    if not any(getattr(obj, '__tablename__', None) in RBAC_TABLES
+               for obj in (*session.new, *session.dirty, *session.deleted)):
+        return
+    with session.no_autoflush:
+        row = session.query(Parametro).filter_by(clave=RBAC_VERSION_KEY).first()
+    if row is None:
+        row = Parametro(clave=RBAC_VERSION_KEY)
+        session.add(row)
+    row.valor = uuid.uuid4().hex
+
+
+def _after_flush(session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(obj, '__tablename__', None) in RBAC_TABLES:
+            session.info['rbac_changed'] = True
+            return
+
+
+def _after_commit(session) -> None:
+    if session.info.pop('rbac_changed', False):
+        invalidate_permission_cache()
+
+
+def _after_rollback(session, previous_transaction) -> None:
+    session.info.pop('rbac_changed', None)
+
+
+def get_user_roles(user) -> FrozenSet[str]:
+    """Role names of a user (or of a TokenPrincipal, from its claims)."""
+    role_names = getattr(user, 'role_names', None)
+    if role_names is not None:
+        return role_names
+    state = inspect(user)
+    if state.persistent and 'roles' in state.unloaded:
+        # Solo los nombres: user.roles cargaría en cascada usuarios y permisos de cada rol
+        from app import db
+        from app.models import Role, UserRole
+
+        return frozenset(db.session.execute(
+            select(Role.name).join(UserRole, UserRole.role_id == Role.id)
+            .where(UserRole.user_id == user.id)
+        ).scalars())
+    return frozenset(role.name for role in user.roles)
+
+
+def get_user_permissions(user) -> FrozenSet[str]:
     """Get all permissions for a user based on their roles."""
-    perm_keys: Set[str] = set()
-    for role in user.roles:
-        perm_keys.update({perm.key for perm in role.permissions})
-    return perm_keys
+    if not hasattr(user, 'roles'):
+        # TokenPrincipal: permisos firmados en el access token
+        return user.permissions
+    return permissions_for_roles(get_user_roles(user))
 
 
 def user_has_permission(user, permission: str) -> bool:
@@ -40,11 +40,33 @@ def build_access_payload(user, *, permissions) -> Dict[str, Any]:
         'roles': [role.name for role in user.roles],
         'permissions': sorted(permissions),
         'mfa': user.mfa_enabled,
-        'active': user.is_active and user.estado == 'activo'
+        'active': user.is_active and user.estado == 'activo',
+        'ver': user.token_version or 0,
     }
     return payload
 
 
+class TokenPrincipal:
+    """Usuario autenticado armado solo con los claims verificados del access token."""
+
+    __slots__ = ('id', 'email', 'usuario', 'role_names', 'permissions', 'mfa_enabled', 'token_version')
+
+    is_active = True
+    estado = 'activo'
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.id = int(payload['sub'])
+        self.email = payload.get('email')
+        self.usuario = payload.get('usuario')
+        self.role_names = frozenset(payload.get('roles') or ())
+        self.permissions = frozenset(payload.get('permissions') or ())
+        self.mfa_enabled = bool(payload.get('mfa'))
+        self.token_version = payload.get('ver', 0)
+
+    def __repr__(self) -> str:
+        return f'<TokenPrincipal {self.id} {self.usuario}>'
+
+
 def encode_jwt(payload: Dict[str, Any]) -> str:
     secret = current_app.config['JWT_SECRET_KEY']
     algorithm = current_app.config['JWT_ALGORITHM']
@@ -105,6 +127,7 @@ def revoke_token(record: RefreshToken) -> None:
 
 def revoke_all_tokens(user) -> None:
     now = _utcnow()
+    user.token_version = (user.token_version or 0) + 1
     (
         RefreshToken.query
         .filter_by(user_id=user.id)
@@ -118,6 +141,7 @@ def secure_compare(value: str, hashed: str) -> bool:
 
 __all__ = [
     'build_access_payload',
+    'TokenPrincipal',
     'encode_jwt',
     'decode_jwt',
     'create_refresh_token',
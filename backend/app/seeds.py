@@ -1,6 +1,18 @@
+"""
+Datos iniciales: roles/permisos base (ROLE_MATRIX) y el usuario admin.
+
+No corren al crear la app (cada worker y cada comando `flask` pagaban esas
+consultas y un commit): se aplican con `flask seed`, que el entrypoint
+ejecuta después de `flask db upgrade`. El comando primero verifica con dos
+consultas si ya está todo; solo si falta algo toma un advisory lock de
+PostgreSQL, para que varios contenedores arrancando a la vez no siembren
+en paralelo, y vuelve a verificar antes de escribir.
+"""
 import secrets
 
+import click
 from flask import current_app
+from sqlalchemy import exists, select, text
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
 from app.security.mfa import (
@@ -11,7 +23,10 @@ from app.security.mfa import (
     totp_uri,
 )
 from app.security.passwords import hash_password
-from app.security.rbac import ensure_roles_permissions, sync_legacy_role
+from app.security.rbac import ROLE_MATRIX, ensure_roles_permissions, sync_legacy_role
+
+# Clave del advisory lock de `flask seed` (pg_advisory_lock recibe un bigint)
+SEED_LOCK_KEY = 0x7365656473
 
 
 def _generate_temp_password() -> str:
@@ -97,3 +112,59 @@ def ensure_admin_user() -> None:
         print('============================')
     except (OperationalError, ProgrammingError):
         db.session.rollback()
+
+
+def seed_pendiente() -> bool:
+    """True si faltan vínculos rol-permiso de ROLE_MATRIX o no hay ningún admin."""
+    from app import db
+    from app.models import Permission, Role, RolePermission, UserRole
+
+    vinculos = set(db.session.execute(
+        select(Role.name, Permission.key)
+        .join(RolePermission, RolePermission.role_id == Role.id)
+        .join(Permission, Permission.id == RolePermission.permission_id)
+        .where(Role.name.in_(list(ROLE_MATRIX)))
+    ).all())
+    esperados = {(rol, perm) for rol, perms in ROLE_MATRIX.items() for perm in perms}
+    if not esperados <= vinculos:
+        return True
+    hay_admin = db.session.execute(select(exists().where(
+        UserRole.role_id == Role.id, Role.name == 'admin'))).scalar()
+    return not hay_admin
+
+
+def seed() -> bool:
+    """Aplica los datos iniciales si hace falta. Devuelve True si escribió algo."""
+    from app import db
+
+    if not seed_pendiente():
+        db.session.rollback()
+        return False
+    postgres = db.engine.dialect.name == 'postgresql'
+    with db.engine.connect() as lock_conn:
+        if postgres:
+            # Lock de sesión en una conexión aparte: ensure_* hacen commit
+            lock_conn.execute(text('SELECT pg_advisory_lock(:k)'), {'k': SEED_LOCK_KEY})
+        try:
+            if not seed_pendiente():
+                db.session.rollback()
+                return False
+            ensure_roles_permissions()
+            ensure_admin_user()
+            return True
+        finally:
+            if postgres:
+                lock_conn.execute(text('SELECT pg_advisory_unlock(:k)'), {'k': SEED_LOCK_KEY})
+
+
+@click.command('seed')
+def seed_command():
+    """Crea roles, permisos y el usuario admin si faltan."""
+    if seed():
+        click.echo('Datos iniciales aplicados')
+    else:
+        click.echo('Datos iniciales al día')
+
+
+def init_app(app):
+    app.cli.add_command(seed_command)
@@ -54,7 +54,7 @@ from app.security.tokens import (
 )
 from app.services.audit_service import audit_event
 from app.services.email_service import send_email
-from app.services.rate_limiter import check_rate_limit, record_attempt
+from app.services.rate_limiter import check_rate_limit
 
 
 class AuthServiceError(Exception):
@@ -125,22 +125,27 @@ def _record_login_attempt(*, user: Optional[Usuario], email: str, ip: Optional[s
         mfa_required=mfa_required,
     )
     db.session.add(attempt)
-    if ip:
-        record_attempt(ip)
 
 
-def _check_rate_limit(ip: Optional[str]) -> None:
-    if not ip:
-        return
+def _check_rate_limit(ip: Optional[str], identifier: Optional[str] = None) -> None:
+    # Por IP y por cuenta: frena también los intentos contra un usuario desde muchas IPs
     cfg = current_app.config
-    retry_after = check_rate_limit(
-        ip=ip,
-        limit=cfg['LOGIN_RATE_LIMIT_PER_MINUTE'],
-        backoff_factor=cfg['LOGIN_RATE_LIMIT_BACKOFF_FACTOR'],
-        window_seconds=60,
-    )
-    if retry_after is not None:
-        raise RateLimitExceeded(retry_after)
+    buckets = []
+    if ip:
+        buckets.append(('login:ip', ip, cfg['LOGIN_RATE_LIMIT_PER_MINUTE']))
+    if identifier:
+        buckets.append(('login:id', identifier.strip().lower(),
+                        cfg['LOGIN_IDENTIFIER_RATE_LIMIT_PER_MINUTE']))
+    for bucket, key, limit in buckets:
+        retry_after = check_rate_limit(
+            key,
+            limit=limit,
+            backoff_factor=cfg['LOGIN_RATE_LIMIT_BACKOFF_FACTOR'],
+            window_seconds=60,
+            bucket=bucket,
+        )
+        if retry_after is not None:
+            raise RateLimitExceeded(retry_after)
 
 
 def _apply_failed_login(user: Usuario) -> None:
@@ -184,7 +189,7 @@ def issue_tokens(user: Usuario, *, ip: Optional[str], user_agent: Optional[str])
 
 
 def authenticate(identifier: str, password: str, *, ip: Optional[str], user_agent: Optional[str], mfa_code: Optional[str] = None, backup_code: Optional[str] = None) -> Dict[str, object]:
-    _check_rate_limit(ip)
+    _check_rate_limit(ip, identifier)
     user = find_user(identifier)
     if not user:
         _record_login_attempt(user=None, email=identifier, ip=ip, user_agent=user_agent, success=False, mfa_required=False)
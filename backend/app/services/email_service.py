@@ -4,6 +4,8 @@ from typing import Optional
 
 from flask import current_app
 
+from app.services import metrics
+
 
 def _extract_domain(email: str) -> str:
     if "@" not in email:
@@ -66,7 +68,7 @@ def send_email(recipient: str, subject: str, html_body: str, text_body: Optional
     password = smtp_cfg.get('password')
     use_tls = smtp_cfg.get('use_tls', False)
 
-    with smtplib.SMTP(host, port, timeout=10) as smtp:
+    with metrics.smtp_send_timer(), smtplib.SMTP(host, port, timeout=10) as smtp:
         if use_tls:
             smtp.starttls()
         if username and password:
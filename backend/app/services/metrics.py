@@ -0,0 +1,177 @@
+"""
+Prometheus metrics exposed at ``/api/metrics``.
+
+Collected:
+
+* ``http_request_duration_seconds``  — latency histogram per blueprint,
+  endpoint, method and status.
+* ``http_requests_in_flight``         — requests being served right now.
+* ``pdf_render_duration_seconds``     — CRT / MIC PDF render time (cache
+  misses and uncached renders only).
+* ``db_pool_checkout_wait_seconds``   — time spent waiting for a pooled DB
+  connection (QueuePool engines, i.e. PostgreSQL).
+* ``rate_limiter_checks_total``       — rate-limit checks answered by Redis
+  or by the in-process fallback (``memory``).
+* ``smtp_send_duration_seconds``      — SMTP delivery latency by result.
+
+Multiprocess mode: when ``PROMETHEUS_MULTIPROC_DIR`` is set *before* the
+app is imported (gunicorn with several workers), every worker writes its
+samples to that directory and ``/api/metrics`` aggregates all of them.
+``gunicorn.conf.py`` cleans the directory on start and marks dead workers.
+
+``prometheus_client`` is optional: without it every helper is a no-op and
+the endpoint answers 503. Call init_app(app) at startup, before
+``db.init_app`` so the instrumented pool class is picked up.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_enabled = False
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds", "HTTP request latency",
+        ["blueprint", "endpoint", "method", "status"],
+    )
+    REQUESTS_IN_FLIGHT = Gauge(
+        "http_requests_in_flight", "HTTP requests currently being served",
+        multiprocess_mode="livesum",
+    )
+    PDF_RENDER = Histogram(
+        "pdf_render_duration_seconds", "PDF render time", ["kind"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+    )
+    POOL_CHECKOUT_WAIT = Histogram(
+        "db_pool_checkout_wait_seconds", "Time waiting for a pooled DB connection",
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+    )
+    RATE_LIMITER_CHECKS = Counter(
+        "rate_limiter_checks_total", "Rate-limit checks by backend", ["backend"],
+    )
+    SMTP_SEND = Histogram(
+        "smtp_send_duration_seconds", "SMTP send latency", ["result"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+    )
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if _enabled:
+                POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def init_app(app) -> None:
+    """Register the request hooks and the instrumented DB pool."""
+    global _enabled
+    _enabled = bool(prometheus_client is not None and app.config.get("METRICS_ENABLED", True))
+    if not _enabled:
+        if prometheus_client is None:
+            logger.info("prometheus_client not installed — metrics disabled")
+        return
+
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+    if uri and make_url(uri).get_backend_name() != "sqlite":
+        options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+        options.setdefault("poolclass", InstrumentedQueuePool)
+
+    app.before_request(_start_request)
+    app.after_request(_observe_request)
+    app.teardown_request(_end_request)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def render_latest() -> bytes:
+    """Exposition text for every metric (aggregated across workers in multiprocess mode)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry)
+    return prometheus_client.generate_latest()
+
+
+# ---------------------------------------------------------------------------
+# Request hooks
+# ---------------------------------------------------------------------------
+
+def _start_request() -> None:
+    g._metrics_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+
+def _observe_request(response):
+    started = g.get("_metrics_started")
+    if started is not None:
+        REQUEST_LATENCY.labels(
+            blueprint=request.blueprint or "",
+            endpoint=request.endpoint or "unmatched",
+            method=request.method,
+            status=str(response.status_code),
+        ).observe(time.perf_counter() - started)
+    return response
+
+
+def _end_request(exc) -> None:
+    # teardown runs even when the view raised, so the gauge never leaks
+    if g.pop("_metrics_started", None) is not None:
+        REQUESTS_IN_FLIGHT.dec()
+
+
+# ---------------------------------------------------------------------------
+# Helpers for other services
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def pdf_render_timer(kind: str):
+    """Time a PDF render (``kind`` = ``crt`` / ``mic``)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _enabled:
+            PDF_RENDER.labels(kind=kind).observe(time.perf_counter() - started)
+
+
+def count_rate_limit_check(backend: str) -> None:
+    """Count one rate-limit check answered by ``redis`` or ``memory``."""
+    if _enabled:
+        RATE_LIMITER_CHECKS.labels(backend=backend).inc()
+
+
+@contextmanager
+def smtp_send_timer():
+    """Time an SMTP delivery, labelled ``ok`` or ``error``."""
+    started = time.perf_counter()
+    result = "error"
+    try:
+        yield
+        result = "ok"
+    finally:
+        if _enabled:
+            SMTP_SEND.labels(result=result).observe(time.perf_counter() - started)
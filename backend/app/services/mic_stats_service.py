@@ -0,0 +1,133 @@
+"""
+Estadísticas de MICs guardados resueltas en una sola consulta agregada.
+
+Una pasada sobre `mics` agrupada por (estado, período) con sumas
+condicionales para "hoy" y "últimos 7 días"; los totales por estado y por
+período se arman en Python a partir de esas pocas filas. El período se
+calcula en el motor: `date_trunc` + `to_char` en PostgreSQL, `strftime` /
+`date` en SQLite.
+
+Claves de período: día `YYYY-MM-DD`, semana `YYYY-MM-DD` (lunes de la
+semana) y mes `YYYY-MM`. Los períodos sin MICs del rango se devuelven en 0.
+"""
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, case, func, select
+
+from app import db
+from app.models import MIC
+
+logger = logging.getLogger(__name__)
+
+DIA = "dia"
+SEMANA = "semana"
+MES = "mes"
+GRANULARIDADES = {
+    DIA: DIA, "day": DIA,
+    SEMANA: SEMANA, "week": SEMANA,
+    MES: MES, "month": MES,
+}
+DIAS_POR_DEFECTO = 180
+MAX_PERIODOS = 1100
+
+_DATE_TRUNC = {DIA: "day", SEMANA: "week", MES: "month"}
+
+
+def normalizar_granularidad(valor):
+    """Granularidad canónica (dia/semana/mes) o ValueError."""
+    granularidad = GRANULARIDADES.get((valor or MES).strip().lower())
+    if granularidad is None:
+        raise ValueError(f"Granularidad inválida: {valor} (dia, semana o mes)")
+    return granularidad
+
+
+def _periodo(column, granularidad):
+    """Expresión SQL con la clave de período de `column`."""
+    if db.engine.dialect.name == "sqlite":
+        if granularidad == DIA:
+            return func.strftime("%Y-%m-%d", column)
+        if granularidad == SEMANA:
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m", column)
+    formato = "YYYY-MM" if granularidad == MES else "YYYY-MM-DD"
+    return func.to_char(func.date_trunc(_DATE_TRUNC[granularidad], column), formato)
+
+
+def periodos(desde: date, hasta: date, granularidad):
+    """Claves de todos los períodos que tocan el rango [desde, hasta]."""
+    claves = []
+    if granularidad == MES:
+        anio, mes = desde.year, desde.month
+        while (anio, mes) <= (hasta.year, hasta.month):
+            claves.append(f"{anio:04d}-{mes:02d}")
+            anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+        return claves
+    paso = 1 if granularidad == DIA else 7
+    actual = desde if granularidad == DIA else desde - timedelta(days=desde.weekday())
+    while actual <= hasta:
+        claves.append(actual.isoformat())
+        actual += timedelta(days=paso)
+    return claves
+
+
+def estadisticas_mics(desde=None, hasta=None, granularidad=MES, ahora=None):
+    """
+    Contadores de MICs: total, hoy, últimos 7 días, por estado y por
+    período de `granularidad` dentro de [desde, hasta] (fechas inclusivas;
+    por defecto los últimos 180 días). Lanza ValueError si el rango es
+    inválido o tiene demasiados períodos.
+    """
+    ahora = ahora or datetime.now()
+    hasta = hasta or ahora.date()
+    desde = desde or hasta - timedelta(days=DIAS_POR_DEFECTO)
+    if desde > hasta:
+        raise ValueError("fecha_desde posterior a fecha_hasta")
+    claves = periodos(desde, hasta, granularidad)
+    if len(claves) > MAX_PERIODOS:
+        raise ValueError(f"Rango demasiado amplio para granularidad '{granularidad}' "
+                         f"({len(claves)} períodos, máximo {MAX_PERIODOS})")
+
+    hoy_inicio = datetime.combine(ahora.date(), datetime.min.time())
+    en_rango = and_(MIC.creado_en >= datetime.combine(desde, datetime.min.time()),
+                    MIC.creado_en < datetime.combine(hasta + timedelta(days=1), datetime.min.time()))
+    filas_mic = select(
+        MIC.campo_4_estado.label("estado"),
+        case((en_rango, _periodo(MIC.creado_en, granularidad)), else_=None).label("periodo"),
+        case((and_(MIC.creado_en >= hoy_inicio, MIC.creado_en < hoy_inicio + timedelta(days=1)), 1),
+             else_=0).label("hoy"),
+        case((MIC.creado_en >= ahora - timedelta(days=7), 1), else_=0).label("semana"),
+    ).subquery()
+    filas = db.session.execute(
+        select(filas_mic.c.estado, filas_mic.c.periodo, func.count(),
+               func.sum(filas_mic.c.hoy), func.sum(filas_mic.c.semana))
+        .group_by(filas_mic.c.estado, filas_mic.c.periodo)
+    ).all()
+
+    total = hoy = semana = 0
+    por_estado, por_periodo = {}, dict.fromkeys(claves, 0)
+    for estado, periodo, cantidad, en_hoy, en_semana in filas:
+        total += cantidad
+        hoy += en_hoy or 0
+        semana += en_semana or 0
+        por_estado[estado] = por_estado.get(estado, 0) + cantidad
+        if periodo is not None:
+            periodo = str(periodo)
+            por_periodo[periodo] = por_periodo.get(periodo, 0) + cantidad
+
+    return {
+        "total_mics": total,
+        "mics_hoy": hoy,
+        "mics_semana": semana,
+        "por_estado": [
+            {"estado": estado, "cantidad": cantidad}
+            for estado, cantidad in sorted(por_estado.items(), key=lambda item: -item[1])
+        ],
+        "granularidad": granularidad,
+        "fecha_desde": desde.isoformat(),
+        "fecha_hasta": hasta.isoformat(),
+        "por_periodo": [
+            {"periodo": periodo, "cantidad": por_periodo[periodo]}
+            for periodo in sorted(por_periodo)
+        ],
+    }
@@ -0,0 +1,322 @@
+"""
+Content-addressed cache for rendered CRT/MIC PDFs.
+
+The key is a hash of the serialized document data plus the layout version
+(``layout_crt.LAYOUT_VERSION`` / ``layout_mic.LAYOUT_VERSION``), so any change
+in the data or in the form produces a new key. Entries are also tagged with
+the document id so edit/delete/restore endpoints can drop them eagerly.
+
+Two backends, both bounded in size with LRU eviction:
+
+* ``disk``  — one file per entry under ``PDF_CACHE_DIR/<kind>-<id>/``
+  (mtime = last access), so invalidating a document touches one directory.
+* ``redis`` — binary values plus a sorted set with last-access timestamps.
+
+Call init_app(app) at startup. Every failure degrades to "cache miss".
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+_cache = None
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class DiskPDFCache:
+    """
+    Cache en disco local con desalojo LRU por tamaño total.
+
+    Cada documento tiene su subdirectorio (`<kind>-<id>`). El tamaño total se
+    lleva en memoria (un recorrido del directorio al arrancar): solo cuando
+    una escritura lo lleva por encima de `max_bytes` se recorre la caché y se
+    desaloja hasta EVICT_TARGET de `max_bytes`. Con varios procesos cada uno
+    suma sus escrituras; el recorrido del desalojo vuelve a sincronizarlo.
+    """
+
+    EVICT_TARGET = 0.9
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def _shard(key: str) -> str:
+        return key.rsplit("-", 1)[0]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, self._shard(key), f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path, None)  # marca de último acceso para el LRU
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=shard, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._total += len(data) - replaced
+            over = self._total > self.max_bytes
+        if over:
+            self._evict()
+
+    def invalidate(self, prefix: str) -> int:
+        """Borra las entradas de `prefix` (`<kind>-<id>-`): un solo subdirectorio."""
+        shard = os.path.join(self.directory, prefix.rstrip("-"))
+        try:
+            entries = [e for e in os.scandir(shard) if e.name.endswith(".pdf")]
+        except FileNotFoundError:
+            return 0
+        removed = freed = 0
+        for entry in entries:
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += size
+        shutil.rmtree(shard, ignore_errors=True)
+        with self._lock:
+            self._total -= freed
+        return removed
+
+    def _scan(self):
+        """(mtime, tamaño, ruta) de cada entrada; borra las del formato plano anterior."""
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                if shard.name.endswith(".pdf"):
+                    try:
+                        os.unlink(shard.path)
+                    except FileNotFoundError:
+                        pass
+                continue
+            try:
+                files = list(os.scandir(shard.path))
+            except FileNotFoundError:
+                continue
+            for entry in files:
+                if not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.EVICT_TARGET
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except FileNotFoundError:
+                    continue
+                try:
+                    os.rmdir(os.path.dirname(path))
+                except OSError:
+                    pass  # quedan otras versiones del documento
+        with self._lock:
+            self._total = total
+
+
+class RedisPDFCache:
+    """Cache en Redis: valores binarios + sorted set de último acceso para el LRU."""
+
+    PREFIX = "pdfcache:"
+
+    def __init__(self, client, max_bytes: int):
+        self.client = client
+        self.max_bytes = max_bytes
+        self._lru = f"{self.PREFIX}lru"
+        self._sizes = f"{self.PREFIX}sizes"
+
+    def _data_key(self, key: str) -> str:
+        return f"{self.PREFIX}doc:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self.client.get(self._data_key(key))
+        if data is not None:
+            self.client.zadd(self._lru, {key: time.time()})
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self.client.pipeline() as pipe:
+            pipe.set(self._data_key(key), data)
+            pipe.zadd(self._lru, {key: time.time()})
+            pipe.hset(self._sizes, key, len(data))
+            pipe.execute()
+        self._evict()
+
+    def invalidate(self, prefix: str) -> int:
+        keys = [
+            k.decode() if isinstance(k, bytes) else k
+            for k in self.client.hkeys(self._sizes)
+        ]
+        doomed = [k for k in keys if k.startswith(prefix)]
+        if doomed:
+            self._drop(doomed)
+        return len(doomed)
+
+    def _drop(self, keys) -> None:
+        with self.client.pipeline() as pipe:
+            pipe.delete(*[self._data_key(k) for k in keys])
+            pipe.zrem(self._lru, *keys)
+            pipe.hdel(self._sizes, *keys)
+            pipe.execute()
+
+    def _evict(self) -> None:
+        sizes = self.client.hvals(self._sizes)
+        total = sum(int(s) for s in sizes)
+        while total > self.max_bytes:
+            oldest = self.client.zrange(self._lru, 0, 9)
+            if not oldest:
+                break
+            oldest = [k.decode() if isinstance(k, bytes) else k for k in oldest]
+            freed = self.client.hmget(self._sizes, oldest)
+            self._drop(oldest)
+            total -= sum(int(s or 0) for s in freed)
+
+
+# ---------------------------------------------------------------------------
+# API pública
+# ---------------------------------------------------------------------------
+
+def init_app(app) -> None:
+    """Configure the PDF cache backend from Flask app config."""
+    global _cache
+    _cache = None
+
+    if not app.config.get("PDF_CACHE_ENABLED", True):
+        logger.info("PDF cache disabled by PDF_CACHE_ENABLED=False")
+        return
+
+    max_bytes = app.config.get("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    backend = (app.config.get("PDF_CACHE_BACKEND") or "disk").lower()
+
+    if backend == "redis" and app.config.get("REDIS_ENABLED", True) and app.config.get("REDIS_URL"):
+        try:
+            import redis as redis_module
+
+            timeout = app.config.get("REDIS_SOCKET_TIMEOUT", 2)
+            client = redis_module.from_url(
+                app.config["REDIS_URL"],
+                socket_connect_timeout=timeout,
+                socket_timeout=timeout,
+            )
+            client.ping()
+            _cache = RedisPDFCache(client, max_bytes)
+            logger.info("PDF cache using Redis")
+            return
+        except Exception:
+            logger.warning("Redis unavailable for PDF cache — falling back to disk")
+
+    directory = app.config.get("PDF_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), "transportadora-pdf-cache")
+    try:
+        _cache = DiskPDFCache(directory, max_bytes)
+        logger.info("PDF cache using disk directory %s", directory)
+    except OSError:
+        logger.warning("PDF cache directory not writable — cache disabled")
+        _cache = None
+
+
+def build_key(kind: str, doc_id: int, data: Any, layout_version: str) -> str:
+    """Return the content-addressed key ``<kind>-<id>-<sha256>``."""
+    payload = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    digest = hashlib.sha256(
+        f"{layout_version}\x00{payload}".encode("utf-8")).hexdigest()
+    return f"{kind}-{doc_id}-{digest}"
+
+
+def get(key: str) -> Optional[bytes]:
+    if _cache is None:
+        return None
+    try:
+        return _cache.get(key)
+    except Exception:
+        logger.warning("PDF cache read failed", extra={'cache_key': key})
+        return None
+
+
+def put(key: str, data: bytes) -> None:
+    if _cache is None:
+        return
+    try:
+        _cache.put(key, data)
+    except Exception:
+        logger.warning("PDF cache write failed", extra={'cache_key': key})
+
+
+def get_or_render(key: str, render: Callable[[], bytes]) -> tuple[bytes, bool]:
+    """Return ``(pdf_bytes, hit)``, rendering and storing on a miss."""
+    cached = get(key)
+    if cached is not None:
+        return cached, True
+    with metrics.pdf_render_timer(key.split("-", 1)[0]):
+        data = render()
+    put(key, data)
+    return data, False
+
+
+def invalidate(kind: str, doc_id: int) -> None:
+    """Drop every cached render of one document (all data versions)."""
+    if _cache is None:
+        return
+    try:
+        _cache.invalidate(f"{kind}-{doc_id}-")
+    except Exception:
+        logger.warning("PDF cache invalidation failed",
+                       extra={'kind': kind, 'doc_id': doc_id})
@@ -0,0 +1,308 @@
+"""
+Background PDF render jobs (opt-in ``?async=1`` on the PDF endpoints).
+
+Rendering runs in a local pool so the gunicorn sync worker is free to serve
+other requests while a burst of downloads is processed:
+
+* ``process`` (default) — ``ProcessPoolExecutor`` with the ``spawn`` start
+  method; each child builds its own app (and DB engine) once at startup.
+* ``thread``  — ``ThreadPoolExecutor`` sharing the current app (tests/dev).
+
+Job state and results live in a store shared by every gunicorn worker, so
+``GET /api/pdf-jobs/<id>`` can be answered by any of them:
+
+* ``disk``  — JSON + PDF files under ``PDF_JOBS_DIR``.
+* ``redis`` — keys with TTL in the existing Redis.
+
+Jobs expire after ``PDF_JOBS_TTL_SECONDS``. A job function is any picklable
+module-level callable returning ``(pdf_bytes, download_name)``; it runs
+inside an app context.
+
+Call init_app(app) at startup.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+
+_app = None
+_store = None
+_executor = None
+_executor_pid = None
+_pending = 0
+_lock = threading.Lock()
+
+
+class JobQueueFull(Exception):
+    """Demasiados trabajos pendientes en este worker."""
+
+
+# ---------------------------------------------------------------------------
+# Stores
+# ---------------------------------------------------------------------------
+
+class DiskJobStore:
+    """Estado de trabajos en disco local (compartido entre workers del host)."""
+
+    def __init__(self, directory: str, ttl: int):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{ext}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def save(self, job: dict) -> None:
+        self._write(self._path(job["id"], "json"),
+                    json.dumps(job).encode("utf-8"))
+
+    def load(self, job_id: str) -> Optional[dict]:
+        try:
+            with open(self._path(job_id, "json"), "rb") as fh:
+                job = json.loads(fh.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        if time.time() - job.get("created_at", 0) > self.ttl:
+            self.delete(job_id)
+            return None
+        return job
+
+    def save_result(self, job_id: str, data: bytes) -> None:
+        self._write(self._path(job_id, "pdf"), data)
+
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        try:
+            with open(self._path(job_id, "pdf"), "rb") as fh:
+                return fh.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, job_id: str) -> None:
+        for ext in ("json", "pdf"):
+            try:
+                os.unlink(self._path(job_id, ext))
+            except FileNotFoundError:
+                pass
+
+    def sweep(self) -> None:
+        """Borra los trabajos vencidos (se llama al crear uno nuevo)."""
+        limit = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < limit:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class RedisJobStore:
+    """Estado de trabajos en Redis; las claves vencen solas con el TTL."""
+
+    PREFIX = "pdfjobs:"
+
+    def __init__(self, client, ttl: int):
+        self.client = client
+        self.ttl = ttl
+
+    def save(self, job: dict) -> None:
+        self.client.setex(f"{self.PREFIX}job:{job['id']}", self.ttl, json.dumps(job))
+
+    def load(self, job_id: str) -> Optional[dict]:
+        raw = self.client.get(f"{self.PREFIX}job:{job_id}")
+        return json.loads(raw) if raw is not None else None
+
+    def save_result(self, job_id: str, data: bytes) -> None:
+        self.client.setex(f"{self.PREFIX}result:{job_id}", self.ttl, data)
+
+    def load_result(self, job_id: str) -> Optional[bytes]:
+        return self.client.get(f"{self.PREFIX}result:{job_id}")
+
+    def sweep(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def _init_worker_process() -> None:
+    """Initializer de los procesos hijos: cada uno arma su propia app."""
+    from app import create_app
+
+    create_app()  # llama a init_app y deja la app en _app
+
+
+def _run_job(func: Callable, args: tuple):
+    with _app.app_context():
+        return func(*args)
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    if _executor is not None and _executor_pid == os.getpid():
+        return _executor
+
+    workers = max(1, _app.config.get("PDF_JOBS_WORKERS", 2))
+    if (_app.config.get("PDF_JOBS_EXECUTOR") or "process").lower() == "thread":
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-job")
+    else:
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker_process,
+        )
+    _executor_pid = os.getpid()
+    return _executor
+
+
+def _finish(job: dict, future) -> None:
+    global _executor, _pending
+    with _lock:
+        _pending -= 1
+    try:
+        pdf_bytes, download_name = future.result()
+        _store.save_result(job["id"], pdf_bytes)
+        job.update(status=STATUS_DONE, download_name=download_name,
+                   size=len(pdf_bytes))
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            with _lock:
+                _executor = None  # se recrea en el próximo submit
+        logger.exception("PDF job failed", extra={'job_id': job["id"], 'kind': job["kind"]})
+        job.update(status=STATUS_ERROR, error=str(e) or e.__class__.__name__)
+    job["finished_at"] = time.time()
+    try:
+        _store.save(job)
+    except Exception:
+        logger.exception("PDF job state could not be saved", extra={'job_id': job["id"]})
+
+
+# ---------------------------------------------------------------------------
+# API pública
+# ---------------------------------------------------------------------------
+
+def init_app(app) -> None:
+    """Configure the job store from Flask app config (the pool starts lazily)."""
+    global _app, _store
+    _app = app
+    _store = None
+    ttl = app.config.get("PDF_JOBS_TTL_SECONDS", 900)
+    backend = (app.config.get("PDF_JOBS_BACKEND") or "disk").lower()
+
+    if backend == "redis" and app.config.get("REDIS_ENABLED", True) and app.config.get("REDIS_URL"):
+        try:
+            import redis as redis_module
+
+            timeout = app.config.get("REDIS_SOCKET_TIMEOUT", 2)
+            client = redis_module.from_url(
+                app.config["REDIS_URL"],
+                socket_connect_timeout=timeout,
+                socket_timeout=timeout,
+            )
+            client.ping()
+            _store = RedisJobStore(client, ttl)
+            logger.info("PDF jobs using Redis")
+            return
+        except Exception:
+            logger.warning("Redis unavailable for PDF jobs — falling back to disk")
+
+    directory = app.config.get("PDF_JOBS_DIR") or os.path.join(
+        tempfile.gettempdir(), "transportadora-pdf-jobs")
+    try:
+        _store = DiskJobStore(directory, ttl)
+    except OSError:
+        logger.warning("PDF jobs directory not writable — async PDF disabled")
+        _store = None
+
+
+def is_enabled() -> bool:
+    return _store is not None
+
+
+def submit(kind: str, func: Callable, *args: Any, owner_id: Optional[int] = None) -> dict:
+    """
+    Encola ``func(*args)`` y devuelve el registro del trabajo.
+
+    Lanza JobQueueFull si este worker ya tiene PDF_JOBS_MAX_PENDING trabajos
+    sin terminar, y RuntimeError si el modo asíncrono no está disponible.
+    """
+    global _pending
+    if _store is None:
+        raise RuntimeError("Generación asíncrona de PDFs no disponible")
+
+    job = {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "status": STATUS_PENDING,
+        "owner_id": owner_id,
+        "created_at": time.time(),
+    }
+    with _lock:
+        if _pending >= _app.config.get("PDF_JOBS_MAX_PENDING", 100):
+            raise JobQueueFull()
+        _store.sweep()
+        _store.save(job)
+        future = _get_executor().submit(_run_job, func, args)
+        _pending += 1
+    future.add_done_callback(partial(_finish, dict(job)))
+    return job
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    if _store is None:
+        return None
+    try:
+        return _store.load(job_id)
+    except Exception:
+        logger.warning("PDF job read failed", extra={'job_id': job_id})
+        return None
+
+
+def get_result(job_id: str) -> Optional[bytes]:
+    if _store is None:
+        return None
+    try:
+        return _store.load_result(job_id)
+    except Exception:
+        logger.warning("PDF job result read failed", extra={'job_id': job_id})
+        return None
+
+
+def shutdown(wait: bool = True) -> None:
+    """Detiene el pool de este proceso (se recrea en el próximo submit)."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+atexit.register(shutdown, wait=False)
@@ -1,28 +1,107 @@
 """
-Redis-backed rate limiter with automatic DB fallback.
-
-Uses Redis sorted sets for sliding window rate limiting.
-If Redis is unavailable, falls back to querying login_attempts table.
-Call init_app(app) at startup to configure the Redis client.
+Sliding-window rate limiter: atomic Redis Lua script, in-process fallback.
+
+Limits are kept per *bucket* (what is limited: ``login:ip``, ``login:id``,
+an endpoint group...) and *identifier* (who: an IP, an e-mail, a user id).
+``hit()`` checks and records in one step, so concurrent requests cannot
+both squeeze through the last free slot:
+
+* Redis: a Lua script trims the window, counts and — only when the request
+  is allowed — adds a unique member (``<ms>-<random>``) to the sorted set
+  ``rl:<bucket>:<identifier>``. Requests in the same millisecond never
+  collapse into one entry.
+* No Redis (not configured, down, or failing mid-request): a token bucket
+  per key in this process (capacity ``limit``, refilled at
+  ``limit / window`` per second). Limits become per-worker but no request
+  ever scans ``login_attempts``.
+
+A request may weigh more than one slot (``cost``), so a request that does
+more work pays for it (a PDF batch pays one slot per CRT). API routes use the
+``@rate_limit`` decorator from ``app.security.decorators``; the limit that
+applied to a request is reported in ``RateLimit-*`` / ``Retry-After``
+response headers.
+
+Call init_app(app) at startup to configure the Redis client and the
+response headers.
 """
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
-from typing import Optional
+import math
+import threading
+import time
+import uuid
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from flask import g
+
+from app.services import metrics
 
 logger = logging.getLogger(__name__)
 
+KEY_PREFIX = "rl:"
+LOCAL_MAX_BUCKETS = 10_000
+
+# KEYS[1] = bucket; ARGV = now_ms, window_ms, limit, member, cost
+# Devuelve {permitido (0/1), entradas en la ventana, ms hasta que se libere un lugar}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[5])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count + cost <= limit then
+    for i = 1, cost do
+        redis.call('ZADD', key, now, ARGV[4] .. ':' .. i)
+    end
+    redis.call('PEXPIRE', key, window)
+    count = count + cost
+    allowed = 1
+end
+
+local reset = window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+return {allowed, count, reset}
+"""
+
+_G_KEY = "_rate_limit"
+
 _redis_client = None
+_script = None
+_local: Dict[Tuple[str, str], list] = {}
+_local_lock = threading.Lock()
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # segundos hasta que se libera un lugar
+    count: int          # solicitudes dentro de la ventana (incluida esta si pasó)
+
+    @property
+    def retry_after(self) -> Optional[int]:
+        return None if self.allowed else max(1, math.ceil(self.reset_after))
 
 
 def init_app(app) -> None:
     """Initialize the Redis client from Flask app config.
 
     Call once at application startup. If Redis is disabled or the connection
-    fails, the rate limiter silently degrades to the DB-based fallback.
+    fails, the rate limiter silently degrades to the in-process buckets.
     """
-    global _redis_client
+    global _redis_client, _script
+    _redis_client = None
+    _script = None
+    reset()
+    app.after_request(_add_headers)
 
     if not app.config.get("REDIS_ENABLED", True):
         logger.info("Redis rate limiting disabled by REDIS_ENABLED=False")
@@ -30,7 +109,7 @@ def init_app(app) -> None:
 
     url = app.config.get("REDIS_URL")
     if not url:
-        logger.info("REDIS_URL not set — using DB-based rate limiting")
+        logger.info("REDIS_URL not set — using in-process rate limiting")
         return
 
     timeout = app.config.get("REDIS_SOCKET_TIMEOUT", 2)
@@ -46,108 +125,128 @@ def init_app(app) -> None:
             health_check_interval=30,
         )
         client.ping()
+        _script = client.register_script(SLIDING_WINDOW_LUA)
         _redis_client = client
         logger.info("Redis connected for rate limiting")
     except Exception:
-        logger.warning("Redis unavailable — falling back to DB rate limiting")
+        logger.warning("Redis unavailable — falling back to in-process rate limiting")
         _redis_client = None
 
 
+def hit(bucket: str, identifier: str, limit: int, window_seconds: int = 60, cost: int = 1) -> RateLimitResult:
+    """Count *cost* slots of *identifier* against *bucket* unless that would exceed *limit*."""
+    identifier = str(identifier)
+    if _redis_client is not None:
+        try:
+            result = _hit_redis(bucket, identifier, limit, window_seconds, cost)
+            metrics.count_rate_limit_check("redis")
+            return result
+        except Exception:
+            logger.warning("Redis rate check failed — using in-process bucket",
+                           extra={'bucket': bucket})
+    metrics.count_rate_limit_check("memory")
+    return _hit_local(bucket, identifier, limit, window_seconds, cost)
+
+
+def track(result: RateLimitResult, window_seconds: int) -> None:
+    """Report *result* in this response's headers (the tightest limit wins)."""
+    current = g.get(_G_KEY)
+    if current is None or not result.allowed or result.remaining < current[0].remaining:
+        setattr(g, _G_KEY, (result, window_seconds))
+
+
+def response_headers(result: RateLimitResult, window_seconds: int) -> Dict[str, str]:
+    """``RateLimit-*`` headers (IETF httpapi draft) plus ``Retry-After`` when blocked."""
+    headers = {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(max(0, math.ceil(result.reset_after))),
+        "RateLimit-Policy": f"{result.limit};w={window_seconds}",
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(result.retry_after)
+    return headers
+
+
 def check_rate_limit(
-    ip: str,
+    identifier: str,
     limit: int,
-    backoff_factor: float,
+    backoff_factor: float = 1.0,
     window_seconds: int = 60,
+    bucket: str = "login:ip",
 ) -> Optional[int]:
-    """Check whether *ip* has exceeded the rate limit.
+    """Record an attempt of *identifier* and return ``retry_after_seconds`` if it is limited.
 
-    Returns ``retry_after_seconds`` if the IP is rate-limited, or ``None``
-    if the request may proceed.
+    Returns ``None`` if the request may proceed. Blocked attempts back off
+    exponentially with *backoff_factor*, as the login limiter always did: the
+    n-th blocked attempt within the window waits ``window * factor ** n``
+    (n capped at *limit*). Blocked attempts take no slot in *bucket*, so they
+    are counted in their own ``<bucket>:over`` bucket.
     """
-    r = _redis_client
-    if r is not None:
-        return _check_redis(r, ip, limit, backoff_factor, window_seconds)
-    return _check_db(ip, limit, backoff_factor, window_seconds)
-
-
-def record_attempt(ip: str, window_seconds: int = 60) -> None:
-    """Record a login attempt timestamp for *ip* in Redis.
+    result = hit(bucket, identifier, limit, window_seconds)
+    if result.allowed:
+        return None
+    over = hit(f"{bucket}:over", identifier, limit, window_seconds)
+    return int(window_seconds * (backoff_factor ** max(1, over.count)))
 
-    No-op when Redis is unavailable — the DB fallback path reads directly
-    from the ``login_attempts`` table so there is nothing to replicate.
-    """
-    r = _redis_client
-    if r is None:
-        return
 
-    now = int(datetime.utcnow().timestamp())
-    key = _key(ip)
-
-    try:
-        with r.pipeline() as pipe:
-            pipe.zremrangebyscore(key, 0, now - window_seconds)
-            pipe.zadd(key, {str(now): now})
-            pipe.expire(key, window_seconds * 2)
-            pipe.execute()
-    except Exception:
-        logger.warning("Failed to record rate-limit attempt in Redis")
+def reset() -> None:
+    """Forget every in-process bucket (Redis keys expire on their own)."""
+    with _local_lock:
+        _local.clear()
 
 
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
-def _key(ip: str) -> str:
-    return f"rl:{ip}"
-
-
-def _check_redis(
-    r, ip: str, limit: int, backoff_factor: float, window_seconds: int
-) -> Optional[int]:
-    key = _key(ip)
-    now = int(datetime.utcnow().timestamp())
-
-    try:
-        with r.pipeline() as pipe:
-            pipe.zremrangebyscore(key, 0, now - window_seconds)
-            pipe.zcard(key)
-            results = pipe.execute()
-
-        count: int = results[1]  # zcard result
-        if count >= limit:
-            attempts_over = count - limit + 1
-            retry_after = int(
-                window_seconds * (backoff_factor ** max(1, attempts_over))
-            )
-            return retry_after
-    except Exception:
-        logger.exception("Redis rate check failed — falling back to DB")
-        return _check_db(ip, limit, backoff_factor, window_seconds)
-
-    return None
-
-
-def _check_db(
-    ip: str, limit: int, backoff_factor: float, window_seconds: int
-) -> Optional[int]:
-    """Fallback — query ``login_attempts`` table (original behaviour)."""
-    from app.models import LoginAttempt
-
-    try:
-        window_start = datetime.utcnow() - timedelta(seconds=window_seconds)
-        attempts = (
-            LoginAttempt.query
-            .filter(LoginAttempt.ip == ip)
-            .filter(LoginAttempt.created_at >= window_start)
-            .count()
-        )
-        if attempts >= limit:
-            attempts_over = attempts - limit + 1
-            retry_after = int(
-                window_seconds * (backoff_factor ** max(1, attempts_over))
-            )
-            return retry_after
-    except Exception:
-        logger.warning("DB rate check failed (table may not exist yet)")
-
-    return None
+def _key(bucket: str, identifier: str) -> str:
+    return f"{KEY_PREFIX}{bucket}:{identifier}"
+
+
+def _add_headers(response):
+    tracked = g.pop(_G_KEY, None)
+    if tracked is not None:
+        response.headers.update(response_headers(*tracked))
+    return response
+
+
+def _hit_redis(bucket: str, identifier: str, limit: int, window_seconds: int, cost: int) -> RateLimitResult:
+    now_ms = int(time.time() * 1000)
+    member = f"{now_ms}-{uuid.uuid4().hex[:12]}"
+    allowed, count, reset_ms = _script(
+        keys=[_key(bucket, identifier)],
+        args=[now_ms, window_seconds * 1000, limit, member, cost],
+    )
+    count = int(count)
+    return RateLimitResult(bool(allowed), limit, max(0, limit - count), int(reset_ms) / 1000, count)
+
+
+def _hit_local(bucket: str, identifier: str, limit: int, window_seconds: int, cost: int) -> RateLimitResult:
+    rate = limit / window_seconds
+    now = time.monotonic()
+    key = (bucket, identifier)
+    with _local_lock:
+        state = _local.get(key)
+        if state is None:
+            if len(_local) >= LOCAL_MAX_BUCKETS:
+                _prune_local(now)
+            state = _local[key] = [float(limit), now, window_seconds]
+        tokens = min(float(limit), state[0] + (now - state[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        state[0], state[1] = tokens, now
+
+    used = limit - tokens
+    count = math.ceil(used) if allowed else limit
+    # Sin cupo: hasta juntar `cost` tokens; con cupo: hasta recargar el bucket completo
+    reset_after = (cost - tokens) / rate if not allowed else used / rate
+    return RateLimitResult(allowed, limit, int(tokens), reset_after, count)
+
+
+def _prune_local(now: float) -> None:
+    """Drop buckets idle for a whole window: they are full again (caller holds the lock)."""
+    for key, (_, updated, window_seconds) in list(_local.items()):
+        if now - updated >= window_seconds:
+            del _local[key]
@@ -0,0 +1,256 @@
+"""
+Reportes de honorarios sobre la tabla resumen `honorarios_resumen`.
+
+La tabla guarda cantidad y total por (transportadora, mes, moneda,
+tipo_operacion) y se mantiene de forma incremental: los eventos del mapper
+de Honorario (alta, modificación y baja por el ORM, desde las rutas o desde
+honorario_service) aplican el delta con un UPSERT en la misma transacción
+del flush. Los reportes leen solo esa tabla, así que su costo depende de la
+cantidad de transportadoras y meses, no del historial de honorarios.
+
+Lo que se escriba por fuera del ORM (SQL directo, cargas masivas) se
+corrige con `reconstruir_resumen()`, que recalcula todo con un GROUP BY:
+
+    flask reportes reconstruir     # p. ej. desde cron, una vez por noche
+"""
+import logging
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+import click
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.orm import attributes
+
+from app import db
+from app.models import Honorario, HonorarioResumen, Moneda, Transportadora
+
+logger = logging.getLogger(__name__)
+
+TIPO_OPERACION_DEFECTO = "EXPORTACION"
+MES_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+CAMPOS_CLAVE = ("transportadora_id", "fecha", "moneda_id", "tipo_operacion")
+
+_eventos_registrados = False
+
+
+# =============================
+#   CLAVES
+# =============================
+
+def mes_de(fecha):
+    """Mes `YYYY-MM` de una fecha (date, datetime o texto ISO)."""
+    if fecha is None:
+        fecha = date.today()
+    if isinstance(fecha, (date, datetime)):
+        return fecha.strftime("%Y-%m")
+    return str(fecha)[:7]
+
+
+def clave_resumen(transportadora_id, fecha, moneda_id, tipo_operacion):
+    return {
+        "transportadora_id": int(transportadora_id),
+        "mes": mes_de(fecha),
+        "moneda_id": int(moneda_id),
+        "tipo_operacion": tipo_operacion or TIPO_OPERACION_DEFECTO,
+    }
+
+
+def _decimal(valor):
+    return Decimal(str(valor)) if valor is not None else Decimal("0")
+
+
+# =============================
+#   MANTENIMIENTO INCREMENTAL
+# =============================
+
+def _upsert_delta(connection, clave, cantidad, total):
+    """Suma (cantidad, total) a la fila de `clave`, creándola si no existe."""
+    tabla = HonorarioResumen.__table__
+    ahora = datetime.utcnow()
+    dialecto = connection.dialect.name
+    if dialecto in ("postgresql", "sqlite"):
+        if dialecto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(tabla).values(**clave, cantidad=cantidad, total=total, actualizado_en=ahora)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(clave),
+            set_={
+                "cantidad": tabla.c.cantidad + stmt.excluded.cantidad,
+                "total": tabla.c.total + stmt.excluded.total,
+                "actualizado_en": ahora,
+            },
+        )
+        connection.execute(stmt)
+        return
+
+    filtro = [tabla.c[col] == valor for col, valor in clave.items()]
+    actualizadas = connection.execute(
+        update(tabla).where(*filtro).values(
+            cantidad=tabla.c.cantidad + cantidad, total=tabla.c.total + total, actualizado_en=ahora)
+    ).rowcount
+    if not actualizadas:
+        connection.execute(insert(tabla).values(**clave, cantidad=cantidad, total=total, actualizado_en=ahora))
+
+
+def _valor_anterior(target, campo):
+    historia = attributes.get_history(target, campo)
+    if historia.deleted:
+        return historia.deleted[0]
+    if historia.unchanged:
+        return historia.unchanged[0]
+    return getattr(target, campo)
+
+
+def _honorario_insertado(mapper, connection, target):
+    clave = clave_resumen(target.transportadora_id, target.fecha, target.moneda_id, target.tipo_operacion)
+    _upsert_delta(connection, clave, 1, _decimal(target.monto))
+
+
+def _honorario_eliminado(mapper, connection, target):
+    anterior = {campo: _valor_anterior(target, campo) for campo in CAMPOS_CLAVE + ("monto",)}
+    clave = clave_resumen(anterior["transportadora_id"], anterior["fecha"],
+                          anterior["moneda_id"], anterior["tipo_operacion"])
+    _upsert_delta(connection, clave, -1, -_decimal(anterior["monto"]))
+
+
+def _honorario_actualizado(mapper, connection, target):
+    campos = CAMPOS_CLAVE + ("monto",)
+    if not any(attributes.get_history(target, campo).has_changes() for campo in campos):
+        return
+    anterior = {campo: _valor_anterior(target, campo) for campo in campos}
+    clave_anterior = clave_resumen(anterior["transportadora_id"], anterior["fecha"],
+                                   anterior["moneda_id"], anterior["tipo_operacion"])
+    clave_nueva = clave_resumen(target.transportadora_id, target.fecha, target.moneda_id, target.tipo_operacion)
+    _upsert_delta(connection, clave_anterior, -1, -_decimal(anterior["monto"]))
+    _upsert_delta(connection, clave_nueva, 1, _decimal(target.monto))
+
+
+def _sin_efecto(target, value, oldvalue, initiator):
+    return value
+
+
+def registrar_eventos():
+    """Engancha el mantenimiento del resumen a los flush de Honorario (una vez por proceso)."""
+    global _eventos_registrados
+    if _eventos_registrados:
+        return
+    _eventos_registrados = True
+    # active_history: al asignar sobre un objeto expirado (p. ej. tras un
+    # commit) se carga el valor anterior, necesario para descontar la clave vieja
+    for campo in CAMPOS_CLAVE + ("monto",):
+        event.listen(getattr(Honorario, campo), "set", _sin_efecto, active_history=True)
+    event.listen(Honorario, "after_insert", _honorario_insertado)
+    event.listen(Honorario, "after_update", _honorario_actualizado)
+    event.listen(Honorario, "after_delete", _honorario_eliminado)
+
+
+# =============================
+#   RECONSTRUCCIÓN
+# =============================
+
+def _mes_sql(columna):
+    if db.engine.dialect.name == "sqlite":
+        return func.strftime("%Y-%m", columna)
+    return func.to_char(columna, "YYYY-MM")
+
+
+def reconstruir_resumen():
+    """Recalcula `honorarios_resumen` desde `honorarios`. Devuelve las filas generadas."""
+    mes = _mes_sql(Honorario.fecha)
+    tipo = func.coalesce(Honorario.tipo_operacion, TIPO_OPERACION_DEFECTO)
+    agrupado = (
+        select(Honorario.transportadora_id, mes, Honorario.moneda_id, tipo,
+               func.count(Honorario.id), func.coalesce(func.sum(Honorario.monto), 0),
+               func.current_timestamp())
+        .group_by(Honorario.transportadora_id, mes, Honorario.moneda_id, tipo)
+    )
+    tabla = HonorarioResumen.__table__
+    db.session.execute(tabla.delete())
+    db.session.execute(insert(tabla).from_select(
+        ["transportadora_id", "mes", "moneda_id", "tipo_operacion", "cantidad", "total", "actualizado_en"],
+        agrupado))
+    db.session.commit()
+    filas = db.session.query(func.count(HonorarioResumen.id)).scalar()
+    logger.info("Resumen de honorarios reconstruido: %s filas", filas)
+    return filas
+
+
+# =============================
+#   CONSULTA
+# =============================
+
+def validar_mes(valor, nombre):
+    if valor and not MES_RE.match(valor):
+        raise ValueError(f"{nombre} debe tener formato YYYY-MM")
+    return valor or None
+
+
+def reporte_honorarios(desde=None, hasta=None, transportadora_id=None, moneda_id=None, tipo_operacion=None):
+    """Filas del resumen (con nombres de transportadora y moneda) y totales por moneda."""
+    query = (
+        db.session.query(HonorarioResumen, Transportadora.nombre, Moneda.codigo, Moneda.nombre)
+        .join(Transportadora, Transportadora.id == HonorarioResumen.transportadora_id)
+        .join(Moneda, Moneda.id == HonorarioResumen.moneda_id)
+        .filter(HonorarioResumen.cantidad > 0)
+    )
+    if desde:
+        query = query.filter(HonorarioResumen.mes >= desde)
+    if hasta:
+        query = query.filter(HonorarioResumen.mes <= hasta)
+    if transportadora_id:
+        query = query.filter(HonorarioResumen.transportadora_id == transportadora_id)
+    if moneda_id:
+        query = query.filter(HonorarioResumen.moneda_id == moneda_id)
+    if tipo_operacion:
+        query = query.filter(HonorarioResumen.tipo_operacion == tipo_operacion)
+    query = query.order_by(HonorarioResumen.mes.desc(), Transportadora.nombre, Moneda.codigo,
+                           HonorarioResumen.tipo_operacion)
+
+    items, totales = [], {}
+    for resumen, transportadora_nombre, moneda_codigo, moneda_nombre in query:
+        total = _decimal(resumen.total)
+        items.append({
+            "transportadora_id": resumen.transportadora_id,
+            "transportadora_nombre": transportadora_nombre,
+            "mes": resumen.mes,
+            "moneda_id": resumen.moneda_id,
+            "moneda_codigo": moneda_codigo,
+            "tipo_operacion": resumen.tipo_operacion,
+            "cantidad": resumen.cantidad,
+            "total": float(total),
+        })
+        acumulado = totales.setdefault(resumen.moneda_id, {
+            "moneda_id": resumen.moneda_id, "moneda_codigo": moneda_codigo,
+            "moneda_nombre": moneda_nombre, "cantidad": 0, "total": Decimal("0"),
+        })
+        acumulado["cantidad"] += resumen.cantidad
+        acumulado["total"] += total
+
+    return {
+        "items": items,
+        "totales": [dict(t, total=float(t["total"])) for t in totales.values()],
+    }
+
+
+# =============================
+#   INIT / CLI
+# =============================
+
+@click.group("reportes")
+def reportes_cli():
+    """Mantenimiento de las tablas de reportes."""
+
+
+@reportes_cli.command("reconstruir")
+def reconstruir_command():
+    """Recalcula honorarios_resumen desde honorarios."""
+    filas = reconstruir_resumen()
+    click.echo(f"honorarios_resumen: {filas} filas")
+
+
+def init_app(app):
+    registrar_eventos()
+    app.cli.add_command(reportes_cli)
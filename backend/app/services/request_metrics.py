@@ -0,0 +1,148 @@
+"""
+Per-request SQL instrumentation.
+
+Hooks the SQLAlchemy ``before_cursor_execute`` / ``after_cursor_execute``
+events on every Engine and accumulates, for the current request:
+
+* number of statements executed,
+* total time spent in the database,
+* the slowest statement and its duration.
+
+At the end of the request the numbers are exposed as a ``Server-Timing``
+header (visible in the browser dev tools) and logged as structured fields
+(``db_queries``, ``db_time_ms``, ``db_slowest_ms``...) through the regular
+JSON logging setup. Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are
+logged individually at WARNING level, inside or outside a request.
+
+The per-statement cost is two ``perf_counter()`` calls and a few attribute
+updates, so it is meant to stay on in production. ``SQL_METRICS_ENABLED``
+turns it off entirely; parameters are never logged.
+
+Call init_app(app) at startup.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Optional
+
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_G_KEY = "_sql_metrics"
+_STATEMENT_MAX_CHARS = 500
+
+_slow_query_ms = 500
+_log_requests = True
+_events_registered = False
+
+
+class RequestSqlStats:
+    __slots__ = ("started", "count", "total", "slowest", "slowest_statement")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+
+
+def init_app(app) -> None:
+    """Register the engine hooks and the request start/finish handlers."""
+    global _slow_query_ms, _log_requests
+    if not app.config.get("SQL_METRICS_ENABLED", True):
+        logger.info("SQL metrics disabled by SQL_METRICS_ENABLED=False")
+        return
+    _slow_query_ms = app.config.get("SLOW_QUERY_THRESHOLD_MS", 500)
+    _log_requests = app.config.get("REQUEST_METRICS_LOG", True)
+    _register_engine_events()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def current_stats() -> Optional[RequestSqlStats]:
+    """Stats of the request in progress (None outside a request or when disabled)."""
+    if not has_app_context():
+        return None
+    return g.get(_G_KEY)
+
+
+def _compact(statement: str) -> str:
+    return " ".join(statement.split())[:_STATEMENT_MAX_CHARS]
+
+
+# ---------------------------------------------------------------------------
+# Engine events
+# ---------------------------------------------------------------------------
+
+def _register_engine_events() -> None:
+    global _events_registered
+    if _events_registered:
+        return
+    _events_registered = True
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._sql_metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_sql_metrics_start", None)
+    if started is None:
+        return
+    elapsed = (time.perf_counter() - started) * 1000
+
+    stats = current_stats()
+    if stats is not None:
+        stats.count += 1
+        stats.total += elapsed
+        if elapsed > stats.slowest:
+            stats.slowest = elapsed
+            stats.slowest_statement = statement
+
+    if _slow_query_ms and elapsed >= _slow_query_ms:
+        logger.warning("Slow query", extra={
+            "db_duration_ms": round(elapsed, 1),
+            "db_statement": _compact(statement),
+            "path": request.path if has_request_context() else None,
+        })
+
+
+# ---------------------------------------------------------------------------
+# Request hooks
+# ---------------------------------------------------------------------------
+
+def _start_request() -> None:
+    g.setdefault(_G_KEY, RequestSqlStats())
+
+
+def _finish_request(response):
+    stats = g.pop(_G_KEY, None)
+    if stats is None:
+        return response
+    duration = (time.perf_counter() - stats.started) * 1000
+
+    response.headers["Server-Timing"] = ", ".join([
+        f'db;dur={stats.total:.1f};desc="{stats.count} queries"',
+        f"db-slowest;dur={stats.slowest:.1f}",
+        f"app;dur={duration:.1f}",
+    ])
+    if _log_requests:
+        logger.info("Request completed", extra={
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration, 1),
+            "db_queries": stats.count,
+            "db_time_ms": round(stats.total, 1),
+            "db_slowest_ms": round(stats.slowest, 1),
+            "db_slowest_statement": _compact(stats.slowest_statement) if stats.slowest_statement else None,
+        })
+    return response
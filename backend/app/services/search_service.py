@@ -0,0 +1,266 @@
+"""
+Búsqueda de texto indexada para CRTs, MICs, remitentes y transportadoras.
+
+Los listados buscaban con `ILIKE '%q%'` (y, en CRTs, outer joins + DISTINCT):
+ningún índice B-tree sirve para eso y cada búsqueda recorre las tablas
+enteras. Este servicio arma los filtros para que los resuelva un índice:
+
+  - PostgreSQL: índices GIN `gin_trgm_ops` (pg_trgm) sobre las columnas
+    cortas, que el planner usa directamente para `ILIKE '%q%'`, e índices
+    GIN sobre `to_tsvector('simple', ...)` para el texto libre
+    (`detalles_mercaderia`), que se busca por prefijo de palabras
+    (`soja gra` -> `soja:* & gra:*`). Los crea la migración
+    `a3c9e1f7b2d4`.
+  - SQLite (desarrollo y tests): una tabla FTS5 con tokenizer `trigram`
+    por entidad (`<tabla>_fts`, external content) mantenida por triggers,
+    con la misma semántica de subcadena que el ILIKE. La crean la migración
+    y, con `db.create_all()`, los eventos DDL registrados en `init_app`.
+  - Términos de menos de 3 caracteres (no hay trigramas), motores sin
+    FTS5 o tablas FTS aún no creadas: ILIKE como antes.
+
+Las búsquedas sobre entidades relacionadas (remitente y transportadora de
+un CRT) se resuelven con `id IN (subconsulta)` en lugar de joins, así el
+listado no necesita DISTINCT.
+
+Uso:
+    query.filter(search_service.match_any(q, Remitente.nombre, Remitente.numero_documento))
+    query.filter(search_service.crt_filter(q))
+"""
+import logging
+import re
+import sqlite3
+from typing import NamedTuple, Tuple
+
+from sqlalchemy import event, false, func, literal, literal_column, or_, select, table, text
+
+logger = logging.getLogger(__name__)
+
+MIN_TRIGRAM_LENGTH = 3
+TS_CONFIG = "simple"
+
+
+class SearchIndex(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    # Columnas de texto libre: tsvector en PostgreSQL (el resto usa trigramas)
+    text_columns: Tuple[str, ...] = ()
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+
+SEARCH_INDEXES = {
+    index.table: index
+    for index in (
+        SearchIndex("crts", ("numero_crt", "detalles_mercaderia"), ("detalles_mercaderia",)),
+        SearchIndex("mics", ("campo_23_numero_campo2_crt", "campo_1_transporte",
+                             "campo_11_placa", "campo_8_destino")),
+        SearchIndex("remitentes", ("nombre", "numero_documento")),
+        SearchIndex("transportadoras", ("nombre", "codigo", "direccion")),
+    )
+}
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_ddl_registered = False
+_fts_ready = set()
+
+
+# =============================
+#   ÍNDICES (DDL)
+# =============================
+
+def sqlite_fts_statements(index: SearchIndex):
+    """DDL de la tabla FTS5 de `index` y de los triggers que la sincronizan."""
+    t, fts = index.table, index.fts_table
+    cols = ", ".join(index.columns)
+    new = ", ".join(f"new.{c}" for c in index.columns)
+    old = ", ".join(f"old.{c}" for c in index.columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{t}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {t} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {t} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {t} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def sqlite_fts_supported() -> bool:
+    """FTS5 con tokenizer trigram (SQLite >= 3.34 compilado con FTS5)."""
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return False
+    try:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(a, tokenize='trigram')")
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def _create_fts(index: SearchIndex):
+    def listener(target, connection, **kw):
+        if connection.dialect.name != "sqlite":
+            return
+        for statement in sqlite_fts_statements(index):
+            connection.exec_driver_sql(statement)
+        # Tabla con datos previos (create_all sobre una base existente)
+        connection.exec_driver_sql(f"INSERT INTO {index.fts_table}({index.fts_table}) VALUES ('rebuild')")
+    return listener
+
+
+def _drop_fts(index: SearchIndex):
+    def listener(target, connection, **kw):
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {index.fts_table}")
+    return listener
+
+
+def _register_sqlite_ddl(metadata):
+    """Crea/borra las tablas FTS junto con sus tablas base en create_all/drop_all."""
+    global _ddl_registered
+    if _ddl_registered:
+        return
+    _ddl_registered = True
+    if not sqlite_fts_supported():
+        logger.warning("SQLite sin FTS5/trigram: la búsqueda usará ILIKE")
+        return
+    for index in SEARCH_INDEXES.values():
+        base = metadata.tables.get(index.table)
+        if base is None:
+            continue
+        event.listen(base, "after_create", _create_fts(index))
+        event.listen(base, "before_drop", _drop_fts(index))
+
+
+def postgres_index_statements(index: SearchIndex):
+    """DDL de los índices GIN de `index` en PostgreSQL (los mismos de la migración)."""
+    statements = []
+    for column in index.columns:
+        if column in index.text_columns:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{index.table}_{column}_tsv ON {index.table} "
+                f"USING gin (to_tsvector('{TS_CONFIG}', coalesce({column}, '')))")
+        else:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{index.table}_{column}_trgm ON {index.table} "
+                f"USING gin ({column} gin_trgm_ops)")
+    return statements
+
+
+def _fts_available(index: SearchIndex) -> bool:
+    """True si la tabla FTS de `index` existe (solo se cachean los positivos)."""
+    from app import db
+
+    key = (str(db.engine.url), index.fts_table)
+    if key in _fts_ready:
+        return True
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": index.fts_table},
+    ).first() is not None
+    if exists:
+        _fts_ready.add(key)
+    return exists
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+# =============================
+#   FILTROS
+# =============================
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _ilike_any(term, columns):
+    pattern = _like_pattern(term)
+    return or_(*[column.ilike(pattern, escape="\\") for column in columns])
+
+
+def _prefix_tsquery(term: str) -> str:
+    return " & ".join(f"{word}:*" for word in _WORD_RE.findall(term))
+
+
+def ts_document(column):
+    """Expresión tsvector de una columna de texto libre (la misma del índice GIN)."""
+    return func.to_tsvector(literal_column(f"'{TS_CONFIG}'"),
+                            func.coalesce(column, literal_column("''")))
+
+
+def _postgres_match(term, index, columns):
+    clauses = []
+    tsquery = _prefix_tsquery(term)
+    for column in columns:
+        if column.key in index.text_columns and tsquery:
+            clauses.append(ts_document(column).op("@@")(
+                func.to_tsquery(literal_column(f"'{TS_CONFIG}'"), literal(tsquery))))
+        else:
+            clauses.append(_ilike_any(term, [column]))
+    return or_(*clauses)
+
+
+def _sqlite_match(term, index, model, columns):
+    fts = index.fts_table
+    names = " ".join(column.key for column in columns)
+    expression = f"{{{names}}} : {_fts_phrase(term)}"
+    ids = (select(literal_column("rowid"))
+           .select_from(table(fts))
+           .where(literal_column(fts).op("MATCH")(literal(expression))))
+    return model.id.in_(ids)
+
+
+def match_any(term, *columns):
+    """
+    Filtro "alguna de `columns` contiene `term`" (sin distinguir mayúsculas),
+    resuelto con el índice de búsqueda de la tabla si lo hay. Todas las
+    columnas deben ser de un mismo modelo.
+    """
+    from app import db
+
+    term = (term or "").strip()
+    if not term:
+        return false()
+    model = columns[0].class_
+    index = SEARCH_INDEXES.get(model.__table__.name)
+    if index is None or any(column.key not in index.columns for column in columns):
+        return _ilike_any(term, columns)
+
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        return _postgres_match(term, index, columns)
+    if dialect == "sqlite" and len(term) >= MIN_TRIGRAM_LENGTH and _fts_available(index):
+        return _sqlite_match(term, index, model, columns)
+    return _ilike_any(term, columns)
+
+
+def crt_filter(term):
+    """
+    Búsqueda del listado de CRTs: número, detalle de mercadería, nombre del
+    remitente o de la transportadora.
+    """
+    from app.models import CRT, Remitente, Transportadora
+
+    return or_(
+        match_any(term, CRT.numero_crt, CRT.detalles_mercaderia),
+        CRT.remitente_id.in_(select(Remitente.id).where(match_any(term, Remitente.nombre))),
+        CRT.transportadora_id.in_(
+            select(Transportadora.id).where(match_any(term, Transportadora.nombre))),
+    )
+
+
+def init_app(app):
+    """Registra la creación de las tablas FTS5 junto con `create_all` (SQLite)."""
+    from app import db
+
+    _register_sqlite_ddl(db.metadata)
@@ -0,0 +1,166 @@
+"""
+Short-TTL cache for aggregated statistics (dashboard counters).
+
+Values are JSON-serializable dicts stored together with an ETag so the
+endpoint can answer ``If-None-Match`` without recomputing or serializing.
+
+Backends:
+
+* ``redis``   — shared by every worker when ``REDIS_ENABLED`` and
+  ``REDIS_URL`` are set (keys expire with ``SETEX``).
+* in-process  — a dict with expiry timestamps, used when Redis is not
+  configured or any Redis call fails.
+
+Entries are invalidated when a committed ORM session touched one of the
+tables registered with ``watch(key, tables)``, so catalog, CRT and MIC
+writes show up immediately instead of after the TTL.
+
+Call init_app(app) at startup. Every failure degrades to "cache miss".
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "stats:"
+
+_redis = None
+_local: Dict[str, Tuple[float, dict]] = {}
+_local_lock = threading.Lock()
+_watched: Dict[str, Set[str]] = {}
+_events_registered = False
+
+
+def init_app(app) -> None:
+    """Configure the Redis client (optional) and the invalidation hooks."""
+    global _redis
+    _redis = None
+    _local.clear()
+    _register_session_events()
+
+    if not (app.config.get("REDIS_ENABLED", True) and app.config.get("REDIS_URL")):
+        logger.info("Stats cache using in-process memory")
+        return
+    try:
+        import redis as redis_module
+
+        timeout = app.config.get("REDIS_SOCKET_TIMEOUT", 2)
+        client = redis_module.from_url(
+            app.config["REDIS_URL"],
+            decode_responses=True,
+            socket_connect_timeout=timeout,
+            socket_timeout=timeout,
+        )
+        client.ping()
+        _redis = client
+        logger.info("Stats cache using Redis")
+    except Exception:
+        logger.warning("Redis unavailable for stats cache — using in-process memory")
+
+
+def compute_etag(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _get(key: str) -> Optional[dict]:
+    if _redis is not None:
+        try:
+            raw = _redis.get(KEY_PREFIX + key)
+            return json.loads(raw) if raw else None
+        except Exception:
+            logger.warning("Stats cache read failed", extra={'cache_key': key})
+    with _local_lock:
+        entry = _local.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _put(key: str, entry: dict, ttl: int) -> None:
+    if _redis is not None:
+        try:
+            _redis.setex(KEY_PREFIX + key, ttl, json.dumps(entry, default=str))
+            return
+        except Exception:
+            logger.warning("Stats cache write failed", extra={'cache_key': key})
+    with _local_lock:
+        _local[key] = (time.monotonic() + ttl, entry)
+
+
+def get_or_compute(key: str, compute: Callable[[], dict], ttl: int) -> Tuple[dict, str]:
+    """
+    Return ``(value, etag)`` for *key*, calling *compute* on a miss.
+    ``ttl <= 0`` disables caching (always computes).
+    """
+    entry = _get(key) if ttl > 0 else None
+    if entry is None:
+        value = json.loads(json.dumps(compute(), default=str))
+        entry = {"value": value, "etag": compute_etag(value)}
+        if ttl > 0:
+            _put(key, entry, ttl)
+    return entry["value"], entry["etag"]
+
+
+def invalidate(*keys: str) -> None:
+    """Drop *keys* (or every entry when called without arguments)."""
+    keys = keys or tuple(_watched) or tuple(_local)
+    with _local_lock:
+        for key in keys:
+            _local.pop(key, None)
+    if _redis is not None and keys:
+        try:
+            _redis.delete(*[KEY_PREFIX + key for key in keys])
+        except Exception:
+            logger.warning("Stats cache invalidation failed", extra={'cache_keys': keys})
+
+
+def watch(key: str, tables: Iterable[str]) -> None:
+    """Invalidate *key* whenever a commit writes to any of *tables*."""
+    _watched.setdefault(key, set()).update(tables)
+
+
+# ---------------------------------------------------------------------------
+# Invalidación por commits del ORM
+# ---------------------------------------------------------------------------
+
+def _register_session_events() -> None:
+    global _events_registered
+    if _events_registered:
+        return
+    _events_registered = True
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_soft_rollback", _after_rollback)
+
+
+def _after_flush(session, flush_context) -> None:
+    if not _watched:
+        return
+    touched = session.info.setdefault("stats_cache_tables", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            touched.add(table)
+
+
+def _after_commit(session) -> None:
+    touched = session.info.pop("stats_cache_tables", None)
+    if not touched:
+        return
+    keys = [key for key, tables in _watched.items() if tables & touched]
+    if keys:
+        invalidate(*keys)
+
+
+def _after_rollback(session, previous_transaction) -> None:
+    session.info.pop("stats_cache_tables", None)
@@ -0,0 +1,177 @@
+"""
+Per-user access-token version cache for the stateless authentication path.
+
+Access tokens carry ``ver`` (``Usuario.token_version`` when issued). A
+token is accepted without loading the user only while that number still
+matches the user's current version, which is bumped on every change that
+must end existing sessions: roles, ``estado`` / ``is_active``, password and
+``revoke_all_tokens`` (logout from every device). Deleted or inactive users
+resolve to ``None`` and every token of theirs is rejected.
+
+Lookups go in-process dict (``AUTH_TOKEN_VERSION_TTL_SECONDS``) → Redis
+(shared by every worker, when configured) → one-column query on
+``usuarios``. Commits that bump a version write the new value straight to
+Redis and to the local dict, so the worker that made the change sees it at
+once and the others within the local TTL.
+
+Call init_app(app) at startup. Redis failures degrade to the DB lookup.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, attributes
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "auth:tv:"
+REDIS_TTL_SECONDS = 24 * 3600
+# Campos de Usuario cuyo cambio invalida los access tokens ya emitidos
+SECURITY_FIELDS = ("roles", "rol", "estado", "is_active", "clave_hash")
+_INACTIVE = "-"
+
+_redis = None
+_ttl = 10
+_local: Dict[int, Tuple[float, Optional[int]]] = {}
+_local_lock = threading.Lock()
+_events_registered = False
+
+
+def init_app(app) -> None:
+    """Configure the Redis client (optional) and the version-bump hooks."""
+    global _redis, _ttl
+    _redis = None
+    _ttl = app.config.get("AUTH_TOKEN_VERSION_TTL_SECONDS", 10)
+    _local.clear()
+    _register_events()
+
+    if not (app.config.get("REDIS_ENABLED", True) and app.config.get("REDIS_URL")):
+        return
+    try:
+        import redis as redis_module
+
+        timeout = app.config.get("REDIS_SOCKET_TIMEOUT", 2)
+        client = redis_module.from_url(
+            app.config["REDIS_URL"],
+            decode_responses=True,
+            socket_connect_timeout=timeout,
+            socket_timeout=timeout,
+        )
+        client.ping()
+        _redis = client
+    except Exception:
+        logger.warning("Redis unavailable for token versions — using DB lookups")
+
+
+def current_version(user_id: int) -> Optional[int]:
+    """Current token version of *user_id*, or ``None`` if the user is gone or inactive."""
+    now = time.monotonic()
+    with _local_lock:
+        entry = _local.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    version, found = _redis_get(user_id)
+    if not found:
+        version = _db_version(user_id)
+        _redis_set(user_id, version, only_if_missing=True)
+    with _local_lock:
+        _local[user_id] = (now + _ttl, version)
+    return version
+
+
+def publish(user_id: int, version: Optional[int]) -> None:
+    """Store a freshly committed version (``None`` = user deleted/inactive)."""
+    with _local_lock:
+        _local[user_id] = (time.monotonic() + _ttl, version)
+    _redis_set(user_id, version)
+
+
+def clear() -> None:
+    """Drop the in-process cache (Redis entries expire or get overwritten)."""
+    with _local_lock:
+        _local.clear()
+
+
+def _db_version(user_id: int) -> Optional[int]:
+    from app import db
+    from app.models import Usuario
+
+    row = db.session.execute(
+        select(Usuario.token_version, Usuario.is_active, Usuario.estado).where(Usuario.id == user_id)
+    ).first()
+    if row is None or not row.is_active or row.estado != "activo":
+        return None
+    return row.token_version or 0
+
+
+def _redis_get(user_id: int) -> Tuple[Optional[int], bool]:
+    if _redis is None:
+        return None, False
+    try:
+        raw = _redis.get(f"{KEY_PREFIX}{user_id}")
+    except Exception:
+        logger.warning("Token version read failed", extra={'user_id': user_id})
+        return None, False
+    if raw is None:
+        return None, False
+    return (None if raw == _INACTIVE else int(raw)), True
+
+
+def _redis_set(user_id: int, version: Optional[int], only_if_missing: bool = False) -> None:
+    if _redis is None:
+        return
+    value = _INACTIVE if version is None else str(version)
+    try:
+        _redis.set(f"{KEY_PREFIX}{user_id}", value, ex=REDIS_TTL_SECONDS, nx=only_if_missing)
+    except Exception:
+        logger.warning("Token version write failed", extra={'user_id': user_id})
+
+
+# ---------------------------------------------------------------------------
+# Version bumps from ORM changes
+# ---------------------------------------------------------------------------
+
+def _register_events() -> None:
+    global _events_registered
+    if _events_registered:
+        return
+    _events_registered = True
+    from app.models import Usuario
+
+    event.listen(Usuario, "before_update", _before_update)
+    event.listen(Usuario, "after_delete", _after_delete)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_soft_rollback", _after_rollback)
+
+
+def _changed(session, target, version: Optional[int]) -> None:
+    session.info.setdefault("token_versions", {})[target.id] = version
+
+
+def _before_update(mapper, connection, target) -> None:
+    state = attributes.instance_state(target)
+    bumped = state.attrs.token_version.history.has_changes()
+    if not bumped and not any(state.attrs[field].history.has_changes() for field in SECURITY_FIELDS):
+        return
+    if not bumped:
+        target.token_version = (target.token_version or 0) + 1
+    active = target.is_active and target.estado == "activo"
+    _changed(state.session, target, target.token_version if active else None)
+
+
+def _after_delete(mapper, connection, target) -> None:
+    _changed(attributes.instance_state(target).session, target, None)
+
+
+def _after_commit(session) -> None:
+    for user_id, version in session.info.pop("token_versions", {}).items():
+        publish(user_id, version)
+
+
+def _after_rollback(session, previous_transaction) -> None:
+    session.info.pop("token_versions", None)
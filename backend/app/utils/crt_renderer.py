@@ -0,0 +1,549 @@
+"""
+Motor de render del CRT (Carta de Porte Internacional).
+
+`CRTRenderer` concentra el dibujo del documento para que la ruta HTTP, la
+exportación en lote y el CLI (`generar_crt.py`) compartan un único motor:
+
+- El formulario estático (rectángulos, círculo "CRT", títulos y el texto legal
+  bilingüe) se calcula una sola vez por proceso como una lista de operaciones
+  de canvas ya resueltas (el ajuste de líneas del texto legal incluido).
+- En cada documento esas operaciones se vuelcan una vez a un form XObject
+  ("crt_template", ver `app.utils.pdf_template`) que se estampa en cada página; encima se dibujan solo los
+  campos variables. En un PDF combinado de N CRTs el formulario se guarda una
+  sola vez.
+"""
+import re
+from io import BytesIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from app.utils.fonts import CRT_BOLD, CRT_REGULAR
+from app.utils.layout_crt import dibujar_lineas_dinamicas, lineas, LAYOUT_VERSION
+from app.utils.pdf_template import StaticTemplate
+from app.utils.text_layout import LONG_WORDS_SPLIT, fit_text, truncate_to_width, wrap_lines
+from app.utils.pdf_helpers import wrap_text_multiline, draw_text_fit_area, format_number, safe_get_attr
+
+
+def crt_pdf_options():
+    """Opciones de carga (eager loading) con todo lo que se imprime en el PDF."""
+    from sqlalchemy.orm import joinedload
+    from app.models import CRT, CRT_Gasto, Ciudad, Remitente, Transportadora
+
+    return (
+        joinedload(CRT.remitente).joinedload(
+            Remitente.ciudad).joinedload(Ciudad.pais),
+        joinedload(CRT.transportadora).joinedload(
+            Transportadora.ciudad).joinedload(Ciudad.pais),
+        joinedload(CRT.destinatario).joinedload(
+            Remitente.ciudad).joinedload(Ciudad.pais),
+        joinedload(CRT.consignatario).joinedload(
+            Remitente.ciudad).joinedload(Ciudad.pais),
+        joinedload(CRT.notificar_a).joinedload(
+            Remitente.ciudad).joinedload(Ciudad.pais),
+        joinedload(CRT.firma_destinatario).joinedload(
+            Remitente.ciudad).joinedload(Ciudad.pais),
+        joinedload(CRT.moneda),
+        joinedload(CRT.gastos).joinedload(CRT_Gasto.moneda_remitente),
+        joinedload(CRT.gastos).joinedload(CRT_Gasto.moneda_destinatario),
+        joinedload(CRT.ciudad_emision),
+        joinedload(CRT.pais_emision),
+    )
+
+
+# =============================
+#   PLANTILLA ESTÁTICA
+# =============================
+
+CRT_TEMPLATE = StaticTemplate(
+    "crt_template", lambda c: dibujar_lineas_dinamicas(c, lineas))
+
+
+# =============================
+#   HELPERS DE TEXTO
+# =============================
+
+def draw_text_fit_area_centered(
+    c, text, x, y_top, width, height,
+    fontName=CRT_REGULAR, min_font=5.0, max_font=9.0, leading_ratio=1.13, add_ellipsis=True
+):
+    text = (text or "").strip()
+    text = re.sub(r",(?!\s)", ", ", text)
+
+    layout = fit_text(text, fontName, width, height, min_font, max_font,
+                      step=0.5, leading_ratio=leading_ratio, long_words=LONG_WORDS_SPLIT)
+
+    if layout is not None and layout.fits:
+        font_size = layout.font_size
+        usable_lines = list(layout.lines)
+    else:
+        font_size = min_font
+        lines = wrap_lines(text, fontName, font_size, width, long_words=LONG_WORDS_SPLIT)
+        line_h = font_size * leading_ratio
+        max_lines = max(1, int(height // line_h))
+        usable_lines = list(lines[:max_lines])
+        if add_ellipsis and usable_lines:
+            ell = "..."
+            last = truncate_to_width(usable_lines[-1], fontName, font_size, width, suffix=ell)
+            usable_lines[-1] = (last + ell) if last else ell
+
+    c.setFont(fontName, font_size)
+    cy = y_top
+    cx = x + (width / 2.0)
+    for line in usable_lines:
+        c.drawCentredString(cx, cy, line)
+        cy -= font_size * leading_ratio
+    return cy
+
+
+# =============================
+#   RENDERER
+# =============================
+
+class CRTRenderer:
+    """Dibuja CRTs sobre la plantilla estática precalculada."""
+
+    layout_version = LAYOUT_VERSION
+
+    def __init__(self, pagesize=A4):
+        self.pagesize = pagesize
+
+    def render(self, crt):
+        """Devuelve el PDF (bytes) de un CRT."""
+        output = BytesIO()
+        c = canvas.Canvas(output, pagesize=self.pagesize)
+        self.draw_page(c, crt)
+        c.save()
+        return output.getvalue()
+
+    def render_many(self, crts, output):
+        """Escribe en `output` un único PDF con una página por CRT."""
+        c = canvas.Canvas(output, pagesize=self.pagesize)
+        for crt in crts:
+            self.draw_page(c, crt)
+            c.showPage()
+        c.save()
+        return output
+
+    def draw_page(self, c, crt):
+        """Estampa la plantilla y dibuja los campos del CRT en la página actual."""
+        CRT_TEMPLATE.stamp(c)
+        self._draw_fields(c, crt)
+
+    def _draw_fields(self, c, crt):
+        remitente = crt.remitente
+        transportadora = crt.transportadora
+        destinatario = crt.destinatario
+        consignatario = crt.consignatario
+        notificar_a = crt.notificar_a
+        firma_destinatario = crt.firma_destinatario
+
+        max_width = 250
+        max_width_trans = 250
+
+        # =============== CAMPO 1: REMITENTE ===============
+        if remitente:
+            x_rem = 35
+            y_rem = 842 - 87 - 12
+
+            c.setFont(CRT_BOLD, 7.98)
+            c.drawString(x_rem, y_rem, safe_get_attr(remitente, 'nombre'))
+
+            direccion_lines = wrap_text_multiline(
+                safe_get_attr(remitente, 'direccion'), CRT_REGULAR, 6, max_width)
+            c.setFont(CRT_REGULAR, 6)
+            for linea_dir in direccion_lines:
+                y_rem -= 9
+                c.drawString(x_rem, y_rem, linea_dir)
+
+            y_rem -= 9
+            ciudad = safe_get_attr(remitente.ciudad, 'nombre') if remitente.ciudad else ""
+            pais = safe_get_attr(remitente.ciudad.pais, 'nombre') if remitente.ciudad and remitente.ciudad.pais else ""
+            c.drawString(x_rem, y_rem, f"{ciudad} - {pais}")
+
+            y_rem -= 9
+            tipo_doc = safe_get_attr(remitente, 'tipo_documento', 'RUC')
+            num_doc = safe_get_attr(remitente, 'numero_documento')
+            c.drawString(x_rem, y_rem, f"{tipo_doc}: {num_doc}")
+
+        # =============== CAMPO 3: TRANSPORTADORA ===============
+        if transportadora:
+            x_trans = 300
+            max_width_trans = 250
+            y_trans_top = 842 - 105 - 12
+            height_trans = 58
+
+            # --- Nombre en negrita ---
+            nombre = safe_get_attr(transportadora, 'nombre').strip()
+            if nombre:
+                c.setFont(CRT_BOLD, 9)
+                c.drawCentredString(x_trans + max_width_trans/2, y_trans_top, nombre)
+                y_trans_top -= 12   # bajar la posición para no chocar con el resto
+
+            # --- Resto de datos ---
+            direccion = safe_get_attr(transportadora, 'direccion').strip()
+            tipo_doc_trans = safe_get_attr(transportadora, 'tipo_documento').strip()
+            num_doc_trans = safe_get_attr(transportadora, 'numero_documento').strip()
+            telefono = safe_get_attr(transportadora, 'telefono').strip()
+            ciudad_trans = safe_get_attr(transportadora.ciudad, 'nombre') if transportadora.ciudad else ""
+            pais_trans = safe_get_attr(transportadora.ciudad.pais, 'nombre') if (transportadora.ciudad and transportadora.ciudad.pais) else ""
+
+            bloque_lineas = []
+            if direccion:
+                bloque_lineas.append(direccion)
+            if tipo_doc_trans and num_doc_trans:
+                bloque_lineas.append(f"{tipo_doc_trans}: {num_doc_trans}")
+            if telefono:
+                bloque_lineas.append(f"Tel: {telefono}")
+            if ciudad_trans or pais_trans:
+                bloque_lineas.append(f"{ciudad_trans} - {pais_trans}")
+
+            bloque = "\n".join(bloque_lineas)
+
+            # resto en tamaño 7
+            draw_text_fit_area_centered(
+                c,
+                text=bloque,
+                x=x_trans,
+                y_top=y_trans_top,   # ya ajustado para no superponerse
+                width=max_width_trans,
+                height=height_trans - 12,  # reducir altura disponible
+                fontName=CRT_REGULAR,
+                min_font=7.0,
+                max_font=7.0,
+                leading_ratio=1.13,
+                add_ellipsis=True
+            )
+
+        # =============== CAMPO 4: DESTINATARIO ===============
+        if destinatario:
+            x_dest = 35
+            y_dest = 842 - 147 - 12
+
+            c.setFont(CRT_BOLD, 7.98)
+            c.drawString(x_dest, y_dest, safe_get_attr(destinatario, 'nombre'))
+
+            direccion_dest_lines = wrap_text_multiline(
+                safe_get_attr(destinatario, 'direccion'), CRT_REGULAR, 6, max_width)
+            c.setFont(CRT_REGULAR, 6)
+            for linea_dir in direccion_dest_lines:
+                y_dest -= 9
+                c.drawString(x_dest, y_dest, linea_dir)
+
+            y_dest -= 9
+            ciudad_dest = safe_get_attr(destinatario.ciudad, 'nombre') if destinatario.ciudad else ""
+            pais_dest = safe_get_attr(destinatario.ciudad.pais, 'nombre') if destinatario.ciudad and destinatario.ciudad.pais else ""
+            c.drawString(x_dest, y_dest, f"{ciudad_dest} - {pais_dest}")
+
+            y_dest -= 9
+            tipo_doc_dest = safe_get_attr(destinatario, 'tipo_documento', 'RUC')
+            num_doc_dest = safe_get_attr(destinatario, 'numero_documento')
+            c.drawString(x_dest, y_dest, f"{tipo_doc_dest}: {num_doc_dest}")
+
+        # =============== CAMPO 6: CONSIGNATARIO ===============
+        if consignatario:
+            x_cons = 35
+            y_cons = 842 - 206 - 12
+
+            c.setFont(CRT_BOLD, 7.98)
+            c.drawString(x_cons, y_cons, safe_get_attr(consignatario, 'nombre'))
+
+            direccion_cons_lines = wrap_text_multiline(
+                safe_get_attr(consignatario, 'direccion'), CRT_REGULAR, 6, max_width)
+            c.setFont(CRT_REGULAR, 6)
+            for linea_dir in direccion_cons_lines:
+                y_cons -= 9
+                c.drawString(x_cons, y_cons, linea_dir)
+
+            y_cons -= 9
+            ciudad_cons = safe_get_attr(consignatario.ciudad, 'nombre') if consignatario.ciudad else ""
+            pais_cons = safe_get_attr(consignatario.ciudad.pais, 'nombre') if consignatario.ciudad and consignatario.ciudad.pais else ""
+            c.drawString(x_cons, y_cons, f"{ciudad_cons} - {pais_cons}")
+
+            y_cons -= 9
+            tipo_doc_cons = safe_get_attr(consignatario, 'tipo_documento', 'RUC')
+            num_doc_cons = safe_get_attr(consignatario, 'numero_documento')
+            c.drawString(x_cons, y_cons, f"{tipo_doc_cons}: {num_doc_cons}")
+
+        # =============== CAMPO 9: NOTIFICAR A ===============
+        if notificar_a:
+            x_notif = 35
+            y_notif = 842 - 267 - 12
+
+            c.setFont(CRT_BOLD, 7.98)
+            c.drawString(x_notif, y_notif, safe_get_attr(notificar_a, 'nombre'))
+
+            direccion_notif_lines = wrap_text_multiline(
+                safe_get_attr(notificar_a, 'direccion'), CRT_REGULAR, 6, max_width)
+            c.setFont(CRT_REGULAR, 6)
+            for linea_dir in direccion_notif_lines:
+                y_notif -= 9
+                c.drawString(x_notif, y_notif, linea_dir)
+
+            y_notif -= 9
+            ciudad_notif = safe_get_attr(notificar_a.ciudad, 'nombre') if notificar_a.ciudad else ""
+            pais_notif = safe_get_attr(notificar_a.ciudad.pais, 'nombre') if notificar_a.ciudad and notificar_a.ciudad.pais else ""
+            c.drawString(x_notif, y_notif, f"{ciudad_notif} - {pais_notif}")
+
+            y_notif -= 9
+            tipo_doc_notif = safe_get_attr(notificar_a, 'tipo_documento', 'RUC')
+            num_doc_notif = safe_get_attr(notificar_a, 'numero_documento')
+            c.drawString(x_notif, y_notif, f"{tipo_doc_notif}: {num_doc_notif}")
+
+        # ========== Campo 2: Número CRT ==========
+        x_num_crt = 400
+        y_num_crt_ill = 92
+        y_num_crt_pdf = 842 - y_num_crt_ill
+        c.setFont(CRT_BOLD, 10)
+        c.drawString(x_num_crt, y_num_crt_pdf, str(crt.numero_crt))
+
+        # ========== Campo 5 ==========
+        x_emision = 300
+        y_emision = 842 - 168 - 20
+        texto_emision = "ASUNCION - PARAGUAY"
+        c.setFont(CRT_REGULAR, 8)
+        w_emision = stringWidth(texto_emision, CRT_REGULAR, 8)
+        c.drawString(x_emision + (max_width_trans - w_emision) / 2, y_emision, texto_emision)
+
+        # ========== Campo 7 ==========
+        x_campo7 = 300
+        y_campo7 = y_emision - 50
+        ciudad7 = safe_get_attr(remitente.ciudad, 'nombre') if remitente and remitente.ciudad else ""
+        pais7 = safe_get_attr(remitente.ciudad.pais, 'nombre') if remitente and remitente.ciudad and remitente.ciudad.pais else ""
+        fecha7 = crt.fecha_emision.strftime('%d-%m-%Y') if crt.fecha_emision else ""
+        texto_campo7 = f"{ciudad7.upper()} - {pais7.upper()}-{fecha7}"
+        c.setFont(CRT_REGULAR, 8)
+        w_campo7 = stringWidth(texto_campo7, CRT_REGULAR, 8)
+        c.drawString(x_campo7 + (max_width_trans - w_campo7) / 2, y_campo7, texto_campo7)
+
+        # ========== Campo 8 ==========
+        x_campo8 = 300
+        y_campo8 = y_campo7 - 37
+        # Usar lugar_entrega del CRT si existe, sino usar ciudad del destinatario
+        texto_campo8 = safe_get_attr(crt, 'lugar_entrega')
+        if not texto_campo8:
+            ciudad_dest_8 = safe_get_attr(destinatario.ciudad, 'nombre') if destinatario and destinatario.ciudad else ""
+            pais_dest_8 = safe_get_attr(destinatario.ciudad.pais, 'nombre') if destinatario and destinatario.ciudad and destinatario.ciudad.pais else ""
+            texto_campo8 = f"{ciudad_dest_8} - {pais_dest_8}"
+        plazo = safe_get_attr(crt, 'plazo_entrega')
+        if plazo:
+            texto_campo8 = f"{texto_campo8} (Plazo: {plazo})"
+        c.setFont(CRT_REGULAR, 8)
+        w_campo8 = stringWidth(texto_campo8, CRT_REGULAR, 8)
+        c.drawString(x_campo8 + (max_width_trans - w_campo8) / 2, y_campo8, texto_campo8)
+
+        # ========== Campo 10 ==========
+        x_campo10 = 300
+        y_campo10 = y_campo8 - 37
+        texto_campo10 = safe_get_attr(crt, "transporte_sucesivos")
+        c.setFont(CRT_REGULAR, 7)
+        campo10_lines = wrap_text_multiline(texto_campo10, CRT_REGULAR, 7, max_width_trans)
+        for linea in campo10_lines:
+            w_line = stringWidth(linea, CRT_REGULAR, 7)
+            c.drawString(x_campo10 + (max_width_trans - w_line) / 2, y_campo10, linea)
+            y_campo10 -= 10
+
+        # ========== CAMPO 11: DETALLES DE MERCADERÍA ==========
+        x11 = 34
+        y11 = 498
+        width11 = 375
+        height11 = 100
+        texto_campo11 = safe_get_attr(crt, 'detalles_mercaderia')
+
+        draw_text_fit_area(
+            c, texto_campo11,
+            x=x11, y=y11, width=width11, height=height11,
+            fontName=CRT_REGULAR, min_font=4.80, max_font=7.50, leading_ratio=1.13
+        )
+
+        # ========== CAMPO 15: COSTOS ==========
+        y_start = 370
+        row_height = 14
+        y_min = 250
+
+        x_tramo = 38
+        max_tramo_width = 140 - x_tramo - 5
+        x_remitente = 180
+        x_moneda = 210
+        x_destinatario = 280
+
+        moneda_codigo = (
+            safe_get_attr(crt.moneda, "codigo") if crt.moneda and hasattr(crt.moneda, "codigo")
+            else (safe_get_attr(crt.moneda, "nombre") if crt.moneda else "")
+        )
+        gastos = crt.gastos or []
+        y_row = y_start
+        max_rows = int((y_start - y_min) // row_height)
+        gastos_visibles = gastos[:max_rows]
+
+        c.setFont(CRT_REGULAR, 8)
+        for gasto in gastos_visibles:
+            tramo_text = safe_get_attr(gasto, 'tramo')
+            draw_text_fit_area(
+                c, tramo_text, x=x_tramo, y=y_row, width=max_tramo_width,
+                height=row_height - 1, fontName=CRT_REGULAR, min_font=5, max_font=8, leading_ratio=1.13
+            )
+            valor_remitente = format_number(gasto.valor_remitente, 2) if gasto.valor_remitente not in [None, "None", ""] else ""
+            valor_destinatario = format_number(gasto.valor_destinatario, 2) if gasto.valor_destinatario not in [None, "None", ""] else ""
+            c.setFont(CRT_REGULAR, 8)
+            c.drawRightString(x_remitente, y_row, valor_remitente)
+            c.drawString(x_moneda, y_row, moneda_codigo)
+            c.drawRightString(x_destinatario, y_row, valor_destinatario)
+            y_row -= row_height
+
+        y_total = 308
+        total_remitente = sum(float(g.valor_remitente or 0) for g in gastos_visibles if g.valor_remitente not in [None, "None", ""])
+        total_destinatario = sum(float(g.valor_destinatario or 0) for g in gastos_visibles if g.valor_destinatario not in [None, "None", ""])
+        c.setFont(CRT_BOLD, 8)
+        if total_remitente:
+            c.drawRightString(x_remitente, y_total, format_number(total_remitente, 2))
+            c.drawString(x_moneda, y_total, moneda_codigo)
+        if total_destinatario:
+            c.drawRightString(x_destinatario, y_total, format_number(total_destinatario, 2))
+            c.drawString(x_moneda, y_total, moneda_codigo)
+
+        # ========== CAMPO 12: Peso bruto y neto ==========
+        x12_valor = 500
+        y12_pb = 505
+        y12_pn = 490
+
+        c.setFont(CRT_REGULAR, 10)
+        peso_bruto = format_number(crt.peso_bruto)
+        peso_neto = format_number(crt.peso_neto)
+        c.drawString(x12_valor, y12_pb, peso_bruto)
+        c.drawString(x12_valor, y12_pn, peso_neto)
+
+        # ========== CAMPO 13: Volumen ==========
+        x13 = 465
+        y13 = 472
+        volumen = format_number(crt.volumen, decimals=5)
+        c.setFont(CRT_REGULAR, 9)
+        c.drawString(x13, y13, volumen)
+
+        # ========== CAMPO 14: Incoterm, Moneda y Valor ==========
+        x14 = 415
+        y14 = 450
+        incoterm = safe_get_attr(crt, 'incoterm')
+        valor_incoterm = format_number(crt.valor_incoterm or 0, decimals=2)
+        c.setFont(CRT_REGULAR, 10)
+        c.drawString(x14, y14, incoterm)
+        c.drawString(x14 + 30, y14, moneda_codigo)
+        c.drawRightString(550, y14, valor_incoterm)
+
+        c.setFont(CRT_REGULAR, 9)
+        nombre_moneda = safe_get_attr(crt.moneda, 'nombre') if crt.moneda else ""
+        c.drawString(x14, y14 - 25, nombre_moneda.upper())
+
+        # Segundo Incoterm junto a la palabra "INCOTERM"
+        x_incoterm = 475
+        y_incoterm = y14 - 39
+        c.setFont(CRT_REGULAR, 10)
+        c.drawString(x_incoterm, y_incoterm, incoterm)
+
+        # ========== CAMPO 16: Declaración del valor ==========
+        x16 = 450
+        y16 = 842 - 442 - 8
+        c.setFont(CRT_BOLD, 8)
+        valor_declarado_campo16 = crt.declaracion_mercaderia if crt.declaracion_mercaderia else ""
+        c.drawString(x16, y16, valor_declarado_campo16)
+
+        # ========== CAMPO 17: Documentos Anexos ==========
+        x_factura = 465
+        y_factura = 371
+        x_despacho = 465
+        y_despacho = 357
+        c.setFont(CRT_BOLD, 9)
+        c.drawString(x_factura, y_factura, safe_get_attr(crt, 'factura_exportacion'))
+        c.drawString(x_despacho, y_despacho, safe_get_attr(crt, 'nro_despacho'))
+
+        # ========== CAMPO 18: Formalidades Aduana ==========
+        x18 = 305
+        y18 = 235
+        width18 = 410
+        height18 = 54
+        texto_campo18 = safe_get_attr(crt, 'formalidades_aduana')
+        draw_text_fit_area(
+            c, texto_campo18, x=x18, y=y18, width=width18,
+            height=height18, fontName=CRT_REGULAR, min_font=5.0, max_font=8.5, leading_ratio=1.13
+        )
+
+        # ========== CAMPO 19 ==========
+        x_moneda_19 = 110
+        x_valor_19 = 220
+        y_19 = 288
+        valor_flete_externo = ""
+        if gastos:
+            primer_gasto = gastos[0]
+            if primer_gasto.valor_remitente not in [None, "None", ""]:
+                valor_flete_externo = format_number(primer_gasto.valor_remitente, 2)
+            elif primer_gasto.valor_destinatario not in [None, "None", ""]:
+                valor_flete_externo = format_number(primer_gasto.valor_destinatario, 2)
+        codigo_moneda_19 = (
+            safe_get_attr(crt.moneda, "codigo") if crt.moneda and hasattr(crt.moneda, "codigo")
+            else (safe_get_attr(crt.moneda, "nombre") if crt.moneda else "")
+        )
+        c.setFont(CRT_REGULAR, 8)
+        c.drawString(x_moneda_19, y_19, codigo_moneda_19)
+        c.drawRightString(x_valor_19, y_19, valor_flete_externo)
+
+        # ========== CAMPO 20 ==========
+        x_moneda_20 = x_moneda_19
+        x_valor_20 = x_valor_19
+        y_20 = y_19 - 22
+        valor_reembolso = ""
+        if hasattr(crt, "valor_reembolso") and crt.valor_reembolso not in [None, "None", ""]:
+            valor_reembolso = format_number(crt.valor_reembolso, 2)
+        c.setFont(CRT_REGULAR, 8)
+        if valor_reembolso:
+            c.drawString(x_moneda_20, y_20, codigo_moneda_19)
+            c.drawRightString(x_valor_20, y_20, valor_reembolso)
+
+        # ========== CAMPO 21: REMITENTE ==========
+        x21_nombre = 38
+        y21_nombre = 230
+        x21_fecha = 100
+        y21_fecha = 193
+        remitente_nombre = safe_get_attr(remitente, 'nombre') if remitente else ""
+        fecha_remitente = crt.fecha_firma_remitente.strftime('%d/%m/%Y') if crt.fecha_firma_remitente else (crt.fecha_firma.strftime('%d/%m/%Y') if crt.fecha_firma else (crt.fecha_emision.strftime('%d/%m/%Y') if crt.fecha_emision else ""))
+        c.setFont(CRT_BOLD, 9)
+        c.drawString(x21_nombre, y21_nombre, remitente_nombre)
+        c.setFont(CRT_REGULAR, 8)
+        c.drawString(x21_fecha, y21_fecha, fecha_remitente)
+
+        # ========== CAMPO 23: TRANSPORTADORA ==========
+        x23_nombre = 38
+        y23_nombre = 130
+        x23_fecha = 100
+        y23_fecha = 87
+        transportadora_nombre = safe_get_attr(transportadora, 'nombre') if transportadora else ""
+        fecha_transportador = crt.fecha_firma_transportador.strftime('%d/%m/%Y') if crt.fecha_firma_transportador else (crt.fecha_firma.strftime('%d/%m/%Y') if crt.fecha_firma else (crt.fecha_emision.strftime('%d/%m/%Y') if crt.fecha_emision else ""))
+        c.setFont(CRT_BOLD, 9)
+        c.drawString(x23_nombre, y23_nombre, transportadora_nombre)
+        c.setFont(CRT_REGULAR, 8)
+        c.drawString(x23_fecha, y23_fecha, fecha_transportador)
+
+        # ========== CAMPO 24: DESTINATARIO ==========
+        x24_nombre = 305
+        y24_nombre = 152
+        x24_fecha = 380
+        y24_fecha = 87
+        # Usar firma_destinatario si existe, sino usar destinatario
+        firma_destinatario_obj = firma_destinatario if firma_destinatario else destinatario
+        destinatario_nombre = safe_get_attr(firma_destinatario_obj, 'nombre') if firma_destinatario_obj else ""
+        fecha_destinatario = crt.fecha_firma_destinatario.strftime('%d/%m/%Y') if crt.fecha_firma_destinatario else (crt.fecha_firma.strftime('%d/%m/%Y') if crt.fecha_firma else (crt.fecha_emision.strftime('%d/%m/%Y') if crt.fecha_emision else ""))
+        c.setFont(CRT_BOLD, 9)
+        c.drawString(x24_nombre, y24_nombre, destinatario_nombre)
+        c.setFont(CRT_REGULAR, 8)
+        c.drawString(x24_fecha, y24_fecha, fecha_destinatario)
+
+        # ========== CAMPO 22: Declaraciones y observaciones ==========
+        x22 = 305
+        y22 = 243
+        width22 = 260
+        height22 = 60
+        texto_campo22 = safe_get_attr(crt, 'observaciones')
+        draw_text_fit_area(
+            c, texto_campo22, x=x22, y=y22, width=width22, height=height22,
+            fontName=CRT_REGULAR, min_font=5.0, max_font=8.0, leading_ratio=1.13
+        )
@@ -84,3 +84,40 @@ def to_dict_crt(crt):
         "fecha_firma_destinatario": crt.fecha_firma_destinatario.strftime('%Y-%m-%d') if crt.fecha_firma_destinatario else "",
         "gastos": [to_dict_gasto(g) for g in crt.gastos],
     }
+
+
+def _to_dict_entidad_pdf(ent):
+    """Datos de una entidad (remitente/transportadora) que se imprimen en el PDF."""
+    if ent is None:
+        return None
+    ciudad = getattr(ent, 'ciudad', None)
+    pais = ciudad.pais if ciudad is not None else None
+    return {
+        "nombre": ent.nombre or "",
+        "direccion": getattr(ent, 'direccion', None) or "",
+        "tipo_documento": getattr(ent, 'tipo_documento', None) or "",
+        "numero_documento": getattr(ent, 'numero_documento', None) or "",
+        "telefono": getattr(ent, 'telefono', None) or "",
+        "ciudad": ciudad.nombre if ciudad is not None else "",
+        "pais": pais.nombre if pais is not None else "",
+    }
+
+
+def to_dict_crt_pdf(crt):
+    """
+    Serializa todo lo que el PDF del CRT imprime (CRT + entidades vinculadas).
+
+    Se usa como contenido direccionable de la caché de PDFs: si cambia el
+    CRT o cualquier dato impreso de sus entidades, cambia la clave.
+    """
+    data = to_dict_crt(crt)
+    data.update({
+        "moneda_codigo": getattr(crt.moneda, 'codigo', "") if crt.moneda else "",
+        "ent_remitente": _to_dict_entidad_pdf(crt.remitente),
+        "ent_transportadora": _to_dict_entidad_pdf(crt.transportadora),
+        "ent_destinatario": _to_dict_entidad_pdf(crt.destinatario),
+        "ent_consignatario": _to_dict_entidad_pdf(crt.consignatario),
+        "ent_notificar_a": _to_dict_entidad_pdf(crt.notificar_a),
+        "ent_firma_destinatario": _to_dict_entidad_pdf(crt.firma_destinatario),
+    })
+    return data
@@ -0,0 +1,97 @@
+"""
+Registro único de fuentes para los PDFs (CRT y MIC/DTA).
+
+- MIC/DTA: DejaVuSans (regular y bold) desde `app/assets/fonts`, cargadas
+  una sola vez por proceso (al importar `layout_mic`). Si faltan los TTF se
+  usa Helvetica, como antes.
+- CRT: fuentes base de PDF (Helvetica). No se incrustan (0 bytes por
+  documento) y WinAnsi cubre español y portugués.
+
+ReportLab incrusta en cada documento solo los glifos usados, pero copia tal
+cual las tablas de hinting. Por eso los TTF de `app/assets/fonts` se guardan
+ya compactados (sin hinting); anchos, contornos, cmap, orden de glifos y la
+tabla `name` (con la licencia, también en `app/assets/fonts/LICENSE`) son
+los del DejaVu original. Se generaron una vez con fontTools:
+
+    pyftsubset DejaVuSans.ttf --glyphs='*' --unicodes='*' --retain-gids \
+        --glyph-names --legacy-kern --no-hinting --name-IDs='*' \
+        --name-languages='*' --name-legacy --layout-features='*' \
+        --notdef-outline --no-prune-unicode-ranges --drop-tables+=FFTM
+
+Al registrar se precalculan además los anchos de los caracteres Latin-1 en
+la caché de `text_layout` para las fuentes del CRT y del MIC.
+"""
+import logging
+import os
+import threading
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from app.utils.text_layout import word_units
+
+logger = logging.getLogger(__name__)
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts")
+
+# Fuentes base (no se incrustan)
+CORE_REGULAR = "Helvetica"
+CORE_BOLD = "Helvetica-Bold"
+
+# CRT
+CRT_REGULAR = CORE_REGULAR
+CRT_BOLD = CORE_BOLD
+
+# MIC/DTA (nombre registrado -> archivo en FONTS_DIR)
+UNICODE_REGULAR = "DejaVuSans"
+UNICODE_BOLD = "DejaVuSans-Bold"
+UNICODE_FILES = {
+    UNICODE_REGULAR: "DejaVuSans.ttf",
+    UNICODE_BOLD: "DejaVuSans-Bold.ttf",
+}
+
+_PRECOMPUTED_CHARS = [chr(c) for c in range(0x20, 0x7F)] + [chr(c) for c in range(0xA0, 0x100)]
+
+_lock = threading.Lock()
+_unicode_fonts = None
+
+
+# =============================
+#   REGISTRO
+# =============================
+
+def _load_ttf(name, filename):
+    return TTFont(name, os.path.join(FONTS_DIR, filename))
+
+
+def precompute_metrics(font_names, chars=_PRECOMPUTED_CHARS):
+    """Carga en la caché de `text_layout` los anchos de `chars` en cada fuente."""
+    for font in font_names:
+        for ch in chars:
+            word_units(ch, font)
+
+
+def register_fonts():
+    """
+    Registra las fuentes del MIC (una vez por proceso) y devuelve los nombres
+    (regular, bold) a usar: DejaVuSans o, si no se pueden cargar, Helvetica.
+    """
+    global _unicode_fonts
+    if _unicode_fonts is not None:
+        return _unicode_fonts
+    with _lock:
+        if _unicode_fonts is not None:
+            return _unicode_fonts
+        registered = set(pdfmetrics.getRegisteredFontNames())
+        try:
+            for name, filename in UNICODE_FILES.items():
+                if name not in registered:
+                    pdfmetrics.registerFont(_load_ttf(name, filename))
+            fonts = (UNICODE_REGULAR, UNICODE_BOLD)
+            logger.info("Fuentes Unicode registradas desde %s", FONTS_DIR)
+        except Exception as e:
+            fonts = (CORE_REGULAR, CORE_BOLD)
+            logger.warning("No se pudieron registrar TTF Unicode (%s); usando Helvetica.", e)
+        precompute_metrics(set(fonts) | {CRT_REGULAR, CRT_BOLD})
+        _unicode_fonts = fonts
+        return fonts
@@ -1,8 +1,11 @@
+import hashlib
 from io import BytesIO
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import black
 
+from app.utils.fonts import CRT_BOLD, CRT_REGULAR
+
 
 def dibujar_lineas_dinamicas(c, lineas):
     ancho_pagina, alto_pagina = A4
@@ -30,7 +33,7 @@ def dibujar_lineas_dinamicas(c, lineas):
             c.circle(x_centro, y_pdf, radio, stroke=1, fill=0)
             # Texto central "CRT"
             c.setFillColor(black)
-            c.setFont("Helvetica-Bold", 17)
+            c.setFont(CRT_BOLD, 17)
             c.drawCentredString(x_centro, y_pdf-6, "CRT")
 
             # === Bloque de títulos a la derecha del círculo ===
@@ -42,7 +45,7 @@ def dibujar_lineas_dinamicas(c, lineas):
             ]
             x_texto = x_centro + radio + 16  # Espaciado a la derecha del círculo
             y_texto = y_pdf + 14  # Arriba del centro del círculo
-            c.setFont("Helvetica-Bold", 9)
+            c.setFont(CRT_BOLD, 9)
             line_spacing = 11
             for idx, linea_txt in enumerate(texto_titulo):
                 c.drawString(x_texto, y_texto - idx * line_spacing, linea_txt)
@@ -62,7 +65,7 @@ def dibujar_lineas_dinamicas(c, lineas):
             y_legal_start = y_texto + 4
             ancho_disponible = 29 + 540 - x_legal - 5
 
-            c.setFont("Helvetica", 6)
+            c.setFont(CRT_REGULAR, 6)
             c.setFillColor(black)
 
             # Función para dividir texto en líneas que caben en el ancho disponible
@@ -84,7 +87,7 @@ def dibujar_lineas_dinamicas(c, lineas):
                 return lineas
 
             lineas_legales = dividir_texto_en_lineas(
-                texto_legal, ancho_disponible, "Helvetica", 6)
+                texto_legal, ancho_disponible, CRT_REGULAR, 6)
 
             espacio_entre_lineas = 6
             for i, linea in enumerate(lineas_legales):
@@ -94,7 +97,7 @@ def dibujar_lineas_dinamicas(c, lineas):
 
     # === Títulos y leyendas ===
     alto_pagina = A4[1]
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     x_titulo = 35
     y_titulo_ill = 87
     y_titulo_pdf = alto_pagina - y_titulo_ill
@@ -107,36 +110,36 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo3 = 300
     y_titulo3_ill = 105
     y_titulo3_pdf = alto_pagina - y_titulo3_ill
-    c.setFont("Helvetica-Bold", 7.02)
+    c.setFont(CRT_BOLD, 7.02)
     c.drawString(x_titulo3, y_titulo3_pdf,
                  "3- Nome e endereco do transportador/Nombre y domicilio del portador")
     x_titulo4 = 35
     y_titulo4_ill = 149
     y_titulo4_pdf = alto_pagina - y_titulo4_ill
-    c.setFont("Helvetica-Bold", 7.02)
+    c.setFont(CRT_BOLD, 7.02)
     c.drawString(x_titulo4, y_titulo4_pdf,
                  "4- Nome e endereco do destinatario / Nombre y domicilio del destinatario")
     x_titulo6 = 35
     y_titulo6_ill = 208
     y_titulo6_pdf = alto_pagina - y_titulo6_ill
-    c.setFont("Helvetica-Bold", 7.02)
+    c.setFont(CRT_BOLD, 7.02)
     c.drawString(x_titulo6, y_titulo6_pdf,
                  "6- Nome e endereco do consignatario / Nombre y domicilio del consignatario")
     x_titulo9 = 35
     y_titulo9_ill = 267
     y_titulo9_pdf = alto_pagina - y_titulo9_ill
-    c.setFont("Helvetica-Bold", 7.02)
+    c.setFont(CRT_BOLD, 7.02)
     c.drawString(x_titulo9, y_titulo9_pdf, "9- Notificar a: / Notificar a:")
     x_titulo5 = 300
     y_titulo5_ill = 170
     y_titulo5_pdf = alto_pagina - y_titulo5_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo5, y_titulo5_pdf,
                  "5- Local e pais de emisao / Lugar y país de emisión")
     x_titulo7 = 300
     y_titulo7_ill = 207
     y_titulo7_pdf = alto_pagina - y_titulo7_ill
-    c.setFont("Helvetica-Bold", 7)
+    c.setFont(CRT_BOLD, 7)
     c.drawString(x_titulo7, y_titulo7_pdf,
                  "7- Local, pais e data que o transportador se responsabiliza pela mercadoria")
     c.drawString(x_titulo7, y_titulo7_pdf - 10,
@@ -144,19 +147,19 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo8 = 300
     y_titulo8_ill = 255
     y_titulo8_pdf = alto_pagina - y_titulo8_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo8, y_titulo8_pdf,
                  "8- Localidade, pais e prazo de entrega / Lugar, país y plazo de entrega")
     x_titulo10 = 300
     y_titulo10_ill = 292
     y_titulo10_pdf = alto_pagina - y_titulo10_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo10, y_titulo10_pdf,
                  "10- Transporte sucessivos/Porteadores sucesivos")
     x_titulo11 = 35
     y_titulo11_ill = 325
     y_titulo11_pdf = alto_pagina - y_titulo11_ill
-    c.setFont("Helvetica-Bold", 7)
+    c.setFont(CRT_BOLD, 7)
     c.drawString(x_titulo11, y_titulo11_pdf,
                  "11- Quantidade e categoria de volumes, marcas e números, tipos de mercaderías, contelners e acessórios.")
     c.drawString(x_titulo11, y_titulo11_pdf - 10,
@@ -164,7 +167,7 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo12 = 412
     y_titulo12_ill = 326
     y_titulo12_pdf = alto_pagina - y_titulo12_ill
-    c.setFont("Helvetica-Bold", 7.98)
+    c.setFont(CRT_BOLD, 7.98)
     c.drawString(x_titulo12, y_titulo12_pdf,
                  "12- Peso bruto en Kg./ Peso bruto em Kg.")
     c.drawString(x_titulo12, y_titulo12_pdf - 10, "PB:")
@@ -172,51 +175,51 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo13 = 412
     y_titulo13_ill = 361
     y_titulo13_pdf = alto_pagina - y_titulo13_ill
-    c.setFont("Helvetica-Bold", 7.50)
+    c.setFont(CRT_BOLD, 7.50)
     c.drawString(x_titulo13, y_titulo13_pdf,
                  "13-Volume em m3/ Volumen en m.cu.")
     x_titulo14 = 412
     y_titulo14_ill = 380
     y_titulo14_pdf = alto_pagina - y_titulo14_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo14, y_titulo14_pdf, "14- Valor / Valor")
     c.drawString(x_titulo14, y_titulo14_pdf - 25, "   Moeda/ Moneda:")
     c.drawString(x_titulo14, y_titulo14_pdf - 50, "   INCOTERMS:")
     x_titulo15 = 37
     y_titulo15_ill = 442
     y_titulo15_pdf = alto_pagina - y_titulo15_ill
-    c.setFont("Helvetica-Bold", 7.02)
+    c.setFont(CRT_BOLD, 7.02)
     c.drawString(x_titulo15, y_titulo15_pdf, "15- Custos a pagar")
     c.drawString(x_titulo15, y_titulo15_pdf - 8, "Gastos a pagar")
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo15, y_titulo15_pdf - 18, "Frete / Flete")
     x_titulo15_1 = 137
     y_titulo15_1_ill = 442
     y_titulo15_1_pdf = alto_pagina - y_titulo15_1_ill
-    c.setFont("Helvetica-Bold", 6)
+    c.setFont(CRT_BOLD, 6)
     c.drawString(x_titulo15_1 + 2, y_titulo15_1_pdf, "Valor Remitente")
     c.drawString(x_titulo15_1 + 2, y_titulo15_1_pdf - 8, "Monto Remitente")
     x_titulo15_2 = 204
     y_titulo15_2_ill = 442
     y_titulo15_2_pdf = alto_pagina - y_titulo15_2_ill
-    c.setFont("Helvetica-Bold", 6)
+    c.setFont(CRT_BOLD, 6)
     c.drawString(x_titulo15_2 + 7, y_titulo15_2_pdf, "Moeda")
     c.drawString(x_titulo15_2 + 7, y_titulo15_2_pdf - 8, "Moneda")
     x_titulo15_3 = 240
     y_titulo15_3_ill = 442
     y_titulo15_3_pdf = alto_pagina - y_titulo15_3_ill
-    c.setFont("Helvetica-Bold", 6)
+    c.setFont(CRT_BOLD, 6)
     c.drawString(x_titulo15_3 - 1, y_titulo15_3_pdf, "Valor Destinatario")
     c.drawString(x_titulo15_3 - 1, y_titulo15_3_pdf - 8, "Monto Destinatario")
     x_titulo15_4 = 37
     y_titulo15_4_ill = 535
     y_titulo15_4_pdf = alto_pagina - y_titulo15_4_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo15_4, y_titulo15_4_pdf, "Total / Total")
     x_titulo16 = 302
     y_titulo16_ill = 442
     y_titulo16_pdf = alto_pagina - y_titulo16_ill
-    c.setFont("Helvetica-Bold", 6.50)
+    c.setFont(CRT_BOLD, 6.50)
     c.drawString(x_titulo16, y_titulo16_pdf,
                  "16- Declaraçao do valor das mercaderias/ Declaración del valor de las mercaderias")
     c.drawString(x_titulo16, y_titulo16_pdf - 8,
@@ -224,7 +227,7 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo17 = 302
     y_titulo17_ill = 460
     y_titulo17_pdf = alto_pagina - y_titulo17_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo17, y_titulo17_pdf,
                  "17- Documentos Anexos / Documentos Anexos")
     c.drawString(x_titulo17, y_titulo17_pdf - 10,
@@ -233,7 +236,7 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo18 = 302
     y_titulo18_ill = 532
     y_titulo18_pdf = alto_pagina - y_titulo18_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo18, y_titulo18_pdf,
                  "18- Instruçoes sobre formalidades de alfandega")
     c.drawString(x_titulo18, y_titulo18_pdf - 10,
@@ -241,19 +244,19 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo19 = 37
     y_titulo19_ill = 544
     y_titulo19_pdf = alto_pagina - y_titulo19_ill
-    c.setFont("Helvetica-Bold", 6.90)
+    c.setFont(CRT_BOLD, 6.90)
     c.drawString(x_titulo19, y_titulo19_pdf,
                  "19- Valor do frete Externo / Monto del Flete Externo")
     x_titulo20 = 37
     y_titulo20_ill = 564
     y_titulo20_pdf = alto_pagina - y_titulo20_ill
-    c.setFont("Helvetica-Bold", 6.90)
+    c.setFont(CRT_BOLD, 6.90)
     c.drawString(x_titulo20, y_titulo20_pdf,
                  "20- Valor do Reembolso Contra Entrega / Monto de Reembolso Contra Entrega ")
     x_titulo21 = 37
     y_titulo21_ill = 588
     y_titulo21_pdf = alto_pagina - y_titulo21_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo21, y_titulo21_pdf,
                  "21- Nome e assinatura do remetente ou seu representante")
     c.drawString(x_titulo21, y_titulo21_pdf - 10,
@@ -262,13 +265,13 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo22 = 302
     y_titulo22_ill = 588
     y_titulo22_pdf = alto_pagina - y_titulo22_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo22, y_titulo22_pdf,
                  "22- Declaraçoes e observaçoes / Declaraciones y observaciones")
     x_titulo23 = 37
     y_titulo23_ill = 665
     y_titulo23_pdf = alto_pagina - y_titulo23_ill
-    c.setFont("Helvetica-Bold", 6)
+    c.setFont(CRT_BOLD, 6)
     c.drawString(x_titulo23, y_titulo23_pdf,
                  "As mercadorias consignadas neste Conhecimiento de Transporte foran recebidas pelo")
     c.drawString(x_titulo23, y_titulo23_pdf - 6,
@@ -282,12 +285,12 @@ def dibujar_lineas_dinamicas(c, lineas):
                  "23- Nome e assinatura do transportador ou seu representante")
     c.drawString(x_titulo23, y_titulo23_pdf - 36,
                  "Nombre y firma del transportador o su representante")
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo23, y_titulo23_pdf - 90, "Data / Fecha")
     x_titulo24 = 302
     y_titulo24_ill = 666
     y_titulo24_pdf = alto_pagina - y_titulo24_ill
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(CRT_BOLD, 8)
     c.drawString(x_titulo24, y_titulo24_pdf,
                  "24- Nome e assinatura do destinatário ou seu representante")
     c.drawString(x_titulo24, y_titulo24_pdf - 10,
@@ -296,7 +299,7 @@ def dibujar_lineas_dinamicas(c, lineas):
     x_titulo24b = 34
     y_titulo24b_ill = 773
     y_titulo24b_pdf = alto_pagina - y_titulo24b_ill
-    c.setFont("Helvetica-Bold", 7)
+    c.setFont(CRT_BOLD, 7)
     c.drawString(x_titulo24b, y_titulo24b_pdf,
                  "1º Via- Primeiro Original para o Remetente. Unico Valido para Retirar as Mercaderias / Primer Original para el Remitente. Único Válido para retirar las mercaderia")
 
@@ -374,6 +377,12 @@ lineas = [
     {"tipo": "rect", "x": 29,  "y": 761, "ancho": 540,  "alto": 17,   "grosor": 1},
 ]
 
+# Revisión manual del dibujo: incrementar si cambian títulos/posiciones fuera de `lineas`
+LAYOUT_REVISION = 1
+# Versión del layout derivada de `lineas` (usada como parte de claves de caché)
+LAYOUT_VERSION = hashlib.sha1(
+    f"{LAYOUT_REVISION}:{lineas!r}".encode("utf-8")).hexdigest()[:12]
+
 # ----- Ejemplo de uso -----
 if __name__ == '__main__':
     output = BytesIO()
@@ -0,0 +1,137 @@
+"""
+Paginación por cursor (keyset) para los listados grandes.
+
+`query.paginate()` hace OFFSET (el motor recorre y descarta todas las filas
+anteriores) y un COUNT(*) sobre todo el conjunto filtrado en cada página: el
+costo crece con la tabla. En modo cursor (`?cursor=`, opt-in) la página se
+pide como "las N filas siguientes a la última vista" por columnas ordenadas e
+indexadas, `(id DESC)` o `(created_at DESC, id DESC)`, y el total solo se
+calcula si se pide:
+
+  - ?total=exact     COUNT(*) del conjunto filtrado
+  - ?total=estimate  estimación del planner (PostgreSQL; None en otros motores)
+
+El cursor es opaco para el cliente (JSON en base64 url-safe con los valores
+de la última fila); `?cursor=` vacío pide la primera página.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from flask import request
+from sqlalchemy import tuple_
+
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATE = "estimate"
+
+
+class InvalidCursor(ValueError):
+    """El cursor recibido no es válido para este listado."""
+
+
+class CursorPage(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int]
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def pagination(self, per_page: int) -> dict:
+        """Bloque `pagination` de las respuestas en modo cursor."""
+        return {
+            "per_page": per_page,
+            "next_cursor": self.next_cursor,
+            "has_next": self.has_next,
+            "total": self.total,
+        }
+
+
+def cursor_requested() -> bool:
+    """True si el cliente pidió paginación por cursor (?cursor=...)."""
+    return "cursor" in request.args
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, columns: Sequence) -> Optional[list]:
+    """Valores del cursor convertidos al tipo de cada columna (None = primera página)."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor(token)
+        return [
+            datetime.fromisoformat(v) if col.type.python_type is datetime else col.type.python_type(v)
+            for v, col in zip(values, columns)
+        ]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(token) from e
+
+
+def _after(columns: Sequence, values: Sequence):
+    """
+    Filtro "fila posterior a `values`" para un orden descendente por `columns`.
+    Con varias columnas es una comparación de filas, `(a, b) < (x, y)`: el
+    motor la resuelve como un rango sobre el índice compuesto, cosa que no
+    hace con el equivalente `a < x OR (a = x AND b < y)`.
+    """
+    if len(columns) == 1:
+        return columns[0] < values[0]
+    return tuple_(*columns) < tuple_(*values)
+
+
+def estimate_count(query) -> Optional[int]:
+    """Filas estimadas por el planner de PostgreSQL para `query` (None en otros motores)."""
+    from app import db
+
+    if db.engine.dialect.name != "postgresql":
+        return None
+    pk = query.column_descriptions[0]["entity"].id
+    compiled = query.with_entities(pk).order_by(None).statement.compile(dialect=db.engine.dialect)
+    result = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    plan = json.loads(result) if isinstance(result, str) else result
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def keyset_paginate(query, columns: Sequence, cursor: Optional[str], per_page: int,
+                    total: Optional[str] = None) -> CursorPage:
+    """
+    Página de `query` (ya filtrada) ordenada por `columns` descendente,
+    posterior al `cursor`. Lanza InvalidCursor si el cursor no corresponde.
+    """
+    per_page = max(1, per_page)
+    values = decode_cursor(cursor, columns)
+    page_query = query.order_by(None).order_by(*[c.desc() for c in columns])
+    if values is not None:
+        page_query = page_query.filter(_after(columns, values))
+
+    rows = page_query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+
+    count = None
+    if total == TOTAL_EXACT:
+        count = query.order_by(None).count()
+    elif total == TOTAL_ESTIMATE:
+        count = estimate_count(query)
+    return CursorPage(items, next_cursor, count)
+
+
+def keyset_from_request(query, columns: Sequence, per_page: int) -> CursorPage:
+    """`keyset_paginate` con `cursor` y `total` tomados de la request."""
+    return keyset_paginate(query, columns, request.args.get("cursor", ""), per_page,
+                           total=(request.args.get("total") or "").lower() or None)
@@ -1,43 +1,18 @@
-from reportlab.pdfbase.pdfmetrics import stringWidth
+from app.utils.fonts import CRT_REGULAR
+from app.utils.text_layout import fit_text, wrap_lines
 
 def wrap_text_multiline(text, fontName, fontSize, max_width):
-    result = []
-    for original_line in (text or "").split('\n'):
-        words = original_line.split()
-        line = ""
-        for word in words:
-            test = f"{line} {word}".strip()
-            if stringWidth(test, fontName, fontSize) <= max_width:
-                line = test
-            else:
-                if line:
-                    result.append(line)
-                line = word
-        if line:
-            result.append(line)
-    return result
+    return list(wrap_lines(text or "", fontName, fontSize, max_width))
 
-def draw_text_fit_area(c, text, x, y, width, height, fontName="Helvetica", min_font=5, max_font=8, leading_ratio=1.13):
-    font_size = max_font
-    while font_size >= min_font:
-        lines = []
-        for original_line in (text or "").split('\n'):
-            words = original_line.split()
-            line = ""
-            for word in words:
-                test = f"{line} {word}".strip()
-                if stringWidth(test, fontName, font_size) <= width:
-                    line = test
-                else:
-                    if line:
-                        lines.append(line)
-                    line = word
-            if line:
-                lines.append(line)
-        line_height = font_size * leading_ratio
-        total_height = len(lines) * line_height
-        if total_height <= height:
-            break
+def draw_text_fit_area(c, text, x, y, width, height, fontName=CRT_REGULAR, min_font=5, max_font=8, leading_ratio=1.13):
+    layout = fit_text(text or "", fontName, width, height, min_font, max_font,
+                      step=0.5, leading_ratio=leading_ratio)
+    if layout is None:
+        return y
+    lines = list(layout.lines)
+    font_size = layout.font_size
+    if not layout.fits:
+        # Sin tamaño que entre: se mantiene el paso extra hacia abajo del ajuste original
         font_size -= 0.5
     max_lines = int(height // (font_size * leading_ratio))
     if len(lines) > max_lines:
@@ -0,0 +1,60 @@
+"""
+Plantillas estáticas precalculadas para los generadores de PDF (CRT y MIC/DTA).
+
+Una `StaticTemplate` ejecuta una sola vez por proceso la función que dibuja la
+parte fija de un formulario sobre un canvas falso que graba las llamadas. En
+cada documento esas operaciones ya resueltas se vuelcan una vez a un form
+XObject y se estampan con `doForm` en cada página, de modo que por request
+solo se dibujan los campos variables.
+
+La función de dibujo solo puede usar llamadas "planas" del canvas (rect, line,
+setFont, drawString, ...) y `stringWidth`; no sirve para Paragraph/Frame.
+"""
+import threading
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+
+class TemplateRecorder:
+    """Canvas falso que graba las llamadas de dibujo para reproducirlas luego."""
+
+    def __init__(self):
+        self.ops = []
+
+    def stringWidth(self, text, fontName, fontSize):
+        return stringWidth(text, fontName, fontSize)
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+        return record
+
+
+class StaticTemplate:
+    """Parte fija de un formulario, grabada una vez y estampada como form XObject."""
+
+    def __init__(self, name, draw):
+        self.name = name
+        self._draw = draw
+        self._ops = None
+        self._lock = threading.Lock()
+
+    @property
+    def ops(self):
+        """Operaciones del formulario estático, calculadas una vez por proceso."""
+        if self._ops is None:
+            with self._lock:
+                if self._ops is None:
+                    recorder = TemplateRecorder()
+                    self._draw(recorder)
+                    self._ops = tuple(recorder.ops)
+        return self._ops
+
+    def stamp(self, c):
+        """Estampa la plantilla en la página actual (el form se guarda una vez por PDF)."""
+        if not c.hasForm(self.name):
+            c.beginForm(self.name)
+            for name, args, kwargs in self.ops:
+                getattr(c, name)(*args, **kwargs)
+            c.endForm()
+        c.doForm(self.name)
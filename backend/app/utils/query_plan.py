@@ -0,0 +1,104 @@
+"""
+Planes de ejecución de las consultas que emite la aplicación.
+
+Sirve para verificar que los listados usen índices: `capture_queries()`
+registra los SELECT ejecutados (por ejemplo, durante un request de test) y
+`sequential_scans()` devuelve las tablas que el motor recorrería enteras
+para cada uno:
+
+  - SQLite:     EXPLAIN QUERY PLAN, filas `SCAN <tabla>` sin índice o con
+                un índice automático
+  - PostgreSQL: EXPLAIN (FORMAT JSON), nodos `Seq Scan`
+
+Uso:
+    with capture_queries() as queries:
+        client.get('/api/crts/?estado=EMITIDO', headers=headers)
+    for q in queries:
+        assert not sequential_scans(q.statement, q.parameters, tables={'crts'})
+"""
+import json
+import re
+from contextlib import contextmanager
+from typing import Any, List, NamedTuple, Optional, Set
+
+from sqlalchemy import event
+
+# `SCAN t` sin índice, o un índice automático (SQLite lo arma recorriendo la tabla)
+_SQLITE_SCAN_RE = re.compile(r"^(?:SCAN (\w+)(?: LEFT-JOIN)?$|(?:SCAN|SEARCH) (\w+) USING AUTOMATIC )")
+_ALIAS_RE = re.compile(r"\b(\w+) AS (\w+)\b", re.IGNORECASE)
+
+
+class CapturedQuery(NamedTuple):
+    statement: str
+    parameters: Any
+
+
+@contextmanager
+def capture_queries(engine=None):
+    """Lista (que se va llenando) con los SELECT ejecutados dentro del bloque."""
+    from app import db
+
+    engine = engine or db.engine
+    queries: List[CapturedQuery] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            queries.append(CapturedQuery(statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(statement: str, parameters: Any = None, connection=None):
+    """
+    Plan de `statement` (SQL del driver, con sus parámetros): lista de
+    detalles en SQLite, árbol JSON en PostgreSQL.
+    """
+    from app import db
+
+    connection = connection or db.session.connection()
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [row[-1] for row in rows]
+    if dialect == "postgresql":
+        result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters or {}).scalar()
+        return json.loads(result) if isinstance(result, str) else result
+    raise NotImplementedError(f"EXPLAIN no soportado para {dialect}")
+
+
+def _aliases(statement: str) -> dict:
+    return {alias.lower(): table.lower() for table, alias in _ALIAS_RE.findall(statement)}
+
+
+def _postgres_seq_scans(node, found: Set[str]):
+    if node.get("Node Type") == "Seq Scan":
+        found.add(node.get("Relation Name"))
+    for child in node.get("Plans", []):
+        _postgres_seq_scans(child, found)
+
+
+def sequential_scans(statement: str, parameters: Any = None, tables: Optional[Set[str]] = None,
+                     connection=None) -> Set[str]:
+    """Tablas (de `tables`, o todas) que el plan de `statement` recorre completas."""
+    from app import db
+
+    connection = connection or db.session.connection()
+    plan = explain(statement, parameters, connection)
+    found: Set[str] = set()
+    if connection.dialect.name == "sqlite":
+        aliases = _aliases(statement)
+        for detail in plan:
+            match = _SQLITE_SCAN_RE.match(detail)
+            if match:
+                name = (match.group(1) or match.group(2)).lower()
+                found.add(aliases.get(name, name))
+    else:
+        for entry in plan:
+            _postgres_seq_scans(entry["Plan"], found)
+    if tables is not None:
+        found &= set(tables)
+    return found
@@ -0,0 +1,220 @@
+"""
+Motor compartido de ajuste de texto para los PDFs (CRT y MIC/DTA).
+
+Reemplaza los bucles que re-envolvían el texto completo en cada tamaño de
+fuente candidato llamando a `stringWidth` sobre cada prefijo creciente
+(cuadrático en el largo de la línea):
+
+- El ancho de cada palabra se calcula una vez por fuente, en unidades de
+  1/1000 de em; como el ancho escala linealmente con el tamaño, sirve para
+  todos los tamaños.
+- El wrap por palabras es lineal: el ancho de una línea candidata es la suma
+  de los anchos ya conocidos.
+- El tamaño de fuente se elige con búsqueda binaria sobre la misma escala de
+  tamaños que recorrían los bucles (el wrap "greedy" es monótono en el ancho
+  disponible, así que el resultado es el mismo tamaño).
+- Los resultados se memorizan por (texto, caja, rango de fuentes) en LRUs
+  acotadas: los mismos textos se repiten mucho entre documentos.
+
+Las funciones de dibujo siguen en pdf_helpers/layout_mic/crt_renderer; acá
+solo se calcula la disposición (líneas y tamaño).
+"""
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Tamaños de las LRU (entradas)
+WORD_CACHE_SIZE = 16384
+LAYOUT_CACHE_SIZE = 2048
+
+# Política para palabras más anchas que la caja
+LONG_WORDS_OVERFLOW = None   # la palabra queda sola en su línea (se sale de la caja)
+LONG_WORDS_SPLIT = "split"   # se corta por separadores / - . o por caracteres
+LONG_WORDS_TRUNCATE = "truncate"  # se recorta hasta que entra
+
+_SEPARATORS = re.compile(r'([/\-\.])')
+
+
+class TextLayout(NamedTuple):
+    """Resultado del ajuste: tamaño elegido, líneas y si entra en la caja."""
+    font_size: float
+    lines: Tuple[str, ...]
+    fits: bool
+
+
+# =============================
+#   ANCHOS
+# =============================
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def word_units(word, font):
+    """Ancho de `word` en unidades de 1/1000 de em (independiente del tamaño)."""
+    return stringWidth(word, font, 1000)
+
+
+def _prefix_fit(text, font, limit_units):
+    """Largo del prefijo más largo de `text` cuyo ancho no supera `limit_units`."""
+    acc = 0.0
+    for i, ch in enumerate(text):
+        acc += word_units(ch, font)
+        if acc > limit_units:
+            return i
+    return len(text)
+
+
+def truncate_to_width(text, font, size, max_width, suffix=""):
+    """
+    Prefijo más largo de `text` que, con `suffix` agregado, entra en
+    `max_width`. Devuelve solo el prefijo (sin el sufijo).
+    """
+    limit = max_width * 1000.0 / size - (word_units(suffix, font) if suffix else 0.0)
+    if limit < 0:
+        return ""
+    return text[:_prefix_fit(text, font, limit)]
+
+
+def split_long_word(word, font, size, max_width):
+    """
+    Parte una palabra más ancha que `max_width`: primero por separadores
+    (/ - .) y, si un trozo sigue sin entrar, por caracteres.
+    """
+    limit = max_width * 1000.0 / size
+    if word_units(word, font) <= limit:
+        return [word]
+
+    def char_split(text):
+        # Reparte `text` en trozos que entran; devuelve (completos, resto)
+        chunks, acc, start = [], 0.0, 0
+        for i, ch in enumerate(text):
+            w = word_units(ch, font)
+            if acc + w <= limit:
+                acc += w
+            else:
+                if i > start:
+                    chunks.append(text[start:i])
+                start, acc = i, w
+        return chunks, text[start:]
+
+    recombined, buf, buf_units = [], "", 0.0
+    for part in _SEPARATORS.split(word):
+        part_units = word_units(part, font) if part else 0.0
+        if buf_units + part_units <= limit:
+            buf, buf_units = buf + part, buf_units + part_units
+            continue
+        if buf:
+            recombined.append(buf)
+        if part_units <= limit:
+            buf, buf_units = part, part_units
+        else:
+            chunks, buf = char_split(part)
+            recombined.extend(chunks)
+            buf_units = word_units(buf, font) if buf else 0.0
+    if buf:
+        recombined.append(buf)
+    return recombined
+
+
+# =============================
+#   WRAP
+# =============================
+
+def _tokens(line, font, size, max_width, long_words):
+    words = line.split()
+    if long_words == LONG_WORDS_SPLIT:
+        return [p for w in words for p in split_long_word(w, font, size, max_width)]
+    return words
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def wrap_lines(text, font, size, max_width, keep_blank_lines=False,
+               long_words=LONG_WORDS_OVERFLOW):
+    """
+    Wrap por palabras (greedy) respetando los saltos de línea del texto.
+
+    - keep_blank_lines: las líneas vacías del texto producen una línea "".
+    - long_words: qué hacer con palabras más anchas que la caja.
+    """
+    limit = max_width * 1000.0 / size
+    space = word_units(" ", font)
+    lines = []
+    for raw_line in (text or "").split("\n"):
+        if not raw_line.strip():
+            if keep_blank_lines:
+                lines.append("")
+            continue
+        cur, cur_units = [], 0.0
+        for token in _tokens(raw_line, font, size, max_width, long_words):
+            units = word_units(token, font)
+            if cur and cur_units + space + units <= limit:
+                cur.append(token)
+                cur_units += space + units
+            elif not cur and units <= limit:
+                cur, cur_units = [token], units
+            else:
+                if cur:
+                    lines.append(" ".join(cur))
+                if long_words == LONG_WORDS_TRUNCATE and units > limit:
+                    # La palabra se recorta recién al quedar sola en su línea
+                    token = token[:_prefix_fit(token, font, limit)]
+                    units = word_units(token, font)
+                cur, cur_units = ([token], units) if token else ([], 0.0)
+        if cur:
+            lines.append(" ".join(cur))
+    return tuple(lines)
+
+
+# =============================
+#   AJUSTE DE TAMAÑO
+# =============================
+
+def candidate_sizes(min_font, max_font, step=1.0):
+    """Escala de tamaños de mayor a menor: max, max-step, ... >= min."""
+    sizes = []
+    size = max_font
+    while size >= min_font:
+        sizes.append(size)
+        size -= step
+    return tuple(sizes)
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def fit_text(text, font, max_width, max_height, min_font, max_font, step=1.0,
+             leading_ratio=1.0, leading_extra=0.0, keep_blank_lines=False,
+             long_words=LONG_WORDS_OVERFLOW) -> Optional[TextLayout]:
+    """
+    Busca el mayor tamaño de la escala `candidate_sizes(min, max, step)` con el
+    que el texto envuelto entra en la caja. La altura de línea es
+    `size * leading_ratio + leading_extra`.
+
+    Si ningún tamaño entra devuelve el layout del menor tamaño con
+    fits=False; si la escala está vacía, None.
+    """
+    sizes = candidate_sizes(min_font, max_font, step)
+    if not sizes:
+        return None
+
+    def layout(size):
+        lines = wrap_lines(text, font, size, max_width, keep_blank_lines, long_words)
+        line_h = size * leading_ratio + leading_extra
+        return TextLayout(size, lines, len(lines) * line_h <= max_height)
+
+    # sizes está en orden decreciente: buscar el primer índice que entra
+    lo, hi, best = 0, len(sizes) - 1, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        result = layout(sizes[mid])
+        if result.fits:
+            best = result
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    return best if best is not None else layout(sizes[-1])
+
+
+def clear_caches():
+    """Vacía las LRU (tests o cambio de fuentes registradas)."""
+    word_units.cache_clear()
+    wrap_lines.cache_clear()
+    fit_text.cache_clear()
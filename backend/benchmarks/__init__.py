@@ -0,0 +1 @@
+"""Micro-benchmarks de generación de PDFs (se ejecutan a mano, no en CI)."""
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: MIC/DTA con marco precalculado vs. marco redibujado.
+
+"antes"  → el encabezado, la grilla de 40 cajas y los títulos bilingües se
+           dibujan de nuevo en cada documento (comportamiento previo).
+"después" → el marco se graba una vez por proceso y se estampa como form
+           XObject (`layout_mic.MIC_TEMPLATE`).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_mic_template [--iteraciones 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import layout_mic  # noqa: E402
+from benchmarks.fixtures import MIC_COMPLETO as MIC_DATA  # noqa: E402
+
+
+class _MarcoEnVivo:
+    """Reemplazo de MIC_TEMPLATE que redibuja el marco en cada documento."""
+
+    def stamp(self, c):
+        layout_mic.dibujar_marco_mic(c)
+
+
+def _render():
+    return len(layout_mic.generar_micdta_pdf_con_datos(MIC_DATA))
+
+
+def _medir(iteraciones):
+    _render()  # calentamiento (fuentes, estilos, plantilla)
+    tiempos = []
+    size = 0
+    for _ in range(iteraciones):
+        t0 = time.perf_counter()
+        size = _render()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": tiempos[int(len(tiempos) * 0.95) - 1],
+        "bytes": size,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iteraciones", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    plantilla = layout_mic.MIC_TEMPLATE
+    try:
+        layout_mic.MIC_TEMPLATE = _MarcoEnVivo()
+        antes = _medir(args.iteraciones)
+    finally:
+        layout_mic.MIC_TEMPLATE = plantilla
+    despues = _medir(args.iteraciones)
+
+    print(f"{'modo':<10}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>10}")
+    for nombre, r in (("antes", antes), ("después", despues)):
+        print(f"{nombre:<10}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['bytes']:>10}")
+    print(f"mejora p50: {(1 - despues['p50'] / antes['p50']) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
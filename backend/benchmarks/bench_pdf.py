@@ -0,0 +1,112 @@
+"""
+Benchmark de renderizado de CRT y MIC/DTA con control de regresiones.
+
+Para cada caso de benchmarks/fixtures.py mide p50/p95 del tiempo de render
+y el tamaño del PDF, y compara la capa de texto con su golden file. Sale
+con código 1 si:
+
+  - el texto extraído difiere del golden file, o
+  - el p50 o el tamaño superan en más de --umbral (20% por defecto) a los
+    de la línea base (--baseline, si existe; los tiempos dependen de la
+    máquina, así que la línea base se graba en cada entorno).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_pdf [--iteraciones 50] [--casos crt_largo mic_corto]
+    python -m benchmarks.bench_pdf --guardar-baseline      # graba la línea base
+    python -m benchmarks.bench_pdf --actualizar-golden     # tras un cambio de layout
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import golden  # noqa: E402
+from benchmarks.fixtures import CASOS, preparar  # noqa: E402
+
+BASELINE_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def medir(render, iteraciones):
+    render()  # calentamiento (fuentes, estilos, plantilla, LRUs)
+    tiempos = []
+    pdf_bytes = b""
+    for _ in range(iteraciones):
+        t0 = time.perf_counter()
+        pdf_bytes = render()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": tiempos[max(0, int(len(tiempos) * 0.95) - 1)],
+        "bytes": len(pdf_bytes),
+    }, pdf_bytes
+
+
+def regresiones(caso, actual, base, umbral):
+    """Métricas de `actual` que superan a `base` en más del umbral relativo."""
+    fallas = []
+    for metrica in ("p50", "bytes"):
+        if metrica in base and actual[metrica] > base[metrica] * (1 + umbral):
+            fallas.append(f"{caso}: {metrica} {actual[metrica]:.2f} > "
+                          f"{base[metrica]:.2f} (+{umbral:.0%})")
+    return fallas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iteraciones", type=int, default=50)
+    parser.add_argument("--casos", nargs="+", choices=sorted(CASOS), default=list(CASOS))
+    parser.add_argument("--umbral", type=float, default=0.20,
+                        help="regresión relativa tolerada de p50 y tamaño (0.20 = 20%%)")
+    parser.add_argument("--baseline", default=BASELINE_DEFAULT)
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--actualizar-golden", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    except FileNotFoundError:
+        baseline = {}
+
+    resultados, fallas = {}, []
+    print(f"{'caso':<18}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>10}  golden")
+    for caso in args.casos:
+        r, pdf_bytes = medir(preparar(caso), args.iteraciones)
+        resultados[caso] = r
+        if args.actualizar_golden:
+            golden.guardar_golden(caso, pdf_bytes)
+            estado = "actualizado"
+        else:
+            diff = golden.comparar_golden(caso, pdf_bytes)
+            estado = "ok" if diff is None else "DIFIERE"
+            if diff is not None:
+                fallas.append(f"{caso}: texto distinto del golden\n{diff}")
+        print(f"{caso:<18}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['bytes']:>10}  {estado}")
+        if caso in baseline and not args.guardar_baseline:
+            fallas.extend(regresiones(caso, r, baseline[caso], args.umbral))
+
+    if args.guardar_baseline:
+        baseline.update(resultados)
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+        print(f"línea base guardada en {args.baseline}")
+    elif not baseline:
+        print(f"sin línea base en {args.baseline}: no se controlan regresiones de tiempo/tamaño")
+
+    if fallas:
+        print("\nREGRESIONES:")
+        for falla in fallas:
+            print(f"  - {falla}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Documentos sintéticos para los benchmarks y los golden files de PDFs.
+
+Los CRT se arman como objetos ORM transitorios (sin sesión ni base de
+datos) con todas sus relaciones cargadas; los MIC son el dict que recibe
+`generar_micdta_pdf_con_datos`. Todas las fechas son fijas para que el
+texto extraído sea estable.
+
+Casos:
+  - *_corto:  campos mínimos
+  - *_largo / mic_campo38_max / mic_campo40_max: textos al tope de sus
+    columnas (o muy por encima del espacio de la caja en los Text)
+  - crt_gastos: 24 filas de gastos (más de las que entran en el campo 15)
+  - mic_completo: todos los campos con valores realistas
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from app.models import CRT, CRT_Gasto, Ciudad, Moneda, Pais, Remitente, Transportadora
+from app.utils.crt_renderer import CRTRenderer
+from app.utils.layout_mic import generar_micdta_pdf_con_datos
+
+DETALLE = ("1.200 BOLSAS DE SOJA EN GRANO A GRANEL, COSECHA 2026, NCM 1201.90.00, "
+           "PESO NETO 29.800 KG, LOTE Nº 45/2026 - São Paulo / Asunción. ")
+
+
+def _texto(largo):
+    """Texto de `largo` caracteres a partir del detalle de mercadería."""
+    return (DETALLE * (largo // len(DETALLE) + 1))[:largo].rstrip()
+
+
+def _ciudad(nombre, pais, codigo):
+    return Ciudad(nombre=nombre, pais=Pais(nombre=pais, codigo=codigo))
+
+
+def _entidad(nombre, direccion, ciudad, documento="80012345-6"):
+    return Remitente(nombre=nombre, direccion=direccion, ciudad=ciudad,
+                     tipo_documento="RUC", numero_documento=documento)
+
+
+def _crt_base(**campos):
+    asuncion = _ciudad("Asunción", "Paraguay", "PY")
+    sao_paulo = _ciudad("São Paulo", "Brasil", "BR")
+    valores = dict(
+        numero_crt="PY0001234",
+        fecha_emision=datetime(2026, 10, 18),
+        remitente=_entidad("EXPORTADORA GUARANÍ S.R.L.", "Ruta 2 Km 30", asuncion),
+        destinatario=_entidad("IMPORTADORA PAULISTA LTDA.", "Rua das Flores 500", sao_paulo,
+                              documento="12.345.678/0001-90"),
+        transportadora=Transportadora(
+            codigo="TDS", nombre="TRANSPORTES DEL SUR S.A.", direccion="Av. Mcal. López 1234",
+            tipo_documento="RUC", numero_documento="80098765-4", telefono="+595 21 123456",
+            ciudad=asuncion),
+        moneda=Moneda(codigo="USD", nombre="Dólar americano", simbolo="$"),
+        detalles_mercaderia=DETALLE,
+        peso_bruto=Decimal("30000.000"),
+        peso_neto=Decimal("29800.000"),
+        volumen=Decimal("75.50000"),
+        incoterm="FOB",
+        valor_incoterm=Decimal("125430.50"),
+        declaracion_mercaderia="125.430,50",
+        factura_exportacion="001-001-0001234",
+        nro_despacho="26001IC04000123X",
+        gastos=[CRT_Gasto(tramo="Flete Asunción - São Paulo", valor_remitente=Decimal("2500.00"))],
+    )
+    valores.update(campos)
+    return CRT(**valores)
+
+
+# =============================
+#   CRT
+# =============================
+
+def crt_corto():
+    return _crt_base(detalles_mercaderia="SOJA", peso_bruto=None, peso_neto=None,
+                     volumen=None, gastos=[])
+
+
+def crt_largo():
+    ciudad = _ciudad("Ciudad del Este", "Paraguay", "PY")
+    direccion = _texto(120)  # tope de Remitente.direccion
+    return _crt_base(
+        remitente=_entidad(_texto(100), direccion, ciudad),
+        destinatario=_entidad(_texto(100), direccion, ciudad),
+        consignatario=_entidad(_texto(100), direccion, ciudad),
+        notificar_a=_entidad(_texto(100), direccion, ciudad),
+        lugar_entrega=_texto(120),
+        plazo_entrega=_texto(40),
+        transporte_sucesivos=_texto(600),
+        detalles_mercaderia=_texto(3000),
+        observaciones=_texto(2000),
+        formalidades_aduana=_texto(2000),
+        gastos=[CRT_Gasto(tramo=_texto(120), valor_remitente=Decimal("2500.00"),
+                          valor_destinatario=Decimal("100.00"))],
+    )
+
+
+def crt_gastos():
+    return _crt_base(gastos=[
+        CRT_Gasto(tramo=f"Tramo {i} - Flete y seguro",
+                  valor_remitente=Decimal(100 + i), valor_destinatario=Decimal(i))
+        for i in range(1, 25)
+    ])
+
+
+# =============================
+#   MIC
+# =============================
+
+MIC_COMPLETO = {
+    "campo_1_transporte": "TRANSPORTES DEL SUR S.A.\nAv. Mcal. López 1234\nAsunción - Paraguay",
+    "campo_2_numero": "80012345-6",
+    "campo_3_transporte": "☐ Sí / ☒ No",
+    "campo_4_estado": "PY0001234",
+    "campo_5_hoja": "1 / 1",
+    "campo_6_fecha": "18/10/2026",
+    "campo_7_pto_seguro": "ADUANA CIUDAD DEL ESTE - PARAGUAY",
+    "campo_8_destino": "FOZ DO IGUAÇU - BRASIL",
+    "campo_9_datos_transporte": "TRANSPORTES DEL SUR S.A.\nAv. Mcal. López 1234\nAsunción - Paraguay",
+    "campo_10_numero": "80012345-6",
+    "campo_11_placa": "AAB 123",
+    "campo_12_modelo_chasis": "SCANIA / 9BSR6X400D3812345",
+    "campo_13_siempre_45": "45",
+    "campo_14_anio": "2019",
+    "campo_15_placa_semi": "XAB 987",
+    "campo_23_numero_campo2_crt": "PY0001234",
+    "campo_24_aduana": "FOZ DO IGUAÇU",
+    "campo_25_moneda": "DÓLAR AMERICANO",
+    "campo_26_pais": "PARAGUAY",
+    "campo_27_valor_campo16": "125.430,50",
+    "campo_28_total": "2.500,00",
+    "campo_29_seguro": "125,43",
+    "campo_30_tipo_bultos": "BOLSAS",
+    "campo_31_cantidad": "1.200",
+    "campo_32_peso_bruto": "30.000,000",
+    "campo_33_datos_campo1_crt": "EXPORTADORA GUARANÍ S.R.L.\nRuta 2 Km 30\nCapiatá - Paraguay",
+    "campo_34_datos_campo4_crt": "IMPORTADORA PAULISTA LTDA.\nRua das Flores 500\nSão Paulo - Brasil",
+    "campo_35_datos_campo6_crt": "IMPORTADORA PAULISTA LTDA.\nRua das Flores 500\nSão Paulo - Brasil",
+    "campo_36_factura_despacho": "Factura 001-001-0001234\nDespacho 26001IC04000123X",
+    "campo_37_valor_manual": "PREC. 123456 / 123457",
+    "campo_38_datos_campo11_crt": DETALLE * 6,
+    "campo_40_tramo": "DTA 26PY000123 - RUTA: CIUDAD DEL ESTE / FOZ DO IGUAÇU - PLAZO 5 DÍAS",
+}
+
+
+def mic_corto():
+    return {"campo_1_transporte": "TRANSPORTES DEL SUR S.A.", "campo_6_fecha": "18/10/2026",
+            "campo_23_numero_campo2_crt": "PY0001234"}
+
+
+def mic_completo():
+    return dict(MIC_COMPLETO)
+
+
+def mic_campo38_max():
+    # Muy por encima de lo que entra en la caja aun con la fuente mínima (5pt)
+    return dict(MIC_COMPLETO, campo_38_datos_campo11_crt=_texto(8000))
+
+
+def mic_campo40_max():
+    return dict(MIC_COMPLETO, campo_40_tramo=_texto(1500) + "\nCHOFER: JUAN PÉREZ")
+
+
+# =============================
+#   CASOS
+# =============================
+
+CASOS = {
+    "crt_corto": ("crt", crt_corto),
+    "crt_largo": ("crt", crt_largo),
+    "crt_gastos": ("crt", crt_gastos),
+    "mic_corto": ("mic", mic_corto),
+    "mic_completo": ("mic", mic_completo),
+    "mic_campo38_max": ("mic", mic_campo38_max),
+    "mic_campo40_max": ("mic", mic_campo40_max),
+}
+
+
+def preparar(nombre):
+    """Devuelve una función sin argumentos que renderiza el caso y devuelve los bytes."""
+    tipo, fixture = CASOS[nombre]
+    documento = fixture()
+    if tipo == "crt":
+        renderer = CRTRenderer()
+        return lambda: renderer.render(documento)
+    return lambda: generar_micdta_pdf_con_datos(documento)
@@ -0,0 +1,56 @@
+"""
+Golden files de la capa de texto de los PDFs de benchmarks/fixtures.py.
+
+Se compara el texto extraído con PyPDF2 (no los bytes): un cambio de
+rendimiento puede reordenar operadores o cambiar la compresión sin que
+cambie lo que se ve, pero no puede mover, cortar ni perder texto.
+
+Para regenerarlos después de un cambio de layout intencional:
+    python -m benchmarks.bench_pdf --actualizar-golden
+"""
+import difflib
+import io
+import os
+
+from PyPDF2 import PdfReader
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+
+def extraer_texto(pdf_bytes):
+    """Texto de todas las páginas, una línea por renglón y sin espacios finales."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    paginas = []
+    for numero, pagina in enumerate(reader.pages, start=1):
+        lineas = [linea.rstrip() for linea in (pagina.extract_text() or "").splitlines()]
+        paginas.append(f"--- página {numero} ---\n" + "\n".join(lineas))
+    return "\n".join(paginas) + "\n"
+
+
+def ruta_golden(caso):
+    return os.path.join(GOLDEN_DIR, f"{caso}.txt")
+
+
+def guardar_golden(caso, pdf_bytes):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(ruta_golden(caso), "w", encoding="utf-8", newline="\n") as fh:
+        fh.write(extraer_texto(pdf_bytes))
+
+
+def comparar_golden(caso, pdf_bytes):
+    """
+    Devuelve None si el texto coincide con el golden file, o el diff
+    unificado (str) si difiere. Un golden inexistente cuenta como diferencia.
+    """
+    actual = extraer_texto(pdf_bytes)
+    try:
+        with open(ruta_golden(caso), encoding="utf-8") as fh:
+            esperado = fh.read()
+    except FileNotFoundError:
+        return f"no existe {ruta_golden(caso)} (generarlo con --actualizar-golden)"
+    if actual == esperado:
+        return None
+    return "".join(difflib.unified_diff(
+        esperado.splitlines(keepends=True), actual.splitlines(keepends=True),
+        fromfile=f"golden/{caso}.txt", tofile=f"{caso} (actual)",
+    ))
@@ -93,6 +93,10 @@ class Config:
     REFRESH_TOKEN_EXPIRES = int(os.environ.get(
         "REFRESH_TOKEN_EXPIRES_DAYS", "7"))
     ROTATE_REFRESH_TOKENS = _get_bool_env("ROTATE_REFRESH_TOKENS", True)
+    # Cache local de la versión de token por usuario (revocación de access tokens)
+    AUTH_TOKEN_VERSION_TTL_SECONDS = _get_int_env("AUTH_TOKEN_VERSION_TTL_SECONDS", 10)
+    # Cada cuánto un worker verifica si otro proceso cambió roles/permisos
+    RBAC_VERSION_TTL_SECONDS = _get_int_env("RBAC_VERSION_TTL_SECONDS", 5)
     JWT_ISSUER = os.environ.get("JWT_ISSUER", "proyecto-transportadora-web")
     JWT_AUDIENCE = os.environ.get(
         "JWT_AUDIENCE", "proyecto-transportadora-clients")
@@ -121,6 +125,9 @@ class Config:
         os.environ.get("ACCOUNT_LOCK_WINDOW_MINUTES", "15"))
     LOGIN_RATE_LIMIT_PER_MINUTE = int(
         os.environ.get("LOGIN_RATE_LIMIT_PER_MINUTE", "5"))
+    # Intentos por minuto contra una misma cuenta (email/usuario), desde cualquier IP
+    LOGIN_IDENTIFIER_RATE_LIMIT_PER_MINUTE = int(
+        os.environ.get("LOGIN_IDENTIFIER_RATE_LIMIT_PER_MINUTE", "10"))
     LOGIN_RATE_LIMIT_BACKOFF_FACTOR = float(
         os.environ.get("LOGIN_RATE_LIMIT_BACKOFF_FACTOR", "2.0"))
 
@@ -164,5 +171,38 @@ class Config:
     REDIS_URL = os.environ.get("REDIS_URL") or None
     REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", "2"))
     REDIS_ENABLED = _get_bool_env("REDIS_ENABLED", True)
+    # Límites por usuario de las rutas costosas (@rate_limit: PDF, búsqueda)
+    RATE_LIMIT_ENABLED = _get_bool_env("RATE_LIMIT_ENABLED", True)
+
+    PDF_CACHE_ENABLED = _get_bool_env("PDF_CACHE_ENABLED", True)
+    PDF_CACHE_BACKEND = os.environ.get("PDF_CACHE_BACKEND", "disk")
+    PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR") or None
+    PDF_CACHE_MAX_BYTES = _get_int_env(
+        "PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    PDF_BATCH_MAX_ITEMS = _get_int_env("PDF_BATCH_MAX_ITEMS", 500)
+    # El PDF combinado no se transmite por partes: tope más bajo que el ZIP
+    PDF_BATCH_MAX_MERGED_ITEMS = _get_int_env("PDF_BATCH_MAX_MERGED_ITEMS", 100)
+    MIC_PDF_TEMPFILE = _get_bool_env("MIC_PDF_TEMPFILE", False)
+
+    # Generación de PDFs en segundo plano (?async=1)
+    PDF_JOBS_EXECUTOR = os.environ.get("PDF_JOBS_EXECUTOR", "process")
+    PDF_JOBS_WORKERS = _get_int_env("PDF_JOBS_WORKERS", 2)
+    PDF_JOBS_MAX_PENDING = _get_int_env("PDF_JOBS_MAX_PENDING", 100)
+    PDF_JOBS_TTL_SECONDS = _get_int_env("PDF_JOBS_TTL_SECONDS", 900)
+    PDF_JOBS_BACKEND = os.environ.get("PDF_JOBS_BACKEND", "disk")
+    PDF_JOBS_DIR = os.environ.get("PDF_JOBS_DIR") or None
+
+    # Caché de contadores del dashboard (0 = sin caché)
+    DASHBOARD_STATS_TTL_SECONDS = _get_int_env("DASHBOARD_STATS_TTL_SECONDS", 30)
+
+    # Métricas SQL por request (Server-Timing + log) y log de consultas lentas (0 = sin log)
+    SQL_METRICS_ENABLED = _get_bool_env("SQL_METRICS_ENABLED", True)
+    SLOW_QUERY_THRESHOLD_MS = _get_int_env("SLOW_QUERY_THRESHOLD_MS", 500)
+    REQUEST_METRICS_LOG = _get_bool_env("REQUEST_METRICS_LOG", True)
+
+    # /api/metrics (Prometheus). Exige "Authorization: Bearer <METRICS_TOKEN>";
+    # fuera de DEBUG/TESTING, METRICS_ENABLED sin METRICS_TOKEN no arranca
+    METRICS_ENABLED = _get_bool_env("METRICS_ENABLED", True)
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
 
     PREFERRED_URL_SCHEME = os.environ.get("PREFERRED_URL_SCHEME", "https")
@@ -0,0 +1,22 @@
+"""
+Configuración de gunicorn leída automáticamente desde el directorio de trabajo.
+
+Con PROMETHEUS_MULTIPROC_DIR cada worker escribe sus métricas en ese
+directorio y /api/metrics las agrega: se vacía al arrancar el master y se
+marcan los workers que terminan para que sus gauges "live" dejen de contar.
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    directorio = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
+        os.makedirs(directorio, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,97 @@
+"""add_search_indexes
+
+Índices de búsqueda de texto (app/services/search_service.py):
+- PostgreSQL: extensión pg_trgm, índices GIN gin_trgm_ops sobre las columnas
+  buscadas con ILIKE y GIN sobre to_tsvector('simple', detalles_mercaderia),
+  creados con CONCURRENTLY para no bloquear escrituras mientras se construyen.
+- SQLite: tablas FTS5 (tokenizer trigram) con triggers de sincronización.
+
+Revision ID: a3c9e1f7b2d4
+Revises: 6d2d43a0f0d1
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e1f7b2d4'
+down_revision = '6d2d43a0f0d1'
+branch_labels = None
+depends_on = None
+
+
+# tabla -> (columnas buscadas, columnas de texto libre)
+SEARCH_INDEXES = {
+    'crts': (('numero_crt', 'detalles_mercaderia'), ('detalles_mercaderia',)),
+    'mics': (('campo_23_numero_campo2_crt', 'campo_1_transporte',
+              'campo_11_placa', 'campo_8_destino'), ()),
+    'remitentes': (('nombre', 'numero_documento'), ()),
+    'transportadoras': (('nombre', 'codigo', 'direccion'), ()),
+}
+
+
+def _upgrade_postgresql():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for table, (columns, text_columns) in SEARCH_INDEXES.items():
+            for column in columns:
+                if column in text_columns:
+                    op.execute(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_tsv ON {table} "
+                        f"USING gin (to_tsvector('simple', coalesce({column}, '')))")
+                else:
+                    op.execute(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_trgm ON {table} "
+                        f"USING gin ({column} gin_trgm_ops)")
+
+
+def _downgrade_postgresql():
+    with op.get_context().autocommit_block():
+        for table, (columns, text_columns) in SEARCH_INDEXES.items():
+            for column in columns:
+                suffix = 'tsv' if column in text_columns else 'trgm'
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{column}_{suffix}')
+
+
+def _upgrade_sqlite():
+    for table, (columns, _text_columns) in SEARCH_INDEXES.items():
+        fts = f'{table}_fts'
+        cols = ', '.join(columns)
+        new = ', '.join(f'new.{c}' for c in columns)
+        old = ', '.join(f'old.{c}' for c in columns)
+        delete = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+        insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='id', tokenize='trigram')")
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END')
+        op.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END')
+        op.execute(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} '
+            f'BEGIN {delete} {insert} END')
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _downgrade_sqlite():
+    for table in SEARCH_INDEXES:
+        fts = f'{table}_fts'
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        op.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _upgrade_postgresql()
+    elif dialect == 'sqlite':
+        _upgrade_sqlite()
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _downgrade_postgresql()
+    elif dialect == 'sqlite':
+        _downgrade_sqlite()
@@ -0,0 +1,50 @@
+"""add_hot_filter_indexes
+
+Índices para los filtros y órdenes de los listados, estadísticas y
+búsquedas por CRT (crts, mics, honorarios, crt_gastos). En PostgreSQL se
+crean con CONCURRENTLY para no bloquear escrituras sobre tablas grandes.
+
+Revision ID: b7d2f4a6c8e1
+Revises: a3c9e1f7b2d4
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2f4a6c8e1'
+down_revision = 'a3c9e1f7b2d4'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_crts_transportadora_numero', 'crts', ['transportadora_id', 'numero_crt']),
+    ('ix_crts_estado_id', 'crts', ['estado', 'id']),
+    ('ix_crts_fecha_emision', 'crts', ['fecha_emision']),
+    ('ix_crts_remitente_id', 'crts', ['remitente_id']),
+    ('ix_crt_gastos_crt_id', 'crt_gastos', ['crt_id']),
+    ('ix_mics_crt_id', 'mics', ['crt_id']),
+    ('ix_mics_campo_6_fecha', 'mics', ['campo_6_fecha']),
+    ('ix_mics_creado_en', 'mics', ['creado_en']),
+    ('ix_mics_campo_4_estado', 'mics', ['campo_4_estado']),
+    ('ix_honorarios_crt_id', 'honorarios', ['crt_id']),
+    ('ix_honorarios_transportadora_id', 'honorarios', ['transportadora_id', 'id']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True,
+                                if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,58 @@
+"""add_honorarios_resumen
+
+Tabla resumen de honorarios por (transportadora, mes, moneda,
+tipo_operacion) para /api/reportes/honorarios. Se carga acá con los
+honorarios existentes; después la mantiene reportes_service.
+
+Revision ID: c4e8a1b3d5f7
+Revises: b7d2f4a6c8e1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1b3d5f7'
+down_revision = 'b7d2f4a6c8e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'honorarios_resumen',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transportadora_id', sa.Integer(), nullable=False),
+        sa.Column('mes', sa.String(length=7), nullable=False),
+        sa.Column('moneda_id', sa.Integer(), nullable=False),
+        sa.Column('tipo_operacion', sa.String(length=20), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total', sa.Numeric(precision=18, scale=2), nullable=False, server_default='0'),
+        sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['transportadora_id'], ['transportadoras.id']),
+        sa.ForeignKeyConstraint(['moneda_id'], ['monedas.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('transportadora_id', 'mes', 'moneda_id', 'tipo_operacion',
+                            name='uq_honorarios_resumen_clave'),
+    )
+    op.create_index('ix_honorarios_resumen_mes', 'honorarios_resumen', ['mes'])
+
+    if op.get_bind().dialect.name == 'sqlite':
+        mes = "strftime('%Y-%m', fecha)"
+    else:
+        mes = "to_char(fecha, 'YYYY-MM')"
+    op.execute(f"""
+        INSERT INTO honorarios_resumen
+            (transportadora_id, mes, moneda_id, tipo_operacion, cantidad, total, actualizado_en)
+        SELECT transportadora_id, {mes}, moneda_id, coalesce(tipo_operacion, 'EXPORTACION'),
+               count(id), coalesce(sum(monto), 0), CURRENT_TIMESTAMP
+        FROM honorarios
+        GROUP BY transportadora_id, {mes}, moneda_id, coalesce(tipo_operacion, 'EXPORTACION')
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_honorarios_resumen_mes', table_name='honorarios_resumen')
+    op.drop_table('honorarios_resumen')
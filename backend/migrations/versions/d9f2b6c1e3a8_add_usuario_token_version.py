@@ -0,0 +1,29 @@
+"""add_usuario_token_version
+
+Versión de access token por usuario: los tokens llevan el claim `ver` y se
+rechazan cuando cambia (roles, estado, clave o cierre de todas las sesiones).
+
+Revision ID: d9f2b6c1e3a8
+Revises: c4e8a1b3d5f7
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f2b6c1e3a8'
+down_revision = 'c4e8a1b3d5f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_column('token_version')
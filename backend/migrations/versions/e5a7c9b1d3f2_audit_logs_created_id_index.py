@@ -0,0 +1,38 @@
+"""audit_logs_created_id_index
+
+Reemplaza ix_audit_logs_created (created_at) por un índice compuesto
+(created_at, id), el orden del listado paginado por cursor: la página
+siguiente a (created_at, id) se lee como un rango del índice. En PostgreSQL
+se crea con CONCURRENTLY para no bloquear escrituras sobre audit_logs.
+
+Revision ID: e5a7c9b1d3f2
+Revises: d9f2b6c1e3a8
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9b1d3f2'
+down_revision = 'd9f2b6c1e3a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_audit_logs_created_id', 'audit_logs', ['created_at', 'id'],
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('ix_audit_logs_created', table_name='audit_logs',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index('ix_audit_logs_created_id', 'audit_logs', ['created_at', 'id'],
+                        if_not_exists=True)
+        op.drop_index('ix_audit_logs_created', table_name='audit_logs', if_exists=True)
+
+
+def downgrade():
+    op.create_index('ix_audit_logs_created', 'audit_logs', ['created_at'], if_not_exists=True)
+    op.drop_index('ix_audit_logs_created_id', table_name='audit_logs', if_exists=True)
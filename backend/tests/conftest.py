@@ -8,6 +8,8 @@ Estrategia:
 - Fixtures de tokens separadas para admin, operador y visor
 """
 
+import tempfile
+
 import pytest
 
 from app import create_app, db as _db
@@ -15,6 +17,8 @@ from app.models import Role, Usuario
 from app.security.passwords import hash_password
 from app.security.rbac import ensure_roles_permissions
 from app.security.tokens import build_access_payload, encode_jwt
+from app.services import rate_limiter, stats_cache, token_revocation
+from app.utils.query_plan import capture_queries
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -52,6 +56,7 @@ def app():
         'ACCOUNT_LOCK_THRESHOLD': 99,
         'ACCOUNT_LOCK_WINDOW_MINUTES': 15,
         'LOGIN_RATE_LIMIT_PER_MINUTE': 999,
+        'LOGIN_IDENTIFIER_RATE_LIMIT_PER_MINUTE': 999,
         'LOGIN_RATE_LIMIT_BACKOFF_FACTOR': 2.0,
         # MFA
         'MFA_BACKUP_CODES': 10,
@@ -72,7 +77,11 @@ def app():
         'RESET_TOKEN_EXPIRATION_MINUTES': 30,
         'CORS_ALLOW_ORIGINS': ['*'],
         'FRONTEND_URL': 'http://localhost:3000',
+        # Caché de PDFs aislada por sesión de tests
+        'PDF_CACHE_DIR': tempfile.mkdtemp(prefix='pdf-cache-tests-'),
     })
+    from app.services import pdf_cache
+    pdf_cache.init_app(flask_app)
     with flask_app.app_context():
         _db.create_all()
         try:
@@ -100,6 +109,12 @@ def db(app):
         for table in reversed(_db.metadata.sorted_tables):
             _db.session.execute(table.delete())
         _db.session.commit()
+        # Los DELETE masivos no pasan por el ORM: vaciar la caché de contadores
+        stats_cache.invalidate()
+        # SQLite reutiliza ids de usuarios borrados: olvidar sus versiones de token
+        token_revocation.clear()
+        # Los buckets en memoria del rate limiter sobreviven entre tests
+        rate_limiter.reset()
         # Re-inicializar roles/permisos base
         try:
             ensure_roles_permissions()
@@ -113,6 +128,23 @@ def client(app, db):
     return app.test_client()
 
 
+@pytest.fixture(scope='function')
+def count_queries(db):
+    """
+    Cuenta los SELECT que emite un request (para detectar consultas N+1):
+
+        n = count_queries(client.get, '/api/honorarios/', headers=headers)
+
+    Falla si la respuesta no es 200.
+    """
+    def _count(request_fn, *args, **kwargs):
+        with capture_queries() as queries:
+            resp = request_fn(*args, **kwargs)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        return len(queries)
+    return _count
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers internos
 # ──────────────────────────────────────────────────────────────────────────────
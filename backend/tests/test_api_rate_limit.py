@@ -0,0 +1,53 @@
+"""
+test_api_rate_limit.py - Límites por usuario en rutas costosas (@rate_limit).
+
+Cubre:
+  1. Búsqueda: cabeceras RateLimit-* y 429 con Retry-After al agotar el cupo
+  2. RATE_LIMIT_ENABLED=False desactiva límites y cabeceras
+"""
+
+import pytest
+from flask import g
+
+from app.services import rate_limiter
+from tests.conftest import _create_user, _make_token, auth_headers
+
+SEARCH_URL = '/api/mic-guardados/search'
+
+
+@pytest.fixture
+def usuario(db):
+    return _create_user('operador', 'limites@test.local', 'limites_test')
+
+
+@pytest.fixture
+def headers(usuario):
+    g.pop('current_user', None)
+    return auth_headers(_make_token(usuario))
+
+
+def test_busqueda_cabeceras_y_429(client, usuario, headers):
+    rate_limiter.hit('search', f'u:{usuario.id}', 60, 60, cost=58)
+
+    resp = client.post(SEARCH_URL, json={}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers['RateLimit-Limit'] == '60'
+    assert resp.headers['RateLimit-Remaining'] == '1'
+    assert resp.headers['RateLimit-Policy'] == '60;w=60'
+    assert 'Retry-After' not in resp.headers
+
+    assert client.post(SEARCH_URL, json={}, headers=headers).status_code == 200
+    bloqueada = client.post(SEARCH_URL, json={}, headers=headers)
+    assert bloqueada.status_code == 429
+    assert bloqueada.headers['RateLimit-Remaining'] == '0'
+    assert int(bloqueada.headers['Retry-After']) >= 1
+    assert bloqueada.get_json()['retry_after_seconds'] == int(bloqueada.headers['Retry-After'])
+
+
+def test_desactivado(client, app, usuario, headers, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_ENABLED', False)
+    rate_limiter.hit('search', f'u:{usuario.id}', 60, 60, cost=60)
+
+    resp = client.post(SEARCH_URL, json={}, headers=headers)
+    assert resp.status_code == 200
+    assert 'RateLimit-Limit' not in resp.headers
@@ -0,0 +1,87 @@
+"""
+test_auth_fast_path.py - Autenticación sin consultar usuarios/roles por request.
+
+Cubre:
+  1. Un listado de catálogo no toca usuarios, user_roles ni role_permissions
+  2. Cambios de rol / estado revocan los access tokens emitidos
+  3. revoke_all_tokens revoca; un token nuevo vuelve a funcionar
+  4. También en las rutas de auth_bp que cargan el usuario de la base
+"""
+
+import pytest
+from flask import g
+
+from app.models import Role, Usuario
+from app.security.rbac import ROLE_MATRIX
+from app.security.tokens import revoke_all_tokens
+from app.utils.query_plan import capture_queries
+from tests.conftest import _create_user, _make_token, auth_headers
+
+URL = '/api/monedas/'
+TABLAS_AUTH = ('usuarios', 'user_roles', 'role_permissions', 'roles', 'permissions')
+
+
+@pytest.fixture
+def usuario(db):
+    return _create_user('operador', 'rapido@test.local', 'rapido_test')
+
+
+def _get(client, url, token):
+    # Los requests del test comparten el contexto de app: forzar la autenticación
+    g.pop('current_user', None)
+    return client.get(url, headers=auth_headers(token))
+
+
+def test_catalogo_sin_consultas_de_autenticacion(client, usuario):
+    token = _make_token(usuario)
+    assert _get(client, URL, token).status_code == 200
+
+    with capture_queries() as queries:
+        resp = _get(client, URL, token)
+    assert resp.status_code == 200
+    assert not [q.statement for q in queries if any(t in q.statement for t in TABLAS_AUTH)]
+    assert g.current_user.id == usuario.id
+    assert g.current_user.permissions == frozenset(ROLE_MATRIX['operador'])
+
+
+@pytest.mark.parametrize('cambio', ['rol', 'estado'])
+def test_cambio_de_seguridad_revoca(client, db, usuario, cambio):
+    token = _make_token(usuario)
+    assert _get(client, URL, token).status_code == 200
+
+    user = db.session.get(Usuario, usuario.id)
+    if cambio == 'rol':
+        user.roles = [Role.query.filter_by(name='visor').first() or Role(name='visor')]
+    else:
+        user.is_active, user.estado = False, 'inactivo'
+    db.session.commit()
+
+    assert _get(client, URL, token).status_code == 401
+
+
+def test_revoke_all_tokens_y_token_nuevo(client, db, usuario):
+    token = _make_token(usuario)
+    assert _get(client, URL, token).status_code == 200
+
+    user = db.session.get(Usuario, usuario.id)
+    revoke_all_tokens(user)
+    db.session.commit()
+
+    assert _get(client, URL, token).status_code == 401
+    assert _get(client, URL, _make_token(user)).status_code == 200
+
+
+def test_revocado_en_rutas_con_carga_completa(client, db, usuario):
+    token = _make_token(usuario)
+    assert _get(client, '/api/auth/me', token).status_code == 200
+
+    user = db.session.get(Usuario, usuario.id)
+    revoke_all_tokens(user)
+    db.session.commit()
+
+    assert _get(client, '/api/auth/me', token).status_code == 401
+    g.pop('current_user', None)
+    resp = client.post('/api/auth/change-password', headers=auth_headers(token),
+                       json={'current_password': 'TestPass1!', 'new_password': 'OtraClave123!'})
+    assert resp.status_code == 401
+    assert _get(client, '/api/auth/me', _make_token(user)).status_code == 200
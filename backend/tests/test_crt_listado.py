@@ -0,0 +1,87 @@
+"""
+test_crt_listado.py - Tests de las vistas del listado de CRTs.
+
+Cubre:
+  1. view=summary (por defecto): solo columnas de la tabla, datos de MIC agregados
+  2. view=full: el CRT completo (gastos, ciudades, países)
+  3. Los filtros y el cursor funcionan sobre la proyección
+"""
+
+import pytest
+
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'listado@test.local', 'listado_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def crts(db, domain_data):
+    from app.models import CRT, CRT_Gasto, MIC
+
+    creados = []
+    for n, estado in enumerate(('EMITIDO', 'FINALIZADO')):
+        crt = CRT(
+            numero_crt=f'PY00000080{n}',
+            estado=estado,
+            remitente_id=domain_data['remitente_id'],
+            destinatario_id=domain_data['destinatario_id'],
+            transportadora_id=domain_data['transportadora_id'],
+            ciudad_emision_id=domain_data['ciudad_id'],
+            pais_emision_id=domain_data['pais_id'],
+            moneda_id=domain_data['moneda_id'],
+            factura_exportacion=f'001-001-00{n}',
+            gastos=[CRT_Gasto(tramo='Flete', valor_remitente=100)],
+        )
+        db.session.add(crt)
+        creados.append(crt)
+    db.session.flush()
+    db.session.add_all([
+        MIC(crt_id=creados[0].id, campo_23_numero_campo2_crt='MIC-1', campo_4_estado='PROVISORIO'),
+        MIC(crt_id=creados[0].id, campo_23_numero_campo2_crt='MIC-2', campo_4_estado='DEFINITIVO'),
+    ])
+    db.session.commit()
+    return [c.id for c in creados]
+
+
+def test_vista_resumen_por_defecto(client, headers, crts, domain_data):
+    data = client.get('/api/crts/', headers=headers).get_json()
+    fila_con_mic, fila_sin_mic = sorted(data['crts'], key=lambda c: c['id'])
+
+    assert fila_con_mic['numero_crt'] == 'PY000000800'
+    assert fila_con_mic['remitente_id'] == domain_data['remitente_id']
+    assert fila_con_mic['remitente'] and fila_con_mic['destinatario'] and fila_con_mic['transportadora']
+    assert fila_con_mic['factura_exportacion'] == '001-001-000'
+    assert (fila_con_mic['tiene_mic'], fila_con_mic['mics_count']) == (True, 2)
+    assert (fila_con_mic['mic_numero'], fila_con_mic['mic_estado']) == ('MIC-1', 'PROVISORIO')
+    assert fila_con_mic['acciones']['puede_eliminar'] is True
+
+    assert (fila_sin_mic['tiene_mic'], fila_sin_mic['mics_count'], fila_sin_mic['mic_numero']) == (False, 0, None)
+    assert fila_sin_mic['acciones']['puede_eliminar'] is False
+    assert 'gastos' not in fila_sin_mic and 'detalles_mercaderia' not in fila_sin_mic
+
+
+def test_vista_completa(client, headers, crts):
+    data = client.get('/api/crts/?view=full', headers=headers).get_json()
+    fila = next(c for c in data['crts'] if c['id'] == crts[0])
+
+    assert len(fila['gastos']) == 1
+    assert fila['remitente_ciudad'] and fila['ciudad_emision']
+    assert (fila['mics_count'], fila['mic_numero']) == (2, 'MIC-1')
+
+
+def test_resumen_con_filtros_y_cursor(client, headers, crts):
+    por_estado = client.get('/api/crts/?estado=FINALIZADO', headers=headers).get_json()
+    assert [c['id'] for c in por_estado['crts']] == [crts[1]]
+
+    busqueda = client.get('/api/crts/?q=PY000000800', headers=headers).get_json()
+    assert [c['id'] for c in busqueda['crts']] == [crts[0]]
+    assert busqueda['pagination']['total'] == 1
+
+    primera = client.get('/api/crts/?cursor=&per_page=1', headers=headers).get_json()
+    segunda = client.get(f"/api/crts/?cursor={primera['pagination']['next_cursor']}&per_page=1",
+                         headers=headers).get_json()
+    assert [primera['crts'][0]['id'], segunda['crts'][0]['id']] == sorted(crts, reverse=True)
@@ -0,0 +1,154 @@
+"""
+test_crt_pdf.py - Tests de generación de PDFs de CRT.
+
+Cubre:
+  1. PDF individual (POST /api/crts/<id>/pdf) y reutilización de la caché
+  2. Exportación en lote como ZIP (POST /api/crts/pdf/batch)
+  3. Exportación en lote como PDF combinado usando filtros del listado
+  4. Validación del cuerpo (formato, ids, filtros) y tope propio del PDF combinado
+  5. El lote descuenta un lugar por CRT del bucket `pdf-lote`
+  6. CRTRenderer: la plantilla estática se guarda una sola vez por documento
+
+Nota: el usuario y el token se crean dentro del contexto del fixture `db`
+para que el objeto no quede desvinculado de la sesión.
+"""
+
+import io
+import zipfile
+
+import pytest
+from PyPDF2 import PdfReader
+
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'pdf@test.local', 'pdf_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def crt_ids(db, domain_data):
+    from app.models import CRT, CRT_Gasto
+
+    ids = []
+    for i in range(1, 4):
+        crt = CRT(
+            numero_crt=f'PY00000000{i}',
+            estado='EMITIDO',
+            remitente_id=domain_data['remitente_id'],
+            destinatario_id=domain_data['destinatario_id'],
+            transportadora_id=domain_data['transportadora_id'],
+            ciudad_emision_id=domain_data['ciudad_id'],
+            pais_emision_id=domain_data['pais_id'],
+            moneda_id=domain_data['moneda_id'],
+            detalles_mercaderia='Mercadería de prueba ' * 20,
+        )
+        db.session.add(crt)
+        db.session.flush()
+        db.session.add(CRT_Gasto(crt_id=crt.id, tramo='Flete', valor_remitente=100,
+                                 moneda_remitente_id=domain_data['moneda_id']))
+        ids.append(crt.id)
+    db.session.commit()
+    return ids
+
+
+def test_pdf_individual_usa_cache(client, headers, crt_ids):
+    first = client.post(f'/api/crts/{crt_ids[0]}/pdf', headers=headers)
+    second = client.post(f'/api/crts/{crt_ids[0]}/pdf', headers=headers)
+
+    assert first.status_code == 200
+    assert first.data.startswith(b'%PDF')
+    assert second.headers['X-PDF-Cache'] == 'HIT'
+    assert second.data == first.data
+
+
+def test_lote_zip_por_ids(client, headers, crt_ids):
+    resp = client.post('/api/crts/pdf/batch', headers=headers,
+                       json={'ids': [crt_ids[2], crt_ids[0]]})
+
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/zip'
+    archivo = zipfile.ZipFile(io.BytesIO(resp.data))
+    nombres = archivo.namelist()
+    assert len(nombres) == 2
+    assert nombres[0].startswith('CRT_0003')
+    assert archivo.read(nombres[1]).startswith(b'%PDF')
+
+
+def test_lote_pdf_combinado_por_filtros(client, headers, crt_ids):
+    resp = client.post('/api/crts/pdf/batch', headers=headers,
+                       json={'filtros': {'estado': 'EMITIDO'}, 'formato': 'pdf'})
+
+    assert resp.status_code == 200
+    assert resp.headers['X-CRT-Count'] == '3'
+    assert len(PdfReader(io.BytesIO(resp.data)).pages) == 3
+
+
+def test_lote_formato_invalido(client, headers, crt_ids):
+    resp = client.post('/api/crts/pdf/batch', headers=headers,
+                       json={'ids': crt_ids, 'formato': 'docx'})
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize('body', [
+    {'ids': []},
+    {'ids': '123'},
+    {'ids': {'1': 1}},
+    {'ids': list(range(1, 503))},
+    {'filtros': {'transportadora_id': 'abc'}},
+    {'filtros': {'fecha_desde': '2026-13-01'}},
+    {'filtros': {'fecha_hasta': 'ayer'}},
+])
+def test_lote_cuerpo_invalido(client, headers, crt_ids, body):
+    resp = client.post('/api/crts/pdf/batch', headers=headers, json=body)
+    assert resp.status_code == 400
+
+
+def test_lote_pdf_combinado_tope_propio(client, app, headers, crt_ids, monkeypatch):
+    monkeypatch.setitem(app.config, 'PDF_BATCH_MAX_MERGED_ITEMS', 2)
+
+    combinado = client.post('/api/crts/pdf/batch', headers=headers,
+                            json={'ids': crt_ids, 'formato': 'pdf'})
+    assert combinado.status_code == 400
+    assert 'máximo de 2' in combinado.get_json()['error']
+
+    zip_ = client.post('/api/crts/pdf/batch', headers=headers, json={'ids': crt_ids})
+    assert zip_.status_code == 200
+
+
+def test_lote_cuesta_un_lugar_por_crt(client, app, headers, crt_ids, monkeypatch):
+    monkeypatch.setitem(app.config, 'PDF_BATCH_MAX_ITEMS', 5)
+
+    primero = client.post('/api/crts/pdf/batch', headers=headers, json={'ids': crt_ids})
+    assert primero.status_code == 200
+    assert primero.headers['RateLimit-Remaining'] == '2'
+    assert primero.headers['RateLimit-Policy'] == '5;w=600'
+    assert primero.data.startswith(b'PK')
+
+    segundo = client.post('/api/crts/pdf/batch', headers=headers, json={'ids': crt_ids})
+    assert segundo.status_code == 429
+    assert int(segundo.headers['Retry-After']) >= 1
+    # Un lote más chico todavía entra en el cupo restante
+    tercero = client.post('/api/crts/pdf/batch', headers=headers, json={'ids': crt_ids[:2]})
+    assert tercero.status_code == 200
+    assert tercero.data.startswith(b'PK')
+
+
+def test_renderer_reutiliza_plantilla_en_lote(db, crt_ids):
+    from app.models import CRT
+    from app.utils.crt_renderer import CRTRenderer, crt_pdf_options
+
+    crts = CRT.query.options(*crt_pdf_options()).filter(CRT.id.in_(crt_ids)).all()
+    output = CRTRenderer().render_many(crts, io.BytesIO())
+
+    reader = PdfReader(io.BytesIO(output.getvalue()))
+    assert len(reader.pages) == 3
+    # Todas las páginas referencian el mismo objeto de plantilla
+    refs = set()
+    for page in reader.pages:
+        xobjects = page['/Resources']['/XObject']
+        assert len(xobjects) == 1
+        refs.update(xobjects.raw_get(name).idnum for name in xobjects)
+    assert len(refs) == 1
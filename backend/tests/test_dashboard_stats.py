@@ -0,0 +1,65 @@
+"""
+test_dashboard_stats.py - Contadores del dashboard (/api/dashboard/stats).
+
+Cubre:
+  1. Una sola sentencia SQL; la segunda llamada sale de la caché
+  2. ETag / Cache-Control y 304 con If-None-Match
+  3. Un commit sobre una tabla contada invalida la caché
+"""
+
+import pytest
+
+from app.utils.query_plan import capture_queries
+from tests.conftest import _create_user, _make_token, auth_headers
+
+URL = '/api/dashboard/stats'
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('admin', 'dashboard@test.local', 'dashboard_test')
+    return auth_headers(_make_token(user))
+
+
+def _consultas_stats(queries):
+    return [q for q in queries if 'count(' in q.statement.lower()]
+
+
+def test_stats_una_sentencia_y_cache(client, headers, domain_data):
+    with capture_queries() as queries:
+        resp = client.get(URL, headers=headers)
+    data = resp.get_json()
+
+    assert resp.status_code == 200
+    assert len(_consultas_stats(queries)) == 1
+    assert (data['paises'], data['remitentes'], data['transportadoras'], data['crt']) == (1, 2, 1, 0)
+    assert data['usuarios'] >= 1 and data['mic'] == 0
+
+    with capture_queries() as queries:
+        again = client.get(URL, headers=headers)
+    assert again.get_json() == data
+    assert _consultas_stats(queries) == []
+
+
+def test_stats_etag_y_304(client, headers, domain_data):
+    resp = client.get(URL, headers=headers)
+    etag = resp.headers['ETag']
+    assert etag
+    assert 'no-cache' in resp.headers['Cache-Control'] and 'private' in resp.headers['Cache-Control']
+
+    no_modificado = client.get(URL, headers={**headers, 'If-None-Match': etag})
+    assert no_modificado.status_code == 304
+    assert no_modificado.data == b''
+
+
+def test_commit_invalida_cache(client, headers, domain_data, db):
+    from app.models import Pais
+
+    antes = client.get(URL, headers=headers)
+    db.session.add(Pais(nombre='Brasil', codigo='BR'))
+    db.session.commit()
+
+    despues = client.get(URL, headers={**headers, 'If-None-Match': antes.headers['ETag']})
+    assert despues.status_code == 200
+    assert despues.get_json()['paises'] == antes.get_json()['paises'] + 1
+    assert despues.headers['ETag'] != antes.headers['ETag']
@@ -0,0 +1,63 @@
+"""
+test_fonts.py - Tests del registro de fuentes de los PDFs.
+
+Cubre:
+  1. Las fuentes del MIC se cargan de app/assets/fonts una sola vez
+  2. Los TTF incluidos vienen sin tablas de hinting y conservan la licencia
+  3. Los subconjuntos incrustados no arrastran hinting
+"""
+
+import os
+import struct
+import zlib
+
+import pytest
+from reportlab.pdfbase import pdfmetrics
+
+from app.utils import fonts
+
+TEXTO = 'TRANSPORTES DEL SUR S.A. - Asunción / São Paulo - Nº 1234, año 2026'
+HINTING = {'cvt ', 'fpgm', 'prep', 'hdmx', 'LTSH', 'VDMX'}
+
+
+def _tablas(data):
+    num = struct.unpack('>H', data[4:6])[0]
+    return {data[12 + 16 * i:16 + 16 * i].decode('latin-1') for i in range(num)}
+
+
+def test_registro_desde_assets():
+    nombres = fonts.register_fonts()
+    assert nombres == (fonts.UNICODE_REGULAR, fonts.UNICODE_BOLD)
+    assert fonts.register_fonts() is nombres
+
+    face = pdfmetrics.getFont(fonts.UNICODE_REGULAR).face
+    assert face.filename.startswith(fonts.FONTS_DIR)
+    assert fonts.word_units.cache_info().currsize > 0
+
+
+@pytest.mark.parametrize('archivo', sorted(fonts.UNICODE_FILES.values()))
+def test_ttf_incluidos_compactos(archivo):
+    with open(os.path.join(fonts.FONTS_DIR, archivo), 'rb') as fh:
+        data = fh.read()
+    tablas = _tablas(data)
+    assert not tablas & HINTING
+    assert {'glyf', 'loca', 'hmtx', 'cmap', 'name'} <= tablas
+
+    offset = data.index(b'name') + 8
+    inicio = struct.unpack('>L', data[offset:offset + 4])[0]
+    cantidad = struct.unpack('>H', data[inicio + 2:inicio + 4])[0]
+    ids = {struct.unpack('>H', data[inicio + 12 + 12 * i:inicio + 14 + 12 * i])[0]
+           for i in range(cantidad)}
+    assert {0, 13, 14} <= ids  # copyright, licencia y URL de la licencia
+    assert os.path.exists(os.path.join(fonts.FONTS_DIR, 'LICENSE'))
+
+
+def test_subconjunto_incrustado_sin_hinting():
+    # Mismo subconjunto de glifos que ReportLab incrusta (comprimido) en el PDF
+    fonts.register_fonts()
+    codigos = sorted({ord(ch) for ch in TEXTO})
+    subconjunto = pdfmetrics.getFont(fonts.UNICODE_REGULAR).face.makeSubset(codigos)
+
+    assert not _tablas(subconjunto) & HINTING
+    # Con el DejaVu original (con hinting) eran ~10 KB
+    assert len(zlib.compress(subconjunto)) < 7 * 1024
@@ -0,0 +1,100 @@
+"""
+test_metrics.py - Endpoint de métricas Prometheus (/api/metrics).
+
+Cubre:
+  1. Latencia por blueprint/endpoint e in-flight en formato de texto
+  2. Duración de renders de PDF (incluidos lote combinado y diagnóstico)
+     y chequeos del rate limiter por backend
+  3. METRICS_TOKEN exige el token del scraper
+  4. En producción, sin METRICS_TOKEN no se sirven ni arranca la app
+"""
+
+import re
+
+import pytest
+
+from app import _validate_config
+from app.services import pdf_cache, rate_limiter
+from tests.conftest import _create_user, _make_token, auth_headers
+
+URL = '/api/metrics'
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('admin', 'prometheus@test.local', 'prometheus_test')
+    return auth_headers(_make_token(user))
+
+
+def _valor(texto, metrica, **labels):
+    patron = re.escape(metrica) + r'\{([^}]*)\} ([0-9.e+-]+)'
+    for etiquetas, valor in re.findall(patron, texto):
+        pares = dict(re.findall(r'(\w+)="([^"]*)"', etiquetas))
+        if all(pares.get(k) == v for k, v in labels.items()):
+            return float(valor)
+    return None
+
+
+def test_latencia_por_endpoint(client, headers):
+    antes = client.get(URL).get_data(as_text=True)
+    previas = _valor(antes, 'http_request_duration_seconds_count', blueprint='paises',
+                     endpoint='paises.listar_paises', method='GET', status='200') or 0
+
+    client.get('/api/paises/', headers=headers)
+    resp = client.get(URL)
+    texto = resp.get_data(as_text=True)
+
+    assert resp.status_code == 200
+    assert resp.content_type.startswith('text/plain; version=0.0.4')
+    assert _valor(texto, 'http_request_duration_seconds_count', blueprint='paises',
+                  endpoint='paises.listar_paises', method='GET', status='200') == previas + 1
+    # Solo el propio scrape está en curso
+    assert re.search(r'^http_requests_in_flight 1\.0$', texto, re.M)
+
+
+def test_pdf_y_rate_limiter(client, db):
+    antes = client.get(URL).get_data(as_text=True)
+    renders = _valor(antes, 'pdf_render_duration_seconds_count', kind='crt') or 0
+    chequeos = _valor(antes, 'rate_limiter_checks_total', backend='memory') or 0
+
+    pdf_cache.get_or_render('crt-1-sinclave', lambda: b'%PDF')
+    rate_limiter.check_rate_limit('10.0.0.1', limit=5, backoff_factor=2.0)
+
+    texto = client.get(URL).get_data(as_text=True)
+    assert _valor(texto, 'pdf_render_duration_seconds_count', kind='crt') == renders + 1
+    assert _valor(texto, 'rate_limiter_checks_total', backend='memory') == chequeos + 1
+
+
+def test_pdf_combinado_y_diagnostico_medidos(client, db):
+    from app.routes import crt, mic
+
+    antes = client.get(URL).get_data(as_text=True)
+    crts = _valor(antes, 'pdf_render_duration_seconds_count', kind='crt') or 0
+    mics = _valor(antes, 'pdf_render_duration_seconds_count', kind='mic') or 0
+
+    assert b''.join(crt._stream_pdf_combinado_crts([])).startswith(b'%PDF')
+    mic.mic_pdf_diagnostico({'campo_1_transporte': 'Transportes SA'})
+
+    texto = client.get(URL).get_data(as_text=True)
+    assert _valor(texto, 'pdf_render_duration_seconds_count', kind='crt') == crts + 1
+    assert _valor(texto, 'pdf_render_duration_seconds_count', kind='mic') == mics + 1
+
+def test_token_requerido(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'secreto-scraper')
+    assert client.get(URL).status_code == 401
+    assert client.get(URL, headers={'Authorization': 'Bearer otro'}).status_code == 401
+    assert client.get(URL, headers={'Authorization': 'Bearer secreto-scraper'}).status_code == 200
+
+
+def test_sin_token_en_produccion(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', None)
+    monkeypatch.setitem(app.config, 'TESTING', False)
+    monkeypatch.setitem(app.config, 'DEBUG', False)
+    assert client.get(URL).status_code == 401
+
+    monkeypatch.setitem(app.config, 'MFA_ENCRYPTION_KEY', 'clave')
+    monkeypatch.setitem(app.config, 'JWT_SECRET_KEY', 'x' * 40)
+    with pytest.raises(RuntimeError, match='METRICS_TOKEN'):
+        _validate_config(app)
+    monkeypatch.setitem(app.config, 'METRICS_ENABLED', False)
+    _validate_config(app)
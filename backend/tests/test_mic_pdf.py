@@ -0,0 +1,134 @@
+"""
+test_mic_pdf.py - Tests del generador de PDF MIC/DTA.
+
+Cubre:
+  1. El marco estático se graba una vez y se estampa como form XObject
+  2. Generación en memoria (bytes / buffer) sin archivos temporales
+  3. PDF de MIC guardado servido desde memoria y caché
+  4. Fallback opcional con archivo temporal (MIC_PDF_TEMPFILE)
+  5. Render sin salida por stdout y diagnóstico de ajuste bajo pedido
+"""
+
+import io
+from datetime import date
+
+import pytest
+from PyPDF2 import PdfReader
+
+from app.utils import layout_mic
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'micpdf@test.local', 'mic_pdf_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def mic_id(db, domain_data):
+    from app.models import CRT, MIC
+
+    crt = CRT(
+        numero_crt='PY000000001',
+        estado='EMITIDO',
+        remitente_id=domain_data['remitente_id'],
+        destinatario_id=domain_data['destinatario_id'],
+        transportadora_id=domain_data['transportadora_id'],
+        ciudad_emision_id=domain_data['ciudad_id'],
+        pais_emision_id=domain_data['pais_id'],
+        moneda_id=domain_data['moneda_id'],
+    )
+    db.session.add(crt)
+    db.session.flush()
+    mic = MIC(crt_id=crt.id, campo_1_transporte='Transportes SA', campo_4_estado='PROVISORIO',
+              campo_23_numero_campo2_crt='PY000000001', campo_6_fecha=date(2026, 1, 5))
+    db.session.add(mic)
+    db.session.commit()
+    return mic.id
+
+
+def test_marco_estampado_como_form(tmp_path):
+    destino = tmp_path / 'mic.pdf'
+    layout_mic.generar_micdta_pdf_con_datos(
+        {'campo_1_transporte': 'Transportes SA', 'campo_6_fecha': '18/10/2026'}, str(destino))
+
+    page = PdfReader(str(destino)).pages[0]
+    assert len(page['/Resources']['/XObject']) == 1
+    texto = page.extract_text()
+    assert '38 Marcas y números de los bultos' in texto
+    assert 'Transportes SA' in texto
+    # Las operaciones del marco quedan grabadas para el resto del proceso
+    assert layout_mic.MIC_TEMPLATE.ops is layout_mic.MIC_TEMPLATE.ops
+
+
+
+def test_generacion_en_memoria():
+    buffer = io.BytesIO()
+    pdf_bytes = layout_mic.generar_micdta_pdf_con_datos({'campo_23_numero_campo2_crt': 'PY1'}, buffer)
+
+    assert pdf_bytes.startswith(b'%PDF')
+    assert buffer.getvalue() == pdf_bytes
+
+
+def test_pdf_mic_guardado_desde_memoria(client, headers, mic_id, monkeypatch):
+    import tempfile
+
+    def _sin_temporales(*args, **kwargs):
+        raise AssertionError('no debe usarse un archivo temporal')
+
+    monkeypatch.setattr(tempfile, 'NamedTemporaryFile', _sin_temporales)
+
+    first = client.get(f'/api/mic-guardados/{mic_id}/pdf', headers=headers)
+    second = client.get(f'/api/mic-guardados/{mic_id}/pdf', headers=headers)
+
+    assert first.status_code == 200
+    assert first.data.startswith(b'%PDF')
+    assert first.headers['X-PDF-Cache'] == 'MISS'
+    assert second.headers['X-PDF-Cache'] == 'HIT'
+
+
+def test_pdf_mic_fallback_archivo_temporal(app, client, headers, monkeypatch):
+    import tempfile
+
+    usados = []
+    original = tempfile.TemporaryFile
+
+    def _temporal(*args, **kwargs):
+        fh = original(*args, **kwargs)
+        usados.append(fh)
+        return fh
+
+    monkeypatch.setitem(app.config, 'MIC_PDF_TEMPFILE', True)
+    monkeypatch.setattr(tempfile, 'TemporaryFile', _temporal)
+
+    resp = client.post('/api/mic/generate_pdf_from_crt/1', headers=headers,
+                       json={'campo_38': 'Mercadería'}, buffered=True)
+
+    assert resp.status_code == 200
+    assert resp.data.startswith(b'%PDF')
+    assert len(usados) == 1 and usados[0].closed
+
+
+def test_render_sin_salida_por_stdout(capsys):
+    layout_mic.generar_micdta_pdf_con_datos({
+        'campo_1_transporte': 'Transportes SA\nCalle 1',
+        'campo_23_numero_campo2_crt': 'PY1',
+        'campo_38_datos_campo11_crt': 'Soja a granel ' * 80,
+        'campo_40_tramo': 'Asunción - Santos',
+    })
+
+    assert capsys.readouterr().out == ''
+
+
+def test_diagnostico_por_campo(client, headers, mic_id):
+    resp = client.get(f'/api/mic-guardados/{mic_id}/pdf?diagnostico=1', headers=headers)
+
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data['bytes'] > 0
+    campo1 = data['campos']['campo_1']
+    assert campo1['metodo'] == 'multilinea'
+    assert campo1['font_size_used'] == 16
+    assert campo1['lines_drawn'] == 1 and not campo1['truncated']
+    assert 'campo_23' in data['campos'] and 'campo_38' not in data['campos']
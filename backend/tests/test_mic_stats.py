@@ -0,0 +1,84 @@
+"""
+test_mic_stats.py - Estadísticas de MICs guardados (/api/mic-guardados/stats).
+
+Cubre:
+  1. Contadores (total, hoy, semana, por estado, por mes) en una sola consulta a mics
+  2. Granularidad día/semana y rango arbitrario, con períodos vacíos en 0
+  3. Parámetros inválidos -> 400
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.services import mic_stats_service
+from app.utils.query_plan import capture_queries
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'stats@test.local', 'stats_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def mics(db):
+    from app.models import MIC
+
+    ahora = datetime.now()
+    creados = [
+        (ahora, 'PROVISORIO'),
+        (ahora - timedelta(days=3), 'DEFINITIVO'),
+        (ahora - timedelta(days=40), 'DEFINITIVO'),
+        (ahora - timedelta(days=400), 'PROVISORIO'),  # fuera del rango por defecto
+    ]
+    db.session.add_all([MIC(campo_4_estado=estado, creado_en=fecha) for fecha, estado in creados])
+    db.session.commit()
+    return [fecha for fecha, _ in creados]
+
+
+def test_stats_una_consulta(client, headers, mics):
+    with capture_queries() as queries:
+        resp = client.get('/api/mic-guardados/stats', headers=headers)
+    data = resp.get_json()
+
+    assert resp.status_code == 200
+    assert len([q for q in queries if 'mics' in q.statement]) == 1
+    assert (data['total_mics'], data['mics_hoy'], data['mics_semana']) == (4, 1, 2)
+    assert {e['estado']: e['cantidad'] for e in data['por_estado']} == {'PROVISORIO': 2, 'DEFINITIVO': 2}
+
+    por_mes = {p['mes']: p['cantidad'] for p in data['por_mes']}
+    assert sum(por_mes.values()) == 3
+    assert por_mes[mics[0].strftime('%Y-%m')] >= 1
+    assert data['granularidad'] == 'mes'
+    assert len(por_mes) == len(mic_stats_service.periodos(
+        date.fromisoformat(data['fecha_desde']), date.fromisoformat(data['fecha_hasta']), 'mes'))
+
+
+def test_stats_granularidad_y_rango(client, headers, mics):
+    desde = (mics[1] - timedelta(days=1)).date()
+    hasta = mics[0].date()
+    resp = client.get(f'/api/mic-guardados/stats?granularidad=day&fecha_desde={desde}&fecha_hasta={hasta}',
+                      headers=headers)
+    dias = {p['periodo']: p['cantidad'] for p in resp.get_json()['por_periodo']}
+    assert len(dias) == 5 and sum(dias.values()) == 2
+    assert dias[mics[1].date().isoformat()] == 1 and dias[desde.isoformat()] == 0
+
+    semanas = client.get('/api/mic-guardados/stats?granularidad=semana&fecha_desde=2026-10-01'
+                         '&fecha_hasta=2026-10-18', headers=headers).get_json()['por_periodo']
+    # Semanas que empiezan en lunes: 28/09, 05/10, 12/10
+    assert [p['periodo'] for p in semanas] == ['2026-09-28', '2026-10-05', '2026-10-12']
+    assert 'por_mes' not in resp.get_json()
+
+
+@pytest.mark.parametrize('query', [
+    'granularidad=hora',
+    'fecha_desde=2026-13-01',
+    'fecha_desde=2026-10-18&fecha_hasta=2026-10-01',
+    'granularidad=dia&fecha_desde=2000-01-01&fecha_hasta=2026-01-01',
+])
+def test_stats_parametros_invalidos(client, headers, query):
+    resp = client.get(f'/api/mic-guardados/stats?{query}', headers=headers)
+    assert resp.status_code == 400
+    assert resp.get_json()['error']
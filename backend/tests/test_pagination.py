@@ -0,0 +1,103 @@
+"""
+test_pagination.py - Tests de la paginación por cursor (?cursor=).
+
+Cubre:
+  1. Recorrer el listado de CRTs con next_cursor sin repetir ni saltear filas
+  2. Desempate por id en el audit log con created_at iguales
+  3. Total exacto solo a pedido y cursor inválido -> 400
+  4. Sin ?cursor= la respuesta paginada sigue igual
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('admin', 'cursor@test.local', 'cursor_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def crt_ids(db, domain_data):
+    from app.models import CRT
+
+    ids = []
+    for n in range(5):
+        crt = CRT(
+            numero_crt=f'PY00000090{n}',
+            estado='EMITIDO',
+            remitente_id=domain_data['remitente_id'],
+            destinatario_id=domain_data['destinatario_id'],
+            transportadora_id=domain_data['transportadora_id'],
+            ciudad_emision_id=domain_data['ciudad_id'],
+            pais_emision_id=domain_data['pais_id'],
+            moneda_id=domain_data['moneda_id'],
+        )
+        db.session.add(crt)
+        db.session.flush()
+        ids.append(crt.id)
+    db.session.commit()
+    return ids
+
+
+def _recorrer(client, url, headers, clave):
+    vistos, cursor, paginas = [], '', 0
+    while True:
+        data = client.get(f'{url}&cursor={cursor}', headers=headers).get_json()
+        vistos.extend(row['id'] for row in data[clave])
+        paginas += 1
+        if not data['pagination']['has_next']:
+            return vistos, paginas
+        cursor = data['pagination']['next_cursor']
+
+
+def test_crts_por_cursor(client, headers, crt_ids):
+    vistos, paginas = _recorrer(client, '/api/crts/?per_page=2', headers, 'crts')
+
+    assert vistos == sorted(crt_ids, reverse=True)
+    assert paginas == 3
+
+
+def test_audit_log_desempata_por_id(db, client, headers):
+    from app.models import AuditLog
+
+    mismo_momento = datetime(2026, 10, 18, 12, 0, 0)
+    logs = [AuditLog(action=f'test.{n}', created_at=mismo_momento) for n in range(5)]
+    db.session.add_all(logs)
+    db.session.commit()
+
+    vistos, _ = _recorrer(client, '/api/security/audit-logs?per_page=2&action=test.', headers, 'logs')
+    assert vistos == sorted((log.id for log in logs), reverse=True)
+
+
+def test_total_a_pedido_y_cursor_invalido(client, headers, crt_ids):
+    sin_total = client.get('/api/crts/?cursor=&per_page=2', headers=headers).get_json()
+    assert sin_total['pagination']['total'] is None
+    assert 'page' not in sin_total['pagination']
+
+    exacto = client.get('/api/crts/?cursor=&per_page=2&total=exact', headers=headers).get_json()
+    assert exacto['pagination']['total'] == 5
+
+    assert client.get('/api/crts/?cursor=no-es-un-cursor', headers=headers).status_code == 400
+    assert client.get('/api/honorarios/?cursor=%5B%5D', headers=headers).status_code == 400
+
+
+def test_paginacion_clasica_sin_cambios(client, headers, crt_ids):
+    data = client.get('/api/crts/?page=2&per_page=2', headers=headers).get_json()
+    assert data['pagination']['page'] == 2
+    assert data['pagination']['total'] == 5
+    assert [c['id'] for c in data['crts']] == sorted(crt_ids, reverse=True)[2:4]
+
+
+def test_cursor_conserva_tipos():
+    from app.models import AuditLog
+
+    columnas = (AuditLog.created_at, AuditLog.id)
+    valores = [datetime(2026, 10, 18, 12, 30, 5, 123), 42]
+    assert decode_cursor(encode_cursor(valores), columnas) == valores
+    assert decode_cursor('', columnas) is None
@@ -0,0 +1,87 @@
+"""
+test_pdf_cache.py - Tests de la caché de PDFs renderizados (CRT/MIC).
+
+Cubre:
+  1. La clave depende de la data y de la versión del layout
+  2. Lectura/escritura en disco
+  3. Desalojo LRU por tamaño total, recorriendo el directorio solo al pasar el tope
+  4. Invalidación por documento (un subdirectorio por documento)
+"""
+
+import os
+import time
+
+from app.services import pdf_cache
+from app.services.pdf_cache import DiskPDFCache
+
+
+def test_build_key_cambia_con_data_y_layout():
+    base = pdf_cache.build_key('crt', 1, {'a': 1, 'b': 'x'}, 'v1')
+    assert base.startswith('crt-1-')
+    # Mismo contenido con otro orden de claves => misma clave
+    assert pdf_cache.build_key('crt', 1, {'b': 'x', 'a': 1}, 'v1') == base
+    assert pdf_cache.build_key('crt', 1, {'a': 2, 'b': 'x'}, 'v1') != base
+    assert pdf_cache.build_key('crt', 1, {'a': 1, 'b': 'x'}, 'v2') != base
+
+
+def test_disk_cache_get_put(tmp_path):
+    cache = DiskPDFCache(str(tmp_path), max_bytes=1024)
+    assert cache.get('crt-1-abc') is None
+    cache.put('crt-1-abc', b'%PDF-1.4 data')
+    assert cache.get('crt-1-abc') == b'%PDF-1.4 data'
+
+
+def test_disk_cache_desaloja_lru(tmp_path):
+    cache = DiskPDFCache(str(tmp_path), max_bytes=250)
+    cache.put('mic-1-a', b'x' * 100)
+    cache.put('mic-2-b', b'y' * 100)
+    # Marcar mic-1 como usado más recientemente que mic-2
+    old = time.time() - 60
+    os.utime(tmp_path / 'mic-2' / 'mic-2-b.pdf', (old, old))
+    assert cache.get('mic-1-a') is not None
+
+    cache.put('mic-3-c', b'z' * 100)
+
+    assert cache.get('mic-2-b') is None
+    assert cache.get('mic-1-a') is not None
+    assert cache.get('mic-3-c') is not None
+    assert not (tmp_path / 'mic-2').exists()
+
+
+def test_disk_cache_recorre_solo_al_pasar_el_tope(tmp_path, monkeypatch):
+    cache = DiskPDFCache(str(tmp_path), max_bytes=1000)
+    recorridos = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, '_scan', lambda: recorridos.append(1) or scan())
+
+    for i in range(9):
+        cache.put(f'crt-{i}-v1', b'x' * 100)
+    cache.put('crt-0-v1', b'y' * 100)  # reemplazo: no suma
+    assert recorridos == []
+
+    cache.put('crt-9-v1', b'x' * 100)
+    cache.put('crt-10-v1', b'x' * 100)
+    assert recorridos == [1]
+    assert cache._total == 900
+
+
+def test_disk_cache_invalidacion_por_documento(tmp_path):
+    cache = DiskPDFCache(str(tmp_path), max_bytes=10_000)
+    cache.put('crt-7-v1', b'uno')
+    cache.put('crt-7-v2', b'dos')
+    cache.put('crt-70-v1', b'otro')
+
+    removed = cache.invalidate('crt-7-')
+
+    assert removed == 2
+    assert cache.get('crt-7-v1') is None
+    assert cache.get('crt-70-v1') == b'otro'
+    assert sorted(os.listdir(tmp_path)) == ['crt-70']
+    assert cache._total == len(b'otro')
+
+
+def test_disk_cache_descarta_formato_plano(tmp_path):
+    (tmp_path / 'crt-1-viejo.pdf').write_bytes(b'%PDF viejo')
+    cache = DiskPDFCache(str(tmp_path), max_bytes=1000)
+    assert cache._total == 0
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,26 @@
+"""
+test_pdf_golden.py - La capa de texto de los PDFs coincide con los golden files.
+
+Renderiza cada caso sintético de benchmarks/fixtures.py (campos cortos,
+textos al máximo en campos 38/40 y en el CRT, 24 filas de gastos) y compara
+el texto extraído con benchmarks/golden/<caso>.txt. Tras un cambio de layout
+intencional: python -m benchmarks.bench_pdf --actualizar-golden
+"""
+
+import pytest
+
+from benchmarks import golden
+from benchmarks.fixtures import CASOS, preparar
+
+
+@pytest.mark.parametrize('caso', sorted(CASOS))
+def test_texto_coincide_con_golden(caso):
+    diff = golden.comparar_golden(caso, preparar(caso)())
+    assert diff is None, diff
+
+
+def test_golden_detecta_cambios():
+    pdf_bytes = preparar('mic_corto')()
+    assert golden.comparar_golden('mic_corto', pdf_bytes) is None
+    diff = golden.comparar_golden('mic_completo', pdf_bytes)
+    assert diff is not None and 'PY0001234' in golden.extraer_texto(pdf_bytes)
@@ -0,0 +1,117 @@
+"""
+test_pdf_jobs.py - Tests de generación de PDFs en segundo plano (?async=1).
+
+Cubre:
+  1. POST ?async=1 devuelve 202 con job id y GET /api/pdf-jobs/<id> entrega el PDF
+  2. Estado pendiente y error del trabajo
+  3. Un usuario no puede consultar trabajos de otro
+  4. Sin ?async=1 la respuesta sigue siendo síncrona
+
+Los trabajos corren en un pool de hilos (PDF_JOBS_EXECUTOR=thread) para
+compartir la base SQLite en memoria; se espera al pool antes de consultar.
+"""
+
+import tempfile
+
+import pytest
+
+from app.services import pdf_jobs
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture(autouse=True)
+def jobs_en_hilos(app):
+    previous = {k: app.config.get(k) for k in ('PDF_JOBS_EXECUTOR', 'PDF_JOBS_DIR')}
+    app.config.update(PDF_JOBS_EXECUTOR='thread',
+                      PDF_JOBS_DIR=tempfile.mkdtemp(prefix='pdf-jobs-tests-'))
+    pdf_jobs.init_app(app)
+    yield
+    pdf_jobs.shutdown(wait=True)
+    app.config.update(previous)
+    pdf_jobs.init_app(app)
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'jobs@test.local', 'jobs_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def crt_id(db, domain_data):
+    from app.models import CRT
+
+    crt = CRT(
+        numero_crt='PY000000077',
+        estado='EMITIDO',
+        remitente_id=domain_data['remitente_id'],
+        destinatario_id=domain_data['destinatario_id'],
+        transportadora_id=domain_data['transportadora_id'],
+        ciudad_emision_id=domain_data['ciudad_id'],
+        pais_emision_id=domain_data['pais_id'],
+        moneda_id=domain_data['moneda_id'],
+        detalles_mercaderia='Mercadería de prueba',
+    )
+    db.session.add(crt)
+    db.session.commit()
+    return crt.id
+
+
+def test_pdf_crt_asincrono(client, headers, crt_id):
+    resp = client.post(f'/api/crts/{crt_id}/pdf?async=1', headers=headers)
+
+    assert resp.status_code == 202
+    job_id = resp.get_json()['job_id']
+    assert resp.headers['Location'].endswith(f'/api/pdf-jobs/{job_id}')
+
+    pdf_jobs.shutdown(wait=True)
+    done = client.get(f'/api/pdf-jobs/{job_id}', headers=headers)
+    assert done.status_code == 200
+    assert done.mimetype == 'application/pdf'
+    assert done.data.startswith(b'%PDF')
+    assert 'CRT_0077' in done.headers['Content-Disposition']
+
+
+def test_pdf_mic_asincrono(client, headers):
+    resp = client.post('/api/mic/generate_pdf_from_crt/5?async=1', headers=headers,
+                       json={'campo_1_transporte': 'Transportes SA', 'campo_38': 'Soja'})
+    assert resp.status_code == 202
+
+    pdf_jobs.shutdown(wait=True)
+    done = client.get(resp.headers['Location'], headers=headers)
+    assert done.data.startswith(b'%PDF')
+    assert 'mic_5.pdf' in done.headers['Content-Disposition']
+
+
+def test_estado_pendiente_y_error(app, client, headers):
+    job = {'id': 'abc123', 'kind': 'crt', 'status': pdf_jobs.STATUS_PENDING,
+           'owner_id': _usuario_id(app, 'jobs_test'), 'created_at': 9e12}
+    pdf_jobs._store.save(job)
+    pendiente = client.get('/api/pdf-jobs/abc123', headers=headers)
+    assert pendiente.status_code == 202
+    assert pendiente.get_json()['status'] == 'pending'
+
+    pdf_jobs._store.save({**job, 'status': pdf_jobs.STATUS_ERROR, 'error': 'boom'})
+    error = client.get('/api/pdf-jobs/abc123', headers=headers)
+    assert error.status_code == 500
+    assert error.get_json()['error'] == 'boom'
+
+
+def test_trabajo_de_otro_usuario(client, headers):
+    pdf_jobs._store.save({'id': 'ajeno', 'kind': 'crt', 'status': pdf_jobs.STATUS_DONE,
+                          'owner_id': -1, 'created_at': 9e12})
+    pdf_jobs._store.save_result('ajeno', b'%PDF-ajeno')
+
+    assert client.get('/api/pdf-jobs/ajeno', headers=headers).status_code == 404
+    assert client.get('/api/pdf-jobs/inexistente', headers=headers).status_code == 404
+
+
+def test_sin_async_sigue_sincrono(client, headers, crt_id):
+    resp = client.post(f'/api/crts/{crt_id}/pdf', headers=headers)
+    assert resp.status_code == 200
+    assert resp.data.startswith(b'%PDF')
+
+
+def _usuario_id(app, usuario):
+    from app.models import Usuario
+    return Usuario.query.filter_by(usuario=usuario).first().id
@@ -0,0 +1,71 @@
+"""
+test_query_counts.py - Los listados no hacen consultas N+1.
+
+Cada listado se pide con una página que contiene todas las filas, antes y
+después de sembrar más registros, cada uno con sus propias relaciones
+(ciudad, país, CRT, MIC, moneda...). La cantidad de SELECT tiene que
+ser la misma: no puede crecer con el tamaño de la página.
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from tests.conftest import _create_user, _make_token, auth_headers
+
+LISTADOS = [
+    '/api/honorarios/?per_page=100',
+    '/api/honorarios/?per_page=100&cursor=',
+    '/api/crts/?per_page=100',
+    '/api/crts/?per_page=100&view=full',
+    '/api/mic-guardados/?per_page=100',
+    '/api/remitentes/?per_page=100',
+    '/api/remitentes/?per_page=100&sort_by=ciudad_nombre',
+    '/api/transportadoras/?per_page=100',
+    '/api/ciudades/',
+    '/api/paises/',
+    '/api/monedas/',
+    '/api/aduanas/',
+]
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('admin', 'conteo@test.local', 'conteo_test')
+    return auth_headers(_make_token(user))
+
+
+def _sembrar(db, desde, hasta):
+    """Un grafo completo e independiente por índice: nada se comparte entre filas."""
+    from app.models import (CRT, MIC, Aduana, Ciudad, Honorario, Moneda, Pais,
+                            Remitente, Transportadora)
+
+    for i in range(desde, hasta):
+        pais = Pais(nombre=f'Pais {i}', codigo=f'P{i}')
+        ciudad = Ciudad(nombre=f'Ciudad {i}', pais=pais)
+        moneda = Moneda(codigo=f'M{i}', nombre=f'Moneda {i}', simbolo='$')
+        remitente = Remitente(nombre=f'Remitente {i}', ciudad=ciudad)
+        destinatario = Remitente(nombre=f'Destinatario {i}', ciudad=ciudad)
+        transportadora = Transportadora(codigo=f'T{i}', nombre=f'Transportadora {i}',
+                                        ciudad=ciudad, moneda_honorarios=moneda)
+        crt = CRT(numero_crt=f'PY{i:09d}', estado='EMITIDO', fecha_emision=datetime(2026, 1, 1),
+                  remitente=remitente, destinatario=destinatario, transportadora=transportadora,
+                  ciudad_emision=ciudad, pais_emision=pais, moneda=moneda)
+        db.session.add_all([
+            Aduana(codigo=f'A{i}', nombre=f'Aduana {i}', ciudad=ciudad),
+            MIC(crt=crt, campo_4_estado='PROVISORIO', campo_6_fecha=date(2026, 1, 2)),
+            Honorario(monto=10, fecha=date(2026, 1, 3), crt=crt, transportadora=transportadora,
+                      moneda=moneda),
+        ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url', LISTADOS)
+def test_listado_sin_n_mas_1(client, headers, db, count_queries, url):
+    _sembrar(db, 0, 2)
+    # El primer request del test carga datos de sesión (usuario, permisos)
+    client.get(url, headers=headers)
+    pocas = count_queries(client.get, url, headers=headers)
+    _sembrar(db, 2, 8)
+    muchas = count_queries(client.get, url, headers=headers)
+    assert muchas == pocas, f'{url}: {pocas} consultas con 2 filas, {muchas} con 8'
@@ -0,0 +1,125 @@
+"""
+test_query_plans.py - Los listados no recorren tablas grandes completas.
+
+Con un volumen sembrado (miles de CRTs, MICs, gastos y honorarios) y
+estadísticas del planner (ANALYZE), se ejecuta cada listado con sus filtros
+habituales, se capturan los SELECT emitidos y se verifica con EXPLAIN que
+ninguno haga un scan secuencial sobre las tablas de negocio.
+Las páginas profundas del audit log deben leerse como un rango del índice
+(created_at, id).
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.utils.pagination import encode_cursor
+from app.utils.query_plan import capture_queries, explain, sequential_scans
+from tests.conftest import _create_user, _make_token, auth_headers
+
+N_CRTS = 3000
+TABLAS_GRANDES = {'crts', 'mics', 'honorarios', 'crt_gastos', 'audit_logs'}
+INICIO = datetime(2026, 1, 1)
+# Cursor a mitad del audit log: (created_at, id) de la fila 1500
+CURSOR_AUDIT = encode_cursor([INICIO + timedelta(minutes=750), 1501])
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('admin', 'planes@test.local', 'planes_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def volumen(db, domain_data):
+    from app.models import CRT, AuditLog, CRT_Gasto, Honorario, MIC, Transportadora
+
+    otras = [Transportadora(codigo=f'T{i}', nombre=f'Transportes {i}') for i in range(20)]
+    db.session.add_all(otras)
+    db.session.flush()
+    transportadoras = [domain_data['transportadora_id']] + [t.id for t in otras]
+    inicio = INICIO
+
+    db.session.execute(insert(CRT), [dict(
+        id=i + 1,
+        numero_crt=f'PY{i:09d}',
+        estado=('EMITIDO', 'FINALIZADO', 'ANULADO')[i % 3],
+        fecha_emision=inicio + timedelta(hours=i),
+        remitente_id=domain_data['remitente_id'],
+        destinatario_id=domain_data['destinatario_id'],
+        transportadora_id=transportadoras[i % len(transportadoras)],
+        ciudad_emision_id=domain_data['ciudad_id'],
+        pais_emision_id=domain_data['pais_id'],
+        moneda_id=domain_data['moneda_id'],
+        detalles_mercaderia=f'{i} BOLSAS DE SOJA',
+    ) for i in range(N_CRTS)])
+    db.session.execute(insert(CRT_Gasto), [
+        dict(crt_id=i + 1, tramo='Flete', valor_remitente=100) for i in range(N_CRTS)])
+    db.session.execute(insert(MIC), [dict(
+        crt_id=i + 1,
+        campo_4_estado='PROVISORIO',
+        campo_6_fecha=date(2026, 1, 1) + timedelta(days=i % 365),
+        campo_23_numero_campo2_crt=f'PY{i:09d}',
+        creado_en=inicio + timedelta(hours=i),
+    ) for i in range(N_CRTS)])
+    db.session.execute(insert(Honorario), [dict(
+        crt_id=i + 1,
+        monto=100,
+        transportadora_id=transportadoras[i % len(transportadoras)],
+        moneda_id=domain_data['moneda_id'],
+        fecha=date(2026, 1, 1),
+    ) for i in range(0, N_CRTS, 2)])
+    # Dos eventos por minuto: el cursor desempata por id
+    db.session.execute(insert(AuditLog), [dict(
+        id=i + 1,
+        action='crt.update',
+        created_at=inicio + timedelta(minutes=i // 2),
+    ) for i in range(N_CRTS)])
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    yield transportadoras
+    db.session.execute(text('DELETE FROM sqlite_stat1'))
+    db.session.commit()
+
+
+LISTADOS = [
+    '/api/crts/?estado=FINALIZADO',
+    '/api/crts/?transportadora_id={t}',
+    '/api/crts/?fecha_desde=2026-02-01&fecha_hasta=2026-02-03',
+    '/api/crts/?estado=EMITIDO&view=full',
+    '/api/crts/?transportadora_id={t}&cursor=',
+    '/api/crts/next_number?transportadora_id={t}&codigo=PY000000001',
+    '/api/crts/1500',
+    '/api/mic-guardados/?fecha_desde=2026-03-01&fecha_hasta=2026-03-05',
+    '/api/honorarios/?transportadora_id={t}',
+    '/api/security/audit-logs?cursor=' + CURSOR_AUDIT,
+]
+
+
+@pytest.mark.parametrize('url', LISTADOS)
+def test_listado_sin_scans_secuenciales(client, headers, volumen, url, db):
+    with capture_queries() as queries:
+        resp = client.get(url.format(t=volumen[3]), headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+
+    consultas = [q for q in queries if any(t in q.statement for t in TABLAS_GRANDES)]
+    assert consultas
+    for q in consultas:
+        scans = sequential_scans(q.statement, q.parameters, tables=TABLAS_GRANDES)
+        assert not scans, f'scan secuencial sobre {scans} en:\n{q.statement}'
+
+
+def test_audit_log_pagina_profunda_por_rango(client, headers, volumen, db):
+    with capture_queries() as queries:
+        resp = client.get('/api/security/audit-logs?per_page=20&cursor=' + CURSOR_AUDIT,
+                          headers=headers)
+    assert resp.status_code == 200
+    assert resp.get_json()['logs'][0]['id'] == 1500
+
+    consultas = [q for q in queries if 'FROM audit_logs' in q.statement]
+    assert consultas
+    for q in consultas:
+        plan = explain(q.statement, q.parameters)
+        assert any('SEARCH audit_logs USING INDEX ix_audit_logs_created_id' in d for d in plan), plan
@@ -0,0 +1,62 @@
+"""
+test_rate_limiter.py - Rate limiter por bucket/identificador.
+
+Cubre:
+  1. Token bucket en memoria: límite, buckets independientes y recarga
+  2. Login limitado por cuenta aunque cambie la IP
+  3. Si Redis falla a mitad de camino se usa el bucket en memoria
+  4. La espera de los intentos bloqueados crece con backoff_factor
+"""
+
+import pytest
+
+from app.services import auth_service, rate_limiter
+
+
+def test_bucket_en_memoria(db, monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', lambda: reloj[0])
+
+    resultados = [rate_limiter.hit('pdf', '10.0.0.1', 3, 60) for _ in range(4)]
+    assert [r.allowed for r in resultados] == [True, True, True, False]
+    assert [r.remaining for r in resultados] == [2, 1, 0, 0]
+    assert resultados[-1].retry_after == 20
+
+    # Otro identificador u otro bucket no comparten cupo
+    assert rate_limiter.hit('pdf', '10.0.0.2', 3, 60).allowed
+    assert rate_limiter.hit('search', '10.0.0.1', 3, 60).allowed
+
+    reloj[0] += 20
+    assert rate_limiter.hit('pdf', '10.0.0.1', 3, 60).allowed
+    assert not rate_limiter.hit('pdf', '10.0.0.1', 3, 60).allowed
+
+
+def test_login_limitado_por_cuenta(app, db, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOGIN_IDENTIFIER_RATE_LIMIT_PER_MINUTE', 2)
+
+    auth_service._check_rate_limit('10.0.0.1', 'Victima@Test.local')
+    auth_service._check_rate_limit('10.0.0.2', 'victima@test.local')
+    with pytest.raises(auth_service.RateLimitExceeded) as exc:
+        auth_service._check_rate_limit('10.0.0.3', 'victima@test.local')
+    assert exc.value.retry_after_seconds == 60 * app.config['LOGIN_RATE_LIMIT_BACKOFF_FACTOR']
+
+    auth_service._check_rate_limit('10.0.0.3', 'otra@test.local')
+
+
+def test_fallo_de_redis_usa_memoria(db, monkeypatch):
+    def script_caido(**kwargs):
+        raise ConnectionError('redis caído')
+
+    monkeypatch.setattr(rate_limiter, '_redis_client', object())
+    monkeypatch.setattr(rate_limiter, '_script', script_caido)
+
+    assert rate_limiter.hit('login:ip', '10.0.0.9', 1, 60).allowed
+    assert rate_limiter.check_rate_limit('10.0.0.9', 1, backoff_factor=2.0) == 120
+
+
+def test_backoff_crece_con_los_bloqueos(db, monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', lambda: 1000.0)
+
+    esperas = [rate_limiter.check_rate_limit('10.0.0.7', 2, backoff_factor=2.0)
+               for _ in range(6)]
+    assert esperas == [None, None, 120, 240, 240, 240]
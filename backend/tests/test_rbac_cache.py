@@ -0,0 +1,61 @@
+"""
+test_rbac_cache.py - Mapa rol -> permisos cacheado por proceso.
+
+Cubre:
+  1. get_user_permissions no recorre role.permissions ni vuelve a consultar permisos
+  2. Un commit sobre roles/permisos invalida el mapa
+  3. Un cambio de otro proceso (versión compartida) se nota al vencer el TTL
+"""
+
+from app.security import rbac
+from app.utils.query_plan import capture_queries
+from tests.conftest import _create_user
+
+
+def test_permisos_desde_el_mapa(db):
+    user = _create_user('operador', 'rbac@test.local', 'rbac_test')
+    assert rbac.get_user_permissions(user) == frozenset(rbac.ROLE_MATRIX['operador'])
+
+    db.session.expire_all()
+    with capture_queries() as queries:
+        permisos = rbac.get_user_permissions(user)
+        assert 'reportes:ver' in permisos and 'usuarios:crear' not in permisos
+    assert not any('permissions' in q.statement for q in queries)
+    assert rbac.permissions_for_roles({'operador', 'visor'}) == frozenset(
+        rbac.ROLE_MATRIX['operador'] | rbac.ROLE_MATRIX['visor'])
+
+
+def test_commit_invalida_el_mapa(db):
+    from app.models import Permission, Role
+
+    user = _create_user('visor', 'rbac2@test.local', 'rbac2_test')
+    assert 'auditoria:ver' not in rbac.get_user_permissions(user)
+
+    visor = Role.query.filter_by(name='visor').one()
+    visor.permissions.append(Permission.query.filter_by(key='auditoria:ver').one())
+    db.session.commit()
+
+    assert 'auditoria:ver' in rbac.get_user_permissions(user)
+
+
+def test_cambio_de_otro_proceso_tras_el_ttl(app, db, monkeypatch):
+    from sqlalchemy import text
+
+    reloj = [1000.0]
+    monkeypatch.setattr(rbac.time, 'monotonic', lambda: reloj[0])
+    monkeypatch.setitem(app.config, 'RBAC_VERSION_TTL_SECONDS', 5)
+    user = _create_user('visor', 'rbac3@test.local', 'rbac3_test')
+    assert 'auditoria:ver' not in rbac.get_user_permissions(user)
+
+    # Otro proceso: escribe sin pasar por los hooks de esta sesión
+    db.session.execute(text(
+        "INSERT INTO role_permissions (role_id, permission_id, created_at) "
+        "SELECT r.id, p.id, CURRENT_TIMESTAMP FROM roles r, permissions p "
+        "WHERE r.name = 'visor' AND p.key = 'auditoria:ver'"))
+    db.session.execute(text("UPDATE parametros SET valor = 'otra' WHERE clave = 'rbac_version'"))
+    db.session.commit()
+
+    reloj[0] += 4
+    assert 'auditoria:ver' not in rbac.get_user_permissions(user)
+    reloj[0] += 2
+    assert 'auditoria:ver' in rbac.get_user_permissions(user)
@@ -0,0 +1,105 @@
+"""
+test_reportes.py - Reporte de honorarios sobre la tabla resumen (/api/reportes/honorarios).
+
+Cubre:
+  1. Alta, modificación y baja de honorarios mantienen el resumen al día
+  2. La reconstrucción completa coincide con el estado incremental
+  3. El endpoint lee solo la tabla resumen y valida los meses
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services import reportes_service
+from app.utils.query_plan import capture_queries
+from tests.conftest import _create_user, _make_token, auth_headers
+
+URL = '/api/reportes/honorarios'
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'reportes@test.local', 'reportes_test')
+    return auth_headers(_make_token(user))
+
+
+def _honorario(db, domain_data, monto, fecha, tipo='EXPORTACION'):
+    from app.models import Honorario
+
+    honorario = Honorario(monto=monto, fecha=fecha, tipo_operacion=tipo,
+                          transportadora_id=domain_data['transportadora_id'],
+                          moneda_id=domain_data['moneda_id'])
+    db.session.add(honorario)
+    db.session.commit()
+    return honorario
+
+
+def _resumen(db):
+    from app.models import HonorarioResumen
+
+    return {
+        (r.mes, r.tipo_operacion): (r.cantidad, Decimal(str(r.total)))
+        for r in db.session.query(HonorarioResumen).filter(HonorarioResumen.cantidad > 0)
+    }
+
+
+def test_resumen_incremental(db, domain_data):
+    a = _honorario(db, domain_data, '100.50', date(2026, 9, 3))
+    _honorario(db, domain_data, '49.50', date(2026, 9, 20))
+    c = _honorario(db, domain_data, '10', date(2026, 10, 1), tipo='IMPORTACION')
+    assert _resumen(db) == {
+        ('2026-09', 'EXPORTACION'): (2, Decimal('150.00')),
+        ('2026-10', 'IMPORTACION'): (1, Decimal('10.00')),
+    }
+
+    a.monto = Decimal('200.50')
+    a.fecha = date(2026, 10, 5)
+    db.session.commit()
+    db.session.delete(c)
+    db.session.commit()
+    assert _resumen(db) == {
+        ('2026-09', 'EXPORTACION'): (1, Decimal('49.50')),
+        ('2026-10', 'EXPORTACION'): (1, Decimal('200.50')),
+    }
+
+    # Cambios que no tocan la clave ni el monto no escriben en el resumen
+    a.observaciones = 'sin efecto'
+    with capture_queries() as queries:
+        db.session.commit()
+    assert not any('honorarios_resumen' in q.statement for q in queries)
+
+
+def test_reconstruir_coincide_con_incremental(db, domain_data):
+    _honorario(db, domain_data, '1', date(2026, 8, 31))
+    _honorario(db, domain_data, '2', date(2026, 8, 1))
+    b = _honorario(db, domain_data, '3', date(2026, 7, 15), tipo='IMPORTACION')
+    b.tipo_operacion = 'EXPORTACION'
+    db.session.commit()
+    incremental = _resumen(db)
+
+    assert reportes_service.reconstruir_resumen() == 2
+    assert _resumen(db) == incremental
+
+
+def test_endpoint_reporte(client, headers, db, domain_data):
+    _honorario(db, domain_data, '100', date(2026, 9, 3))
+    _honorario(db, domain_data, '50', date(2026, 10, 3))
+    _honorario(db, domain_data, '25', date(2026, 10, 4), tipo='IMPORTACION')
+
+    with capture_queries() as queries:
+        resp = client.get(f'{URL}?desde=2026-10&hasta=2026-10', headers=headers)
+    data = resp.get_json()
+
+    assert resp.status_code == 200
+    assert not any('FROM honorarios ' in q.statement or 'FROM honorarios\n' in q.statement
+                   for q in queries)
+    assert [(i['mes'], i['tipo_operacion'], i['cantidad'], i['total']) for i in data['items']] == [
+        ('2026-10', 'EXPORTACION', 1, 50.0), ('2026-10', 'IMPORTACION', 1, 25.0)]
+    assert data['items'][0]['transportadora_nombre'] == 'Transportes Test SA'
+    assert data['totales'] == [{'moneda_id': domain_data['moneda_id'], 'moneda_codigo': 'USD',
+                                'moneda_nombre': 'Dólar Americano', 'cantidad': 2, 'total': 75.0}]
+
+    assert client.get(f'{URL}?desde=2026-13', headers=headers).status_code == 400
+    assert client.get(f'{URL}?desde=2026-10&hasta=2026-09', headers=headers).status_code == 400
@@ -0,0 +1,50 @@
+"""
+test_request_metrics.py - Instrumentación SQL por request.
+
+Cubre:
+  1. Server-Timing con cantidad de consultas y tiempo de base de datos
+  2. Log estructurado por request y log de consultas lentas
+"""
+
+import logging
+import re
+
+import pytest
+
+from app.services import request_metrics
+from app.utils.query_plan import capture_queries
+from tests.conftest import _create_user, _make_token, auth_headers
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('admin', 'metricas@test.local', 'metricas_test')
+    return auth_headers(_make_token(user))
+
+
+def test_server_timing(client, headers, domain_data):
+    with capture_queries() as queries:
+        resp = client.get('/api/paises/', headers=headers)
+
+    timing = resp.headers['Server-Timing']
+    cantidad = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+    assert cantidad == len(queries) > 0
+    assert re.search(r'db-slowest;dur=[\d.]+', timing)
+    assert re.search(r'app;dur=[\d.]+', timing)
+
+
+def test_log_de_request_y_consultas_lentas(client, headers, domain_data, caplog, monkeypatch):
+    monkeypatch.setattr(request_metrics, '_slow_query_ms', 0.000001)
+    with caplog.at_level(logging.INFO, logger=request_metrics.__name__):
+        client.get('/api/paises/', headers=headers)
+
+    completado = [r for r in caplog.records if r.getMessage() == 'Request completed']
+    assert len(completado) == 1
+    registro = completado[0]
+    assert (registro.method, registro.path, registro.status) == ('GET', '/api/paises/', 200)
+    assert registro.db_queries > 0 and registro.db_time_ms >= registro.db_slowest_ms
+    assert registro.db_slowest_statement.startswith('SELECT')
+
+    lentas = [r for r in caplog.records if r.getMessage() == 'Slow query']
+    assert len(lentas) == registro.db_queries
+    assert all(r.path == '/api/paises/' and r.db_statement for r in lentas)
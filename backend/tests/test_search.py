@@ -0,0 +1,112 @@
+"""
+test_search.py - Tests del servicio de búsqueda (search_service).
+
+Cubre:
+  1. Las tablas FTS5 se crean con create_all y los triggers las sincronizan
+  2. match_any usa el índice FTS (>= 3 caracteres) o ILIKE (términos cortos)
+  3. Los endpoints (CRTs, remitentes, búsqueda avanzada de MICs) usan la búsqueda
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.services import search_service
+from tests.conftest import _create_user, _make_token, auth_headers
+
+pytestmark = pytest.mark.skipif(
+    not search_service.sqlite_fts_supported(), reason='SQLite sin FTS5/trigram')
+
+
+@pytest.fixture
+def headers(db):
+    user = _create_user('operador', 'busqueda@test.local', 'busqueda_test')
+    return auth_headers(_make_token(user))
+
+
+@pytest.fixture
+def crts(db, domain_data):
+    from app.models import CRT
+
+    detalles = ('1.200 BOLSAS DE SOJA EN GRANO', 'MAÍZ A GRANEL', None)
+    creados = []
+    for n, detalle in enumerate(detalles):
+        crt = CRT(
+            numero_crt=f'PY00000090{n}',
+            remitente_id=domain_data['remitente_id'],
+            destinatario_id=domain_data['destinatario_id'],
+            transportadora_id=domain_data['transportadora_id'],
+            ciudad_emision_id=domain_data['ciudad_id'],
+            pais_emision_id=domain_data['pais_id'],
+            moneda_id=domain_data['moneda_id'],
+            detalles_mercaderia=detalle,
+        )
+        db.session.add(crt)
+        creados.append(crt)
+    db.session.commit()
+    return [c.id for c in creados]
+
+
+def _ids(db, model, clause):
+    return sorted(r.id for r in db.session.query(model.id).filter(clause))
+
+
+def test_triggers_sincronizan_fts(db, crts):
+    from app.models import CRT
+
+    def fts(termino):
+        return sorted(r[0] for r in db.session.execute(
+            text('SELECT rowid FROM crts_fts WHERE crts_fts MATCH :q'), {'q': f'"{termino}"'}))
+
+    assert fts('soja') == [crts[0]]
+
+    crt = db.session.get(CRT, crts[1])
+    crt.detalles_mercaderia = 'SOJA DESACTIVADA'
+    db.session.commit()
+    assert fts('soja') == [crts[0], crts[1]]
+    assert fts('maíz') == []
+
+    db.session.delete(db.session.get(CRT, crts[0]))
+    db.session.commit()
+    assert fts('soja') == [crts[1]]
+
+
+def test_match_any_fts_e_ilike(db, crts):
+    from app.models import CRT
+
+    clause = search_service.match_any('sOjA eN', CRT.detalles_mercaderia)
+    assert 'MATCH' in str(clause.compile(db.engine))
+    assert _ids(db, CRT, clause) == [crts[0]]
+
+    # Subcadena dentro del número, solo en la columna pedida
+    assert _ids(db, CRT, search_service.match_any('0000901', CRT.numero_crt)) == [crts[1]]
+    assert _ids(db, CRT, search_service.match_any('0000901', CRT.detalles_mercaderia)) == []
+
+    # Menos de 3 caracteres: ILIKE, con comodines escapados
+    corto = search_service.match_any('02', CRT.numero_crt)
+    assert 'MATCH' not in str(corto.compile(db.engine))
+    assert _ids(db, CRT, corto) == [crts[2]]
+    assert _ids(db, CRT, search_service.match_any('%', CRT.numero_crt)) == []
+
+
+def test_endpoints_usan_busqueda(client, headers, crts, domain_data):
+    from app.models import MIC
+
+    # Remitente y transportadora vía subconsulta: sin filas duplicadas
+    por_remitente = client.get('/api/crts/?q=exportadora test', headers=headers).get_json()
+    assert sorted(c['id'] for c in por_remitente['crts']) == crts
+    assert por_remitente['pagination']['total'] == 3
+    por_detalle = client.get('/api/crts/?q=granel', headers=headers).get_json()
+    assert [c['id'] for c in por_detalle['crts']] == [crts[1]]
+
+    remitentes = client.get('/api/remitentes/?q=98765432', headers=headers).get_json()
+    assert [r['id'] for r in remitentes['items']] == [domain_data['destinatario_id']]
+
+    from app import db
+    db.session.add_all([
+        MIC(crt_id=crts[0], campo_11_placa='AAB 123', campo_8_destino='FOZ DO IGUAÇU'),
+        MIC(crt_id=crts[1], campo_11_placa='XYZ 987', campo_8_destino='SANTOS'),
+    ])
+    db.session.commit()
+    resp = client.post('/api/mic-guardados/search', headers=headers,
+                       json={'placa': 'ab 1', 'destino': 'iguaçu'})
+    assert [m['placa_camion'] for m in resp.get_json()['mics']] == ['AAB 123']
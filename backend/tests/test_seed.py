@@ -0,0 +1,50 @@
+"""
+test_seed.py - Datos iniciales con `flask seed` (fuera de create_app).
+
+Cubre:
+  1. create_app no consulta la base ni importa reportlab
+  2. `flask seed` crea roles/permisos y el admin; la segunda vez no escribe
+"""
+
+import os
+import subprocess
+import sys
+
+from app.models import Role, Usuario
+from app.seeds import seed_pendiente
+from app.utils.query_plan import capture_queries
+
+
+def test_create_app_sin_seed_ni_reportlab():
+    codigo = (
+        "import sys\n"
+        "from sqlalchemy import event\n"
+        "from sqlalchemy.engine import Engine\n"
+        "sentencias = []\n"
+        "event.listen(Engine, 'before_cursor_execute', lambda *a: sentencias.append(a[2]))\n"
+        "from app import create_app\n"
+        "create_app()\n"
+        "assert sentencias == [], sentencias\n"
+        "assert 'reportlab' not in sys.modules\n"
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    resultado = subprocess.run([sys.executable, '-c', codigo], cwd=backend,
+                               capture_output=True, text=True, timeout=60)
+    assert resultado.returncode == 0, resultado.stderr
+
+
+def test_flask_seed_idempotente(app, db):
+    runner = app.test_cli_runner()
+    assert seed_pendiente()
+
+    resultado = runner.invoke(args=['seed'])
+    assert resultado.exit_code == 0, resultado.output
+    assert 'aplicados' in resultado.output
+    admin = Usuario.query.join(Usuario.roles).filter(Role.name == 'admin').one()
+    assert admin.usuario == app.config['DEFAULT_ADMIN_USERNAME']
+    assert not seed_pendiente()
+
+    with capture_queries() as queries:
+        resultado = runner.invoke(args=['seed'])
+    assert 'al día' in resultado.output
+    assert len(queries) == 2
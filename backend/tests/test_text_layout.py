@@ -0,0 +1,84 @@
+"""
+test_text_layout.py - Tests del motor compartido de ajuste de texto.
+
+Cubre:
+  1. El wrap lineal coincide con el wrap por prefijos con stringWidth
+  2. La búsqueda binaria elige el mayor tamaño que entra
+  3. Políticas para palabras largas (recorte / partición)
+  4. Memorización de resultados
+"""
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from app.utils import text_layout
+from app.utils.text_layout import (
+    LONG_WORDS_SPLIT, LONG_WORDS_TRUNCATE, fit_text, split_long_word, wrap_lines,
+)
+
+TEXTO = ("1.200 BOLSAS DE SOJA EN GRANO A GRANEL, COSECHA 2026, NCM 1201.90.00 "
+         "PESO NETO 29.800 KG.\n\nMercadería con acentos: São Paulo, Asunción. ") * 5
+
+
+def _wrap_referencia(text, font, size, width):
+    lines = []
+    for raw in text.split('\n'):
+        if not raw.strip():
+            lines.append('')
+            continue
+        cur = ''
+        for word in raw.split():
+            test = f'{cur} {word}' if cur else word
+            if stringWidth(test, font, size) <= width:
+                cur = test
+            else:
+                if cur:
+                    lines.append(cur)
+                cur = word
+        if cur:
+            lines.append(cur)
+    return tuple(lines)
+
+
+def test_wrap_coincide_con_referencia():
+    for width in (60, 150, 333.3, 900):
+        for size in (6, 9.5, 12):
+            assert wrap_lines(TEXTO, 'Helvetica', size, width, keep_blank_lines=True) == \
+                _wrap_referencia(TEXTO, 'Helvetica', size, width)
+
+
+def test_fit_text_elige_mayor_tamanio_que_entra():
+    layout = fit_text(TEXTO, 'Helvetica', 300, 200, 5, 14, leading_extra=2, keep_blank_lines=True)
+
+    assert layout.fits
+    assert len(layout.lines) * (layout.font_size + 2) <= 200
+    mayor = layout.font_size + 1
+    lineas = _wrap_referencia(TEXTO, 'Helvetica', mayor, 300)
+    assert len(lineas) * (mayor + 2) > 200
+
+
+def test_fit_text_sin_tamanio_valido_devuelve_minimo():
+    layout = fit_text(TEXTO, 'Helvetica', 50, 10, 5, 8, step=0.5)
+    assert not layout.fits
+    assert layout.font_size == 5
+
+
+def test_palabras_largas():
+    palabra = 'ABCDEFGHIJ/KLMNOPQRST-UVWXYZ' * 3
+    recortado = wrap_lines(f'a {palabra}', 'Helvetica', 10, 80, long_words=LONG_WORDS_TRUNCATE)
+    assert recortado[0] == 'a'
+    assert stringWidth(recortado[1], 'Helvetica', 10) <= 80
+
+    partes = split_long_word(palabra, 'Helvetica', 10, 80)
+    assert ''.join(partes) == palabra
+    assert all(stringWidth(p, 'Helvetica', 10) <= 80 for p in partes)
+    partido = wrap_lines(palabra, 'Helvetica', 10, 80, long_words=LONG_WORDS_SPLIT)
+    assert all(stringWidth(line, 'Helvetica', 10) <= 80 for line in partido)
+
+
+def test_layout_memorizado():
+    text_layout.clear_caches()
+    primero = fit_text(TEXTO, 'Helvetica', 300, 200, 5, 14)
+    segundo = fit_text(TEXTO, 'Helvetica', 300, 200, 5, 14)
+
+    assert segundo is primero
+    assert text_layout.fit_text.cache_info().hits == 1
@@ -16,19 +16,18 @@ if [ -f requirements.txt ]; then
     pip install --user --no-cache-dir -r requirements.txt
 fi
 
+# Directorio de métricas compartido por los workers de gunicorn (prometheus_client)
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Run migrations
 echo "Running database migrations..."
 flask db upgrade
 
-# Crear usuario admin si no existe
-echo "Ensuring admin user exists..."
-python -c "
-from app import create_app
-from app.seeds import ensure_admin_user
-app = create_app()
-with app.app_context():
-    ensure_admin_user()
-"
+# Roles, permisos y usuario admin (idempotente; no hace nada si ya existen)
+echo "Seeding roles, permissions and admin user..."
+flask seed
 
 echo "=== Initialization complete ==="
 
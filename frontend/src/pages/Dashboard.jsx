@@ -7,6 +7,8 @@ import {
   TrendingUp, Activity, BarChart3, History
 } from "lucide-react";
 
+const STATS_REFRESH_MS = 60000;
+
 // Configuración de módulos con un diseño más sobrio
 const modules = [
   {
@@ -150,10 +152,15 @@ function Dashboard() {
 
   useEffect(() => {
     fetchDashboardStats();
+    // Refresco periódico: el backend responde con ETag, así que el navegador
+    // revalida con If-None-Match y recibe un 304 vacío si nada cambió.
+    const interval = setInterval(() => {
+      if (document.visibilityState === 'visible') fetchDashboardStats();
+    }, STATS_REFRESH_MS);
+    return () => clearInterval(interval);
   }, []);
 
   const fetchDashboardStats = async () => {
-    setIsLoading(true);
     try {
       // Single API call instead of 8 separate calls
       const response = await api.get('/dashboard/stats');